@@ -0,0 +1,82 @@
+import argparse
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+from rbacx.rebac.compact import CompactRelationshipStore
+from rbacx.rebac.local import InMemoryRelationshipStore
+
+STORES = {
+    "inmemory": InMemoryRelationshipStore,
+    "compact": CompactRelationshipStore,
+}
+
+
+def gen_tuples(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    users = max(1, n // 20)
+    docs = max(1, n // 5)
+    for i in range(n):
+        if i % 10 == 0:
+            yield f"folder:{rnd.randrange(docs // 10 + 1)}", "parent", f"doc:{rnd.randrange(docs)}"
+        else:
+            rel = rnd.choice(("viewer", "editor", "owner"))
+            yield f"user:{rnd.randrange(users)}", rel, f"doc:{rnd.randrange(docs)}"
+
+
+def build(kind: str, tuples: list) -> tuple[object, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    store = STORES[kind]()
+    for s, r, o in tuples:
+        store.add(s, r, o)
+    if hasattr(store, "compact"):
+        store.compact()
+    elapsed = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current, elapsed
+
+
+def lookup_latency(store, tuples: list, iters: int) -> list[float]:
+    rnd = random.Random(1)
+    lat = []
+    for _ in range(iters):
+        s, r, o = tuples[rnd.randrange(len(tuples))]
+        t0 = time.perf_counter()
+        list(store.direct_for_resource(r, o))
+        list(store.by_subject(s, r))
+        lat.append((time.perf_counter() - t0) * 1_000_000.0)
+    return lat
+
+
+def percentile(arr, p):
+    arr2 = sorted(arr)
+    k = int(round((p / 100.0) * (len(arr2) - 1)))
+    return arr2[k]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    ap.add_argument("--iters", type=int, default=5000)
+    ap.add_argument("--stores", nargs="+", default=list(STORES), choices=list(STORES))
+    args = ap.parse_args()
+    print("store,tuples,mem_mb,bytes_per_tuple,build_s,p50_us,p90_us")
+    for size in args.sizes:
+        tuples = list(gen_tuples(size))
+        for kind in args.stores:
+            store, mem, build_s = build(kind, tuples)
+            lat = lookup_latency(store, tuples, args.iters)
+            print(
+                f"{kind},{size},{mem / 1e6:.1f},{mem / size:.0f},{build_s:.2f},"
+                f"{statistics.median(lat):.1f},{percentile(lat, 90):.1f}"
+            )
+            del store
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ except Exception:  # pragma: no cover
 # Public, convenient imports
 from .core.decision import Decision, RuleTrace
 from .core.engine import Guard
-from .core.model import Action, Context, Resource, Subject
+from .core.model import Action, Context, Resource, ResourceBatch, Subject
 from .policy.loader import HotReloader, load_policy
 
 __all__ = [
@@ -15,6 +15,7 @@ __all__ = [
     "Subject",
     "Action",
     "Resource",
+    "ResourceBatch",
     "Context",
     "Decision",
     "RuleTrace",
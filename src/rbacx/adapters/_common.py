@@ -3,3 +3,27 @@ from typing import Any, Callable
 from ..core.model import Action, Context, Resource, Subject
 
 EnvBuilder = Callable[[Any], tuple[Subject, Action, Resource, Context]]
+
+# Where an adapter reads the request's consistency token (e.g. a ZedToken) from:
+# a header name, or a callable taking the framework request (session, cookie, ...).
+ConsistencySource = str | Callable[[Any], "str | None"]
+
+
+def consistency_token_from(source: ConsistencySource | None, request: Any) -> str | None:
+    """Extract the consistency token for *request* (``None`` if absent)."""
+    if source is None:
+        return None
+    if callable(source):
+        return source(request) or None
+    name = source.lower()
+    if isinstance(request, dict):
+        # raw ASGI scope: headers are a list of (bytes, bytes) with lower-cased names
+        needle = name.encode("latin-1")
+        for k, v in request.get("headers") or ():
+            if k.lower() == needle:
+                return v.decode("latin-1") or None
+        return None
+    headers = getattr(request, "headers", None)
+    if headers is None:
+        return None
+    return headers.get(source) or None
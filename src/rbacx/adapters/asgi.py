@@ -3,7 +3,8 @@ import logging
 from typing import Any, Iterable
 
 from ..core.engine import Guard
-from ._common import EnvBuilder
+from ..core.relctx import CONSISTENCY_TOKEN
+from ._common import ConsistencySource, EnvBuilder, consistency_token_from
 
 logger = logging.getLogger("rbacx.adapters.asgi")
 
@@ -18,6 +19,11 @@ class RbacxMiddleware:
     Security:
       - Does not leak denial reasons in the response body.
       - If `add_headers=True`, attaches `X-RBACX-*` headers on deny.
+
+    Consistency:
+      - `consistency` (a header name such as ``"x-zed-token"``, or a callable taking
+        the scope) supplies the request's consistency token; ReBAC checks made while
+        handling the request -- here and downstream -- are at least that fresh.
     """
 
     def __init__(
@@ -28,14 +34,29 @@ class RbacxMiddleware:
         mode: str = "enforce",
         build_env: EnvBuilder | None = None,
         add_headers: bool = False,
+        consistency: ConsistencySource | None = None,
     ) -> None:
         self.app = app
         self.guard = guard
         self.mode = mode
         self.build_env = build_env
         self.add_headers = add_headers
+        self.consistency = consistency
 
     async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        token = None
+        if self.consistency is not None and scope.get("type") == "http":
+            token = consistency_token_from(self.consistency, scope)
+        if token is None:
+            await self._handle(scope, receive, send)
+            return
+        reset = CONSISTENCY_TOKEN.set(token)
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            CONSISTENCY_TOKEN.reset(reset)
+
+    async def _handle(self, scope: dict, receive: Any, send: Any) -> None:
         # Always inject the guard for downstream usage
         scope["rbacx_guard"] = self.guard
 
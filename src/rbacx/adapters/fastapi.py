@@ -7,7 +7,8 @@ except Exception:  # pragma: no cover
     Request = None  # type: ignore
 
 from ..core.engine import Guard
-from ._common import EnvBuilder
+from ..core.relctx import consistency_token
+from ._common import ConsistencySource, EnvBuilder, consistency_token_from
 
 
 def require_access(
@@ -15,8 +16,13 @@ def require_access(
     build_env: EnvBuilder,
     *,
     add_headers: bool = False,
+    consistency: ConsistencySource | None = None,
 ) -> Callable[[Request], Awaitable[None]]:
-    """Return a FastAPI dependency that enforces access with optional deny headers."""
+    """Return a FastAPI dependency that enforces access with optional deny headers.
+
+    ``consistency`` (header name or ``callable(request)``) supplies the consistency
+    token used by ReBAC checks for this decision.
+    """
 
     async def dependency(request: Request) -> None:
         """Async-only dependency for FastAPI: always uses Guard.evaluate_async."""
@@ -25,7 +31,8 @@ def require_access(
 
         sub, act, res, ctx = build_env(request)
 
-        decision = await guard.evaluate_async(sub, act, res, ctx)
+        with consistency_token(consistency_token_from(consistency, request)):
+            decision = await guard.evaluate_async(sub, act, res, ctx)
         if decision.allowed:
             return
 
@@ -9,13 +9,22 @@ except Exception:  # pragma: no cover
     request = None  # type: ignore
 
 from ..core.engine import Guard
-from ._common import EnvBuilder
+from ..core.relctx import consistency_token
+from ._common import ConsistencySource, EnvBuilder, consistency_token_from
 
 
 def require_access(
-    guard: Guard, build_env: EnvBuilder, *, add_headers: bool = False
+    guard: Guard,
+    build_env: EnvBuilder,
+    *,
+    add_headers: bool = False,
+    consistency: ConsistencySource | None = None,
 ) -> Callable[..., Any]:
-    """Decorator for Flask view functions to enforce access."""
+    """Decorator for Flask view functions to enforce access.
+
+    ``consistency`` (header name or ``callable(request)``, e.g. reading the session)
+    supplies the consistency token used by ReBAC checks for this view.
+    """
 
     def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(fn)
@@ -28,9 +37,10 @@ def require_access(
             req = request if request is not None else kwargs.get("request")
             sub, act, res, ctx = build_env(req)
 
-            decision = guard.evaluate_sync(sub, act, res, ctx)
-            if decision.allowed:
-                return fn(*args, **kwargs)
+            with consistency_token(consistency_token_from(consistency, req)):
+                decision = guard.evaluate_sync(sub, act, res, ctx)
+                if decision.allowed:
+                    return fn(*args, **kwargs)
 
             # Do not leak reasons in the body. Optionally expose via headers.
             headers: dict[str, str] = {}
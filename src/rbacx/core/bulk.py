@@ -0,0 +1,319 @@
+"""Column-wise evaluation of one request against many resources.
+
+``evaluate_bulk`` decides one subject/action/context against a
+:class:`~rbacx.core.model.ResourceBatch` (resources of one type given as an id
+column and attribute columns) and returns the result as integer bitmaps: bit
+*i* stands for resource *i*.
+
+Each rule is evaluated once for the whole batch: its resource constraint and
+condition become bitmaps over the rows, combined with ``&``/``|``/``~`` as
+the combining algorithm requires.  A condition node yields two bitmaps, the
+rows where it is true and the rows where it raised a condition error, and is
+only evaluated for the rows that reach it (``and``/``or`` short-circuit per
+row, and a row stops at the rule that decides it), so every row sees exactly
+the evaluations -- including relationship checks and errors -- that
+``evaluate`` would make for that resource alone.  Predicates that do not read
+the resource are evaluated once for the batch.
+
+Rows whose decision carries obligations (and every row of a policy set) are
+reported separately, to be decided by the regular per-request path.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from .model import ResourceBatch
+from .policy import (
+    BINARY_OPS,
+    DATE_OPS,
+    MAX_CONDITION_DEPTH,
+    ConditionDepthError,
+    ConditionTypeError,
+    _eval_rel,
+    _is_strict,
+    _op_between,
+    eval_condition,
+    match_actions,
+    match_resource,
+    operator_of,
+    resolve,
+)
+
+_CONDITION_ERRORS = (ConditionTypeError, ConditionDepthError)
+_ONE = ord("1")
+
+# An operand: (True, column of per-row values) or (False, value shared by all rows)
+_Operand = tuple[bool, Any]
+
+
+def evaluate_bulk(
+    policy: dict[str, Any], env: dict[str, Any], batch: ResourceBatch
+) -> tuple[int, int]:
+    """Evaluate *policy* for every resource of *batch*.
+
+    *env* is the request's environment without the resource (``subject``,
+    ``action``, ``context`` and the ``__strict_types__`` flag, as built by
+    ``Guard``).  Returns ``(permit, recheck)``: the rows permitted, and the
+    rows that must be decided per request instead (their decision carries
+    obligations, or the policy is a policy set).
+    """
+    n = len(batch)
+    everything = (1 << n) - 1
+    if "policies" in policy:
+        return 0, everything
+    rules = policy.get("rules") or []
+    if not isinstance(rules, list):
+        return 0, 0
+    algo = (policy.get("algorithm") or "deny-overrides").lower()
+    cols = _Columns(env, batch)
+    action = env.get("action") or ""
+
+    permit = deny = recheck = 0
+    open_rows = everything  # rows not decided yet (the interpreter stops there)
+    for rule in rules:
+        if not open_rows:
+            break
+        if not match_actions(rule, action):
+            continue
+        rows = cols.resource_mask(rule.get("resource") or {}, open_rows)
+        cond = _rule_condition(rule)
+        if rows and cond is not None:
+            rows, _ = cols.condition(cond, 0, rows)
+        if not rows:
+            continue
+        has_obligations = bool(rule.get("obligations"))
+        if (rule.get("effect") or "permit").lower() == "deny":
+            deny |= rows
+            if algo in ("deny-overrides", "first-applicable"):
+                open_rows &= ~rows
+        else:
+            permit |= rows
+            if has_obligations:
+                recheck |= rows
+            if algo in ("permit-overrides", "first-applicable"):
+                open_rows &= ~rows
+
+    if algo == "deny-overrides":
+        permit &= ~deny
+    elif algo not in ("permit-overrides", "first-applicable"):
+        permit = 0  # unknown algorithms never permit
+    return permit, recheck & permit
+
+
+def _rule_condition(rule: dict[str, Any]) -> Any:
+    """The rule's condition with the ``roles`` shorthand folded in, as ``evaluate`` does."""
+    roles = rule.get("roles")
+    explicit = rule.get("condition")
+    if roles and isinstance(roles, list):
+        roles_cond = {"hasAny": [{"attr": "subject.roles"}, list(roles)]}
+        return {"and": [roles_cond, explicit]} if explicit is not None else roles_cond
+    return explicit
+
+
+class _Columns:
+    """The batch seen as per-row environments, materialized only as needed."""
+
+    def __init__(self, env: dict[str, Any], batch: ResourceBatch) -> None:
+        self.env = env
+        self.batch = batch
+        self.n = len(batch)
+        self.strict = _is_strict(env)
+        self._resources: list[dict[str, Any]] | None = None
+        self._envs: list[dict[str, Any] | None] = [None] * self.n
+
+    # ------------------------------- rows -------------------------------
+
+    def resource(self, i: int) -> dict[str, Any]:
+        if self._resources is None:
+            b = self.batch
+            names = list(b.attrs)
+            columns = [b.attrs[k] for k in names]
+            self._resources = [
+                {"type": b.type, "id": rid, "attrs": dict(zip(names, values, strict=True))}
+                for rid, *values in zip(b.ids, *columns, strict=True)
+            ]
+        return self._resources[i]
+
+    def row_env(self, i: int) -> dict[str, Any]:
+        env = self._envs[i]
+        if env is None:
+            env = self._envs[i] = dict(self.env, resource=self.resource(i))
+        return env
+
+    def resource_mask(self, rdef: Any, rows: int) -> int:
+        strict = self.strict
+        if isinstance(rdef, dict) and rdef.get("id") is None and not _rdef_attrs(rdef):
+            # only the type is checked, and it is the same for every row
+            return rows if match_resource(rdef, {"type": self.batch.type}, strict=strict) else 0
+        return _mask(
+            self.n,
+            (i for i in _indices(rows) if match_resource(rdef, self.resource(i), strict=strict)),
+        )
+
+    # ------------------------------- operands -------------------------------
+
+    def operand(self, token: Any) -> _Operand:
+        if not (isinstance(token, dict) and "attr" in token):
+            return False, token
+        path = str(token["attr"]).split(".")
+        if path[0] != "resource":
+            return False, resolve(token, self.env)
+        b = self.batch
+        if len(path) == 1:
+            return True, [self.resource(i) for i in range(self.n)]
+        head, rest = path[1], path[2:]
+        column: Sequence[Any]
+        if head == "type":
+            return False, _walk(b.type, rest)
+        if head == "id":
+            column = b.ids
+        elif head == "attrs" and rest:
+            got = b.attrs.get(rest[0])
+            if got is None:
+                return False, None
+            column, rest = got, rest[1:]
+        elif head == "attrs":
+            return True, [self.resource(i)["attrs"] for i in range(self.n)]
+        else:
+            return False, None
+        if not rest:
+            return True, column
+        return True, [_walk(v, rest) for v in column]
+
+    # ------------------------------- conditions -------------------------------
+
+    def condition(self, cond: Any, depth: int, reach: int) -> tuple[int, int]:
+        """``(true, error)`` row masks of *cond* over the rows in *reach*."""
+        if not reach:
+            return 0, 0
+        if depth > MAX_CONDITION_DEPTH:
+            return 0, reach
+        if not isinstance(cond, dict):
+            return (reach if cond else 0), 0
+        op = operator_of(cond)
+        if op is None:
+            return 0, 0
+
+        if op == "rel":
+            expr = cond["rel"]
+            return self._rows(lambda i: _eval_rel(expr, self.row_env(i)), reach)
+
+        if op in ("and", "or"):
+            subs = cond[op]
+            if not isinstance(subs, (list, tuple)):
+                return self._interpreted(cond, depth, reach)
+            is_and = op == "and"
+            pending = reach  # rows still evaluating operands
+            true = errors = 0
+            for c in subs:
+                t, e = self.condition(c, depth + 1, pending)
+                errors |= e
+                if is_and:
+                    pending = t
+                else:
+                    true |= t
+                    pending &= ~(t | e)
+            return (pending if is_and else true), errors
+
+        if op == "not":
+            t, e = self.condition(cond["not"], depth + 1, reach)
+            return reach & ~(t | e), e
+
+        try:
+            a, b = cond[op]
+        except (TypeError, ValueError):
+            return self._interpreted(cond, depth, reach)
+        strict = self.strict
+        fn: Callable[[Any, Any], Any]
+        if op in BINARY_OPS:
+            fn = BINARY_OPS[op]
+        elif op in DATE_OPS:
+            date_op = DATE_OPS[op]
+
+            def fn(x: Any, y: Any) -> Any:
+                return date_op(x, y, strict)
+
+        else:  # between
+            # the range is resolved again inside _op_between: keep it off the resource
+            if _reads_resource(b) or (
+                isinstance(b, (list, tuple)) and any(_reads_resource(x) for x in b)
+            ):
+                return self._interpreted(cond, depth, reach)
+            env = self.env
+
+            def fn(x: Any, y: Any) -> Any:
+                return _op_between(x, y, env, strict)
+
+        return self._binary(fn, self.operand(a), self.operand(b), reach)
+
+    def _binary(
+        self, fn: Callable[[Any, Any], Any], a: _Operand, b: _Operand, reach: int
+    ) -> tuple[int, int]:
+        a_col, a_val = a
+        b_col, b_val = b
+        if not a_col and not b_col:
+            try:
+                ok = fn(a_val, b_val)
+            except _CONDITION_ERRORS:
+                return 0, reach
+            return (reach if ok else 0), 0
+        if a_col and b_col:
+            return self._rows(lambda i: fn(a_val[i], b_val[i]), reach)
+        if a_col:
+            return self._rows(lambda i: fn(a_val[i], b_val), reach)
+        return self._rows(lambda i: fn(a_val, b_val[i]), reach)
+
+    def _interpreted(self, cond: Any, depth: int, reach: int) -> tuple[int, int]:
+        return self._rows(lambda i: eval_condition(cond, self.row_env(i), depth), reach)
+
+    def _rows(self, row: Callable[[int], Any], reach: int) -> tuple[int, int]:
+        """Evaluate *row* for each row in *reach*; other exceptions propagate."""
+        n = self.n
+        true = bytearray(b"0" * n)
+        errors: bytearray | None = None
+        for i in _indices(reach):
+            try:
+                ok = row(i)
+            except _CONDITION_ERRORS:
+                if errors is None:
+                    errors = bytearray(b"0" * n)
+                errors[n - 1 - i] = _ONE
+                continue
+            if ok:
+                true[n - 1 - i] = _ONE
+        return int(true, 2) if n else 0, int(errors, 2) if errors is not None else 0
+
+
+# ------------------------------- helpers -------------------------------
+
+
+def _rdef_attrs(rdef: dict[str, Any]) -> Any:
+    return rdef.get("attrs") or rdef.get("attributes")
+
+
+def _reads_resource(token: Any) -> bool:
+    return isinstance(token, dict) and str(token.get("attr", "")).split(".")[0] == "resource"
+
+
+def _walk(cur: Any, path: Sequence[str]) -> Any:
+    for p in path:
+        if isinstance(cur, dict):
+            cur = cur.get(p)
+        else:
+            cur = getattr(cur, p, None)
+    return cur
+
+
+def _indices(mask: int) -> list[int]:
+    """Positions of the set bits of *mask*, in increasing order."""
+    return [i for i, c in enumerate(bin(mask)[:1:-1]) if c == "1"]
+
+
+def _mask(n: int, indices: Any) -> int:
+    bits = bytearray(b"0" * n)
+    for i in indices:
+        bits[n - 1 - i] = _ONE
+    return int(bits, 2) if n else 0
+
+
+__all__ = ["evaluate_bulk"]
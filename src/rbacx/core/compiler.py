@@ -1,9 +1,16 @@
 from collections.abc import Iterable, Sequence
 from typing import Any
 
+from .conditions import CompiledConditions
+from .discrimination import RuleIndex
+from .policy import RoleBitset
 from .policy import evaluate as evaluate_policy
 from .policyset import decide as decide_policyset
 
+# Rule selections are cached per (action, resource type); the cache is reset
+# when it grows past this many entries.
+_MAX_SELECTIONS = 1024
+
 
 def _actions(rule: dict[str, Any]) -> tuple[str, ...]:
     acts_raw = rule.get("actions")
@@ -158,7 +165,7 @@ def _select_rules(
     return merged
 
 
-def compile(policy: dict[str, Any]) -> Any:
+def compile(policy: dict[str, Any], *, reorder_conditions: bool = False) -> Any:
     """Compile a policy into a fast decision function with correct cross-bucket semantics.
 
     Resource-specificity buckets
@@ -194,7 +201,34 @@ def compile(policy: dict[str, Any]) -> Any:
         * A permit rule at any specificity level correctly overrides a deny
           rule at a more specific level under ``permit-overrides``.
 
-    For policy *sets* the function delegates to ``policyset.decide``.
+    Rule conditions are compiled into call trees
+    (:class:`~rbacx.core.conditions.CompiledConditions`), so operators are
+    dispatched once per policy rather than on every request; each distinct
+    attribute path, and each condition subtree used more than once, is
+    evaluated at most once per decision.  Role sets of the
+    ``roles`` shorthand are encoded as integer bitsets
+    (:class:`~rbacx.core.policy.RoleBitset`); the subject's roles are encoded
+    once per decision and each role-gated rule is matched with a single AND.
+
+    The rule selection of each (action, resource type) is computed once.  When
+    it contains many rules gated on an attribute value (resource ``attrs``
+    constraints or ``attr == literal`` conditions), a
+    :class:`~rbacx.core.discrimination.RuleIndex` maps values to rules, so a
+    request evaluates only the rules its values can match.
+
+    With ``reorder_conditions=True`` the operands of ``and``/``or`` are
+    evaluated cheapest first (comparisons, then membership tests, datetime
+    operators and ``rel`` last) wherever that cannot change a decision, so an
+    expensive relationship check is skipped when a cheaper operand already
+    decides.  It is off by default: a skipped rule's ``reason`` may differ
+    (``condition_mismatch`` / ``condition_type_mismatch``) from the
+    interpreter's, which explain traces use, and relationship checks may run
+    in a different order.
+
+    The returned function has a ``rules_for(action, resource_type)``
+    attribute returning the policy (algorithm and selected rules) it
+    evaluates for such requests.  For policy *sets* the function delegates to
+    ``policyset.decide`` and has no such attribute.
     """
     # PolicySet: delegate to policyset evaluator (no compilation here)
     if "policies" in policy:
@@ -219,13 +253,28 @@ def compile(policy: dict[str, Any]) -> Any:
                 continue
             by_action.setdefault(a, []).append(rule)
 
-    def decide(env: dict[str, Any]) -> dict[str, Any]:
-        action_val = env.get("action")
-        action: str = str(action_val) if action_val is not None else ""
-        res = env.get("resource") or {}
-        _rt = res.get("type")
-        res_type: str | None = None if _rt is None else str(_rt)
+    # One bit per role of the "roles" shorthand; rule masks are keyed by id(rule),
+    # which stays valid because all_rules keeps the rule dicts alive.
+    role_bits: RoleBitset | None = RoleBitset(all_rules)
+    if role_bits is not None and not role_bits.masks:
+        role_bits = None
+
+    # Conditions are compiled once, at the depth they have in their rule (the
+    # roles shorthand nests the explicit condition under an "and"), and together,
+    # so that subtrees repeated across rules are evaluated once per decision.
+    items: list[tuple[int, Any, int]] = []
+    for rule in all_rules:
+        cond = rule.get("condition")
+        if cond is None:
+            continue
+        roles = rule.get("roles")
+        items.append((id(rule), cond, 1 if roles and isinstance(roles, list) else 0))
+    conditions = CompiledConditions(reorder=reorder_conditions)
+    conditions.add_many(items)
+
+    selections: dict[tuple[str, str | None], tuple[list[dict[str, Any]], RuleIndex | None]] = {}
 
+    def select(action: str, res_type: str | None) -> tuple[list[dict[str, Any]], RuleIndex | None]:
         # Build the action-matched candidate list (used for non-first-applicable).
         candidates: list[dict[str, Any]] = []
         seen: set[int] = set()
@@ -241,9 +290,49 @@ def compile(policy: dict[str, Any]) -> Any:
                 seen.add(rid)
 
         selected = _select_rules(all_rules, candidates, res_type, action, algo)
-        compiled_policy = {"algorithm": algo, "rules": selected}
-        return evaluate_policy(compiled_policy, env)
+        return selected, RuleIndex.build(selected, conditions.slots)
+
+    def selection(
+        action: str, res_type: str | None
+    ) -> tuple[list[dict[str, Any]], RuleIndex | None]:
+        key = (action, res_type)
+        hit = selections.get(key)
+        if hit is None:
+            if len(selections) >= _MAX_SELECTIONS:
+                selections.clear()
+            hit = selections[key] = select(action, res_type)
+        return hit
+
+    def rules_for(action: str, res_type: str | None) -> dict[str, Any]:
+        """The policy ``decide`` hands to the interpreter for this action and resource type."""
+        return {"algorithm": algo, "rules": selection(action, res_type)[0]}
+
+    def decide(env: dict[str, Any]) -> dict[str, Any]:
+        action_val = env.get("action")
+        action: str = str(action_val) if action_val is not None else ""
+        res = env.get("resource") or {}
+        _rt = res.get("type")
+        res_type: str | None = None if _rt is None else str(_rt)
 
+        selected, index = selection(action, res_type)
+        if role_bits is None and not len(conditions):
+            if index is not None:
+                selected = index.select(env)
+            return evaluate_policy({"algorithm": algo, "rules": selected}, env)
+        # one attribute memo for the index and the conditions
+        memo = conditions.new_memo()
+        if index is not None:
+            selected = index.select(env, memo)
+        return evaluate_policy(
+            {"algorithm": algo, "rules": selected},
+            env,
+            role_bits=role_bits,
+            conditions=conditions or None,
+            memo=memo,
+        )
+
+    # lets other evaluators (bulk evaluation) decide over the same rules, in the same order
+    decide.rules_for = rules_for  # type: ignore[attr-defined]
     return decide
 
 
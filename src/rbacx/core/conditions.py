@@ -0,0 +1,802 @@
+"""Compile policy conditions into call trees.
+
+``eval_condition`` re-discovers every node's operator on every request by
+testing the condition dict against each operator in turn.  ``compile_condition``
+does that once per policy: each node becomes a closure bound to its operator's
+handler and its compiled children, so evaluation is a direct call tree.
+
+The compile pass also does the work that does not depend on the request:
+
+- attribute paths (``{"attr": "subject.attrs.level"}``) are split once and
+  given slot numbers shared by all conditions of a policy; each distinct path
+  is resolved at most once per decision, into a per-decision memo list;
+- literal datetimes of ``before``/``after``/``between`` are parsed once, and
+  numeric literals of ``>``/``<``/``>=``/``<=`` converted once;
+- literal lists used by ``in``/``hasAny``/``hasAll`` become frozensets, so
+  membership is a hash lookup (with a fallback for unhashable values);
+- literal patterns of ``matches``/``glob`` are checked and compiled once, and
+  literal ``ipInRange`` ranges parsed once into sorted intervals;
+- sub-expressions made only of literals are evaluated once (constant folding),
+  and ``and``/``or`` drop constant operands that cannot change the result;
+- subtrees that occur more than once (in one condition or across the rules of
+  a policy) are hash-consed: each is evaluated at most once per decision and
+  its result, or its type error, is kept in the per-decision memo;
+- optionally (``reorder=True``, opt-in for policies) the operands of ``and``/``or``
+  are sorted by estimated cost, so cheap comparisons run before membership
+  tests, datetime parsing and ``rel`` checks, and can short-circuit them.
+
+Compiled conditions behave exactly like ``eval_condition``: operators are
+recognized the same way (``operator_of``), type errors and the nesting-depth
+guard are raised lazily (only for nodes that are actually reached), and
+shapes the compiler does not handle are delegated to the interpreter.
+
+Reordering keeps rule *decisions* unchanged, not every intermediate outcome.
+An operand is only moved where that cannot change whether the rule matches:
+
+- operands that never raise (``==``, ``!=``, ``rel``, ``in`` against a literal
+  list, constants) can be reordered anywhere, since they are pure booleans;
+- in an ``and`` whose falsity makes the rule not match (reached from the rule
+  condition through ``and`` only), and in an ``or`` negated in such a
+  position, a ``ConditionTypeError`` and a mismatch are the same outcome, so
+  operands that can only raise that are reordered too;
+- anything else (e.g. numeric comparisons, which can overflow, or nodes left
+  to the interpreter) stays in place and operands are not moved across it.
+
+The rule may then be skipped with ``condition_mismatch`` where declaration
+order gives ``condition_type_mismatch`` (or the reverse), and relationship
+checks may run or be skipped in a different order, which is why reordering
+is off unless requested.
+"""
+
+import operator
+from collections.abc import Callable, Hashable, Iterable
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from .iprange import IPRangeSet
+from .patterns import MAX_MATCH_LENGTH, PatternError, compile_pattern
+from .policy import (
+    BINARY_OPS,
+    DATE_OPS,
+    MAX_CONDITION_DEPTH,
+    ConditionDepthError,
+    ConditionTypeError,
+    _eval_rel,
+    _is_strict,
+    _op_between,
+    _parse_dt,
+    eval_condition,
+    operator_of,
+)
+
+#: A compiled condition: ``fn(env, memo) -> bool``; *memo* is the per-decision
+#: list returned by :meth:`CompiledConditions.new_memo`.
+CompiledCondition = Callable[[dict[str, Any], list[Any]], bool]
+_Getter = Callable[[dict[str, Any], list[Any]], Any]
+_DateGetter = Callable[[dict[str, Any], list[Any], bool], datetime]
+
+# (value, error): the outcome of evaluating something that does not depend on env
+_Outcome = tuple[Any, BaseException | None]
+
+_UNSET: Any = object()  # memo slot not resolved yet
+_CONDITION_ERRORS = (ConditionTypeError, ConditionDepthError)
+_COLLECTIONS = (list, tuple, set, frozenset)
+_NUMERIC_CMP: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+_DATE_CMP: dict[str, Callable[[datetime, datetime], bool]] = {
+    "before": operator.lt,
+    "after": operator.gt,
+}
+_STRICT_ENV: dict[str, Any] = {"__strict_types__": True}
+
+# Estimated evaluation cost of a node, used to order and/or operands.
+_COST_CONST = 0
+_COST_COMPARE = 1
+_COST_MEMBERSHIP = 2
+_COST_PATTERN = 3
+_COST_DATETIME = 4
+_COST_REL = 100  # a relationship check may be a network call
+
+# What a node may raise; see the module docstring for how this limits reordering.
+_NEVER = 0  # returns a bool
+_MISMATCH = 1  # ConditionTypeError / ConditionDepthError only
+_ANY = 2  # any exception (e.g. OverflowError from float())
+
+# Position of a node relative to the rule's match (see _Compiler._junction):
+_POS = 1  # raising means "no match", as False does
+_NEG = -1  # raising means "no match", as True does (under a "not")
+_NONE = 0  # raising and returning are not interchangeable
+
+# Operator -> (cost, raises) of compiled leaves
+_LEAF: dict[str, tuple[int, int]] = {
+    "==": (_COST_COMPARE, _NEVER),
+    "!=": (_COST_COMPARE, _NEVER),
+    ">": (_COST_COMPARE, _ANY),
+    "<": (_COST_COMPARE, _ANY),
+    ">=": (_COST_COMPARE, _ANY),
+    "<=": (_COST_COMPARE, _ANY),
+    "startsWith": (_COST_COMPARE, _MISMATCH),
+    "endsWith": (_COST_COMPARE, _MISMATCH),
+    "contains": (_COST_MEMBERSHIP, _MISMATCH),
+    "in": (_COST_MEMBERSHIP, _MISMATCH),
+    "hasAny": (_COST_MEMBERSHIP, _MISMATCH),
+    "hasAll": (_COST_MEMBERSHIP, _MISMATCH),
+    "matches": (_COST_PATTERN, _MISMATCH),
+    "glob": (_COST_PATTERN, _MISMATCH),
+    "ipInRange": (_COST_MEMBERSHIP, _MISMATCH),
+    # lax mode converts epoch numbers, which can overflow
+    "before": (_COST_DATETIME, _ANY),
+    "after": (_COST_DATETIME, _ANY),
+    "between": (_COST_DATETIME, _ANY),
+}
+
+
+class CompiledConditions:
+    """The conditions of a policy's rules, compiled together.
+
+    Conditions are added under a key (the compiler uses ``id(rule)``).  They
+    share attribute slots: every distinct attribute path gets a slot number at
+    compile time, and evaluation fills a per-decision memo list
+    (:meth:`new_memo`) lazily, so a path used by many rules is walked at most
+    once per decision.  Condition subtrees repeated across the conditions
+    passed to one :meth:`add_many` call (or within one condition) get a slot
+    as well, so they are evaluated at most once per decision.
+
+    With ``reorder=True`` the operands of ``and``/``or`` are ordered by
+    estimated cost where that cannot change whether a rule matches (see the
+    module docstring); conditions are then meant to be used as rule conditions
+    only, as ``evaluate`` does.
+    """
+
+    def __init__(self, *, reorder: bool = False) -> None:
+        self._compiler = _Compiler(reorder=reorder)
+        self._by_key: dict[int, CompiledCondition] = {}
+
+    def add(self, key: int, cond: Any, depth: int = 0) -> CompiledCondition:
+        """Compile *cond* as if evaluated by ``eval_condition(cond, env, depth)``."""
+        self._compiler.count(cond, depth)
+        fn = self._by_key[key] = self._compiler.compile(cond, depth)
+        return fn
+
+    def add_many(self, items: Iterable[tuple[int, Any, int]]) -> None:
+        """Compile ``(key, cond, depth)`` items, sharing the subtrees they have in common."""
+        items = list(items)
+        for _, cond, depth in items:
+            self._compiler.count(cond, depth)
+        for key, cond, depth in items:
+            self._by_key[key] = self._compiler.compile(cond, depth)
+
+    def get(self, key: int) -> CompiledCondition | None:
+        return self._by_key.get(key)
+
+    def new_memo(self) -> list[Any]:
+        """Return an empty memo for one decision."""
+        return [_UNSET] * self._compiler.size
+
+    @property
+    def shared(self) -> int:
+        """Number of subtrees evaluated at most once per decision."""
+        return len(self._compiler.shared)
+
+    @property
+    def slots(self) -> dict[tuple[str, ...], int]:
+        """Attribute path -> memo slot."""
+        return self._compiler.slots
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+
+def compile_condition(cond: Any, depth: int = 0) -> Callable[[dict[str, Any]], bool]:
+    """Compile a single condition into ``fn(env) -> bool``.
+
+    Same as ``eval_condition(cond, env, depth)``; each call uses a fresh memo.
+    Policies compile all rule conditions into one :class:`CompiledConditions`.
+    """
+    conditions = CompiledConditions()
+    fn = conditions.add(0, cond, depth)
+    new_memo = conditions.new_memo
+    return lambda env: fn(env, new_memo())
+
+
+class _Const:
+    """A compiled (sub)condition whose outcome does not depend on the request.
+
+    Only strict-types mode can change it (e.g. a literal ISO datetime is
+    accepted in lax mode and rejected in strict mode), so the outcome is kept
+    for both modes; errors are re-raised on every call, like the interpreter.
+    """
+
+    __slots__ = ("lax", "strict")
+
+    def __init__(self, lax: _Outcome, strict: _Outcome | None = None) -> None:
+        self.lax = lax
+        self.strict = lax if strict is None else strict
+
+    @property
+    def fixed(self) -> bool:
+        return self.strict is self.lax
+
+    def __call__(self, env: dict[str, Any], memo: list[Any]) -> Any:
+        value, err = self.lax if self.fixed or not _is_strict(env) else self.strict
+        if err is not None:
+            raise err.with_traceback(None)
+        return value
+
+
+_TRUE = _Const((True, None))
+_FALSE = _Const((False, None))
+
+
+class _Node(NamedTuple):
+    """A compiled node with what the reordering needs to know about it."""
+
+    fn: CompiledCondition
+    cost: int
+    raises: int
+
+
+class _Compiler:
+    """Builds call trees; holds the state shared by a policy's conditions."""
+
+    def __init__(self, *, reorder: bool = False) -> None:
+        self.slots: dict[tuple[str, ...], int] = {}
+        self.reorder = reorder
+        #: memo length: attribute slots and shared-subtree slots
+        self.size = 0
+        # subtree key -> occurrences seen by count(); repeated ones get a memo slot
+        self._counts: dict[Hashable, int] = {}
+        self.shared: dict[Hashable, _Node] = {}
+
+    def compile(self, cond: Any, depth: int) -> CompiledCondition:
+        return self._compile(cond, depth, self._root).fn
+
+    def count(self, cond: Any, depth: int) -> None:
+        """Record the subtrees of *cond*, so that repeated ones are shared by compile()."""
+        self._count(cond, depth, self._root)
+
+    @property
+    def _root(self) -> int:
+        return _POS if self.reorder else _NONE
+
+    def _count(self, cond: Any, depth: int, pos: int) -> None:
+        if not isinstance(cond, dict) or depth > MAX_CONDITION_DEPTH:
+            return
+        key = _subtree_key(cond, depth, pos)
+        if key is None:
+            return
+        seen = self._counts[key] = self._counts.get(key, 0) + 1
+        if seen > 1:
+            return  # its subtrees are evaluated through it
+        op = operator_of(cond)
+        if op in ("and", "or") and isinstance(cond[op], (list, tuple)):
+            inner = _inner_pos(op == "and", pos)
+            for c in cond[op]:
+                self._count(c, depth + 1, inner)
+        elif op == "not":
+            self._count(cond["not"], depth + 1, -pos)
+
+    def _compile(self, cond: Any, depth: int, pos: int) -> _Node:
+        if depth > MAX_CONDITION_DEPTH:
+            return _const(_Const((False, _depth_error())))
+        if not isinstance(cond, dict):
+            return _const(_Const((bool(cond), None)))
+        key = _subtree_key(cond, depth, pos)
+        if key is not None and self._counts.get(key, 0) > 1:
+            node = self.shared.get(key)
+            if node is None:
+                node = self.shared[key] = self._memoized(self._compile_dict(cond, depth, pos))
+            return node
+        return self._compile_dict(cond, depth, pos)
+
+    def _compile_dict(self, cond: dict[str, Any], depth: int, pos: int) -> _Node:
+        try:
+            return self._node(cond, depth, pos)
+        except (TypeError, ValueError):
+            # malformed operands: let the interpreter raise when (and if) the node is reached
+            return _Node(_interpreted(cond, depth), _COST_REL, _ANY)
+
+    def _slot(self) -> int:
+        self.size += 1
+        return self.size - 1
+
+    def _memoized(self, node: _Node) -> _Node:
+        """Evaluate *node* at most once per decision, keeping its result or condition error."""
+        fn = node.fn
+        if isinstance(fn, _Const):
+            return node
+        slot = self._slot()
+
+        def _shared(env: dict[str, Any], memo: list[Any]) -> Any:
+            v = memo[slot]
+            if v is _UNSET:
+                try:
+                    v = memo[slot] = fn(env, memo)
+                except _CONDITION_ERRORS as e:
+                    memo[slot] = e
+                    raise
+            elif isinstance(v, BaseException):
+                raise v.with_traceback(None)
+            return v
+
+        return node._replace(fn=_shared)
+
+    def _node(self, cond: dict[str, Any], depth: int, pos: int) -> _Node:
+        op = operator_of(cond)
+        if op is None:
+            return _const(_FALSE)
+
+        if op == "rel":
+            expr = cond["rel"]
+            ctx = expr.get("ctx") if isinstance(expr, dict) else None
+            raises = _NEVER if ctx is None or isinstance(ctx, dict) else _ANY
+            return _Node(lambda env, memo: _eval_rel(expr, env), _COST_REL, raises)
+
+        if op in BINARY_OPS or op in DATE_OPS or op == "between":
+            a, b = cond[op]
+            if _is_literal(a) and _is_literal(b):
+                if op != "between" or not isinstance(b, (list, tuple)) or all(map(_is_literal, b)):
+                    return _const(_fold(cond, depth))
+            cost, raises = _LEAF.get(op, (_COST_DATETIME, _ANY))
+            if op in BINARY_OPS:
+                if op == "in" and (_is_literal_collection(a) or _is_literal_collection(b)):
+                    raises = _NEVER
+                return _Node(self._binary(op, a, b), cost, raises)
+            if op in DATE_OPS:
+                return _Node(self._date(op, a, b), cost, raises)
+            return _Node(self._between(a, b), cost, raises)
+
+        if op in ("and", "or"):
+            subs = cond[op]
+            if not isinstance(subs, (list, tuple)):
+                return _Node(_interpreted(cond, depth), _COST_REL, _ANY)
+            return self._junction(op == "and", subs, depth, pos)
+
+        inner = self._compile(cond["not"], depth + 1, -pos)
+        f = inner.fn
+        if isinstance(f, _Const) and f.fixed:
+            value, err = f.lax
+            return inner if err is not None else _const(_Const((not value, None)))
+        return _Node(lambda env, memo: not f(env, memo), inner.cost, inner.raises)
+
+    # ------------------------------- operands -------------------------------
+
+    def _getter(self, token: dict[str, Any]) -> _Getter:
+        """``(env, memo) -> value`` for an ``{"attr": "a.b.c"}`` token, memoized per decision."""
+        path = tuple(str(token["attr"]).split("."))
+        slot = self.slots.get(path)
+        if slot is None:
+            slot = self.slots[path] = self._slot()
+        walk = _walker(path)
+
+        def _get(env: dict[str, Any], memo: list[Any]) -> Any:
+            v = memo[slot]
+            if v is _UNSET:
+                v = memo[slot] = walk(env)
+            return v
+
+        return _get
+
+    def _operand(self, token: Any) -> _Getter:
+        if _is_literal(token):
+            return lambda env, memo: token
+        return self._getter(token)
+
+    def _dt_operand(self, token: Any) -> _DateGetter:
+        """``(env, memo, strict) -> datetime``; literals are parsed once per mode."""
+        if not _is_literal(token):
+            get = self._getter(token)
+            return lambda env, memo, strict: _parse_dt(get(env, memo), strict=strict)
+        lax = _outcome(lambda: _parse_dt(token, strict=False))
+        strict_ = _outcome(lambda: _parse_dt(token, strict=True))
+
+        def _literal(env: dict[str, Any], memo: list[Any], strict: bool) -> datetime:
+            value, err = strict_ if strict else lax
+            if err is not None:
+                raise err.with_traceback(None)
+            return value  # type: ignore[no-any-return]
+
+        return _literal
+
+    # ------------------------------- operators -------------------------------
+
+    def _binary(self, op: str, a: Any, b: Any) -> CompiledCondition:
+        special = _SPECIAL.get(op)
+        if special is not None:
+            node = special(self, op, a, b)
+            if node is not None:
+                return node
+        fn = BINARY_OPS[op]
+        if _is_literal(b):
+            get_a = self._getter(a)
+            return lambda env, memo: fn(get_a(env, memo), b)
+        if _is_literal(a):
+            get_b = self._getter(b)
+            return lambda env, memo: fn(a, get_b(env, memo))
+        get_a, get_b = self._getter(a), self._getter(b)
+        return lambda env, memo: fn(get_a(env, memo), get_b(env, memo))
+
+    def _compare(self, op: str, a: Any, b: Any) -> CompiledCondition | None:
+        """``>``/``<``/``>=``/``<=`` against a numeric literal converted once."""
+        cmp = _NUMERIC_CMP[op]
+        lit, other, swap = (b, a, False) if _is_literal(b) else (a, b, True)
+        if not _is_literal(lit) or not _is_number(lit):
+            return None
+        try:
+            lit_f = float(lit)
+        except OverflowError:
+            return None
+        get = self._getter(other)
+
+        def _cmp(env: dict[str, Any], memo: list[Any]) -> bool:
+            v = get(env, memo)
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                raise ConditionTypeError("condition_type_mismatch")
+            return cmp(lit_f, float(v)) if swap else cmp(float(v), lit_f)
+
+        return _cmp
+
+    def _in(self, op: str, a: Any, b: Any) -> CompiledCondition | None:
+        """``in`` with a literal collection on either side, as frozenset lookups."""
+        fallback = BINARY_OPS["in"]
+        fs_b = _frozen(b)
+        if fs_b is not None:
+            get_a = self._getter(a)
+
+            def _in_literal(env: dict[str, Any], memo: list[Any]) -> bool:
+                x1 = get_a(env, memo)
+                try:
+                    if isinstance(x1, _COLLECTIONS):
+                        return not fs_b.isdisjoint(x1)
+                    return x1 in fs_b
+                except TypeError:  # unhashable values: list semantics
+                    return fallback(x1, b)
+
+            return _in_literal
+        fs_a = _frozen(a)
+        if fs_a is not None:
+            get_b = self._getter(b)
+
+            def _literal_in(env: dict[str, Any], memo: list[Any]) -> bool:
+                x2 = get_b(env, memo)
+                try:
+                    if isinstance(x2, _COLLECTIONS):
+                        return not fs_a.isdisjoint(x2)
+                    return x2 in fs_a
+                except TypeError:
+                    return fallback(a, x2)
+
+            return _literal_in
+        return None
+
+    def _has(self, op: str, a: Any, b: Any) -> CompiledCondition | None:
+        """``hasAny``/``hasAll`` with a literal collection on either side."""
+        fallback = BINARY_OPS[op]
+        any_ = op == "hasAny"
+        fs_b = _frozen(b)
+        if fs_b is not None:
+            get_a = self._getter(a)
+
+            def _has_literal(env: dict[str, Any], memo: list[Any]) -> bool:
+                col = get_a(env, memo)
+                if not isinstance(col, _COLLECTIONS):
+                    raise ConditionTypeError("condition_type_mismatch")
+                try:
+                    return not fs_b.isdisjoint(col) if any_ else fs_b.issubset(col)
+                except TypeError:
+                    return fallback(col, b)
+
+            return _has_literal
+        fs_a = _frozen(a)
+        if fs_a is not None:
+            get_b = self._getter(b)
+
+            def _literal_has(env: dict[str, Any], memo: list[Any]) -> bool:
+                items = get_b(env, memo)
+                if not isinstance(items, _COLLECTIONS):
+                    raise ConditionTypeError("condition_type_mismatch")
+                try:
+                    return not fs_a.isdisjoint(items) if any_ else fs_a.issuperset(items)
+                except TypeError:
+                    return fallback(a, items)
+
+            return _literal_has
+        return None
+
+    def _pattern(self, op: str, a: Any, b: Any) -> CompiledCondition | None:
+        """``matches``/``glob`` against a literal pattern compiled once."""
+        if not _is_literal(b) or not isinstance(b, str):
+            return None
+        try:
+            fullmatch = compile_pattern(op, b).fullmatch
+        except PatternError:
+            return None  # the interpreter raises a type error when reached
+        get_a = self._getter(a)
+
+        def _match(env: dict[str, Any], memo: list[Any]) -> bool:
+            v = get_a(env, memo)
+            if not isinstance(v, str) or len(v) > MAX_MATCH_LENGTH:
+                raise ConditionTypeError("condition_type_mismatch")
+            return fullmatch(v) is not None
+
+        return _match
+
+    def _ip_range(self, op: str, a: Any, b: Any) -> CompiledCondition | None:
+        """``ipInRange`` against literal ranges parsed once."""
+        if not _is_literal(b):
+            return None
+        ranges_b = [b] if isinstance(b, str) else b
+        if not isinstance(ranges_b, (list, tuple)) or not all(isinstance(r, str) for r in ranges_b):
+            return None
+        try:
+            ranges = IPRangeSet(ranges_b)
+        except ValueError:
+            return None  # the interpreter raises a type error when reached
+        get_a = self._getter(a)
+
+        def _ip_in_range(env: dict[str, Any], memo: list[Any]) -> bool:
+            v = get_a(env, memo)
+            if not isinstance(v, str):
+                raise ConditionTypeError("condition_type_mismatch")
+            try:
+                return v in ranges
+            except ValueError:
+                raise ConditionTypeError("condition_type_mismatch") from None
+
+        return _ip_in_range
+
+    def _date(self, op: str, a: Any, b: Any) -> CompiledCondition:
+        cmp = _DATE_CMP.get(op)
+        if cmp is None:  # pragma: no cover - every DATE_OPS entry has a comparison
+            fn = DATE_OPS[op]
+            get_a, get_b = self._operand(a), self._operand(b)
+            return lambda env, memo: fn(get_a(env, memo), get_b(env, memo), _is_strict(env))
+        d1, d2 = self._dt_operand(a), self._dt_operand(b)
+
+        def _date(env: dict[str, Any], memo: list[Any]) -> bool:
+            strict = _is_strict(env)
+            return cmp(d1(env, memo, strict), d2(env, memo, strict))
+
+        return _date
+
+    def _between(self, a: Any, rng: Any) -> CompiledCondition:
+        d = self._dt_operand(a)
+        if _is_literal(rng) and isinstance(rng, (list, tuple)) and len(rng) == 2:
+            lo, hi = self._dt_operand(rng[0]), self._dt_operand(rng[1])
+
+            def _between(env: dict[str, Any], memo: list[Any]) -> bool:
+                strict = _is_strict(env)
+                # all three parsed before comparing, so a bad bound raises as interpreted
+                the_dt = d(env, memo, strict)
+                start = lo(env, memo, strict)
+                end = hi(env, memo, strict)
+                return start <= the_dt <= end
+
+            return _between
+        get_a, get_rng = self._operand(a), self._operand(rng)
+        return lambda env, memo: _op_between(
+            get_a(env, memo), get_rng(env, memo), env, _is_strict(env)
+        )
+
+    def _junction(self, is_and: bool, subs: Any, depth: int, pos: int) -> _Node:
+        # An "and" at a _POS position stops on False or on an error, and both mean the
+        # rule does not match: its operands may be reordered even if they raise type
+        # errors, and stay at _POS.  Likewise an "or" at a _NEG position.  Elsewhere
+        # an error and a result differ, so only operands that never raise move.
+        free = pos == (_POS if is_and else _NEG)
+        inner_pos = _inner_pos(is_and, pos)
+        # Constants that cannot change the result are dropped; a constant that decides
+        # it (or raises) ends the list, since later operands are never evaluated.
+        nodes: list[_Node] = []
+        for c in subs:
+            node = self._compile(c, depth + 1, inner_pos)
+            f = node.fn
+            if isinstance(f, _Const) and f.fixed:
+                value, err = f.lax
+                if err is None and bool(value) == is_and:
+                    continue
+                nodes.append(node)
+                break
+            nodes.append(node)
+        if not nodes:
+            return _const(_TRUE if is_and else _FALSE)
+        first = nodes[0].fn
+        if len(nodes) == 1 and isinstance(first, _Const) and first.fixed:
+            return nodes[0] if first.lax[1] is not None else _const(_FALSE if is_and else _TRUE)
+        if self.reorder:
+            nodes = _by_cost(nodes, _MISMATCH if free else _NEVER)
+        fns = [n.fn for n in nodes]
+        return _Node(
+            _all(fns) if is_and else _any(fns),
+            sum(n.cost for n in nodes),
+            max(n.raises for n in nodes),
+        )
+
+
+_SPECIAL: dict[str, Callable[[_Compiler, str, Any, Any], CompiledCondition | None]] = {
+    ">": _Compiler._compare,
+    "<": _Compiler._compare,
+    ">=": _Compiler._compare,
+    "<=": _Compiler._compare,
+    "in": _Compiler._in,
+    "hasAny": _Compiler._has,
+    "hasAll": _Compiler._has,
+    "matches": _Compiler._pattern,
+    "glob": _Compiler._pattern,
+    "ipInRange": _Compiler._ip_range,
+}
+
+
+# ------------------------------- helpers -------------------------------
+
+
+def _walker(path: tuple[str, ...]) -> Callable[[dict[str, Any]], Any]:
+    """Return ``env -> value`` for a split attribute path (same walk as ``resolve``)."""
+    if len(path) == 3:
+        p1, p2, p3 = path
+
+        def _walk3(env: dict[str, Any]) -> Any:
+            cur: Any = env.get(p1)
+            cur = cur.get(p2) if isinstance(cur, dict) else getattr(cur, p2, None)
+            return cur.get(p3) if isinstance(cur, dict) else getattr(cur, p3, None)
+
+        return _walk3
+
+    def _walk(env: dict[str, Any]) -> Any:
+        cur: Any = env
+        for p in path:
+            if isinstance(cur, dict):
+                cur = cur.get(p)
+            else:
+                cur = getattr(cur, p, None)
+        return cur
+
+    return _walk
+
+
+def _inner_pos(is_and: bool, pos: int) -> int:
+    """Position of the operands of an ``and``/``or`` at *pos* (see _Compiler._junction)."""
+    return pos if pos == (_POS if is_and else _NEG) else _NONE
+
+
+def _canonical(x: Any) -> tuple[Hashable, int] | None:
+    """``(key, height)`` of a condition subtree; equal keys mean equal subtrees.
+
+    Container types are part of the key (``[1]`` and ``(1,)`` do not compare
+    equal).  Returns None for values that cannot be keyed.
+    """
+    if isinstance(x, dict):
+        items = []
+        height = 0
+        for k, v in x.items():
+            c = _canonical(v)
+            if c is None or not isinstance(k, str):
+                return None
+            items.append((k, c[0]))
+            height = max(height, c[1])
+        items.sort(key=lambda kv: kv[0])
+        return ("dict", tuple(items)), height + 1
+    if isinstance(x, (list, tuple)):
+        keys = []
+        height = 0
+        for v in x:
+            c = _canonical(v)
+            if c is None:
+                return None
+            keys.append(c[0])
+            height = max(height, c[1])
+        return (type(x).__name__, tuple(keys)), height + 1
+    if x is None or isinstance(x, (str, int, float)):
+        return (type(x).__name__, x), 0
+    return None
+
+
+def _subtree_key(cond: dict[str, Any], depth: int, pos: int) -> Hashable | None:
+    c = _canonical(cond)
+    if c is None:
+        return None
+    key, height = c
+    # the position only changes how and/or operands are ordered, and depth only
+    # matters when the nesting-depth guard may trip inside the subtree
+    if operator_of(cond) not in ("and", "or", "not"):
+        pos = _NONE
+    return key, pos, depth if depth + height > MAX_CONDITION_DEPTH else -1
+
+
+def _is_literal(token: Any) -> bool:
+    return not (isinstance(token, dict) and "attr" in token)
+
+
+def _is_literal_collection(token: Any) -> bool:
+    return isinstance(token, _COLLECTIONS) and _is_literal(token)
+
+
+def _frozen(token: Any) -> frozenset[Any] | None:
+    """Literal collection as a frozenset, or None if it is not one (or is unhashable)."""
+    if not isinstance(token, _COLLECTIONS) or not _is_literal(token):
+        return None
+    try:
+        return frozenset(token)
+    except TypeError:
+        return None
+
+
+def _is_number(x: Any) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def _outcome(fn: Callable[[], Any]) -> _Outcome:
+    try:
+        return fn(), None
+    except Exception as e:  # noqa: BLE001 - re-raised lazily by _Const
+        return False, e
+
+
+def _fold(cond: dict[str, Any], depth: int) -> _Const:
+    lax = _outcome(lambda: eval_condition(cond, {}, depth))
+    strict = _outcome(lambda: eval_condition(cond, _STRICT_ENV, depth))
+    if lax[1] is None and strict[1] is None and lax[0] == strict[0]:
+        return _Const(lax)
+    return _Const(lax, strict)
+
+
+def _const(c: _Const) -> _Node:
+    raises = _NEVER
+    for _, err in (c.lax, c.strict):
+        if isinstance(err, (ConditionTypeError, ConditionDepthError)):
+            raises = max(raises, _MISMATCH)
+        elif err is not None:
+            raises = _ANY
+    return _Node(c, _COST_CONST, raises)
+
+
+def _by_cost(nodes: list[_Node], movable: int) -> list[_Node]:
+    """Sort runs of operands raising at most *movable* by cost; the others stay put."""
+    out: list[_Node] = []
+    run: list[_Node] = []
+    for node in nodes:
+        if node.raises <= movable:
+            run.append(node)
+            continue
+        out.extend(sorted(run, key=lambda n: n.cost))
+        out.append(node)
+        run = []
+    out.extend(sorted(run, key=lambda n: n.cost))
+    return out
+
+
+def _all(fns: list[CompiledCondition]) -> CompiledCondition:
+    def _and(env: dict[str, Any], memo: list[Any]) -> bool:
+        for f in fns:
+            if not f(env, memo):
+                return False
+        return True
+
+    return _and
+
+
+def _any(fns: list[CompiledCondition]) -> CompiledCondition:
+    def _or(env: dict[str, Any], memo: list[Any]) -> bool:
+        for f in fns:
+            if f(env, memo):
+                return True
+        return False
+
+    return _or
+
+
+def _interpreted(cond: Any, depth: int) -> CompiledCondition:
+    return lambda env, memo: eval_condition(cond, env, depth)
+
+
+def _depth_error() -> ConditionDepthError:
+    return ConditionDepthError(
+        f"condition tree exceeds maximum nesting depth ({MAX_CONDITION_DEPTH})"
+    )
+
+
+__all__ = ["CompiledCondition", "CompiledConditions", "compile_condition"]
@@ -0,0 +1,223 @@
+"""Discrimination index over equality-gated rules.
+
+Policies generated from templates often consist of many rules that can only
+match one value of some attribute: ``"resource": {"attrs": {"k": 7}}`` or a
+condition ``{"==": [{"attr": "resource.attrs.k"}, 7]}``.  Evaluating them one
+by one is linear in the number of rules.  :class:`RuleIndex` groups such rules
+by the attribute they test and the value they require (a hash map from value
+to rules), so a request only evaluates the rules its attribute values can
+match, plus the rules without such a gate.
+
+A rule is *gated* on an attribute when it cannot match unless the attribute
+has one of the rule's values:
+
+- resource ``attrs`` constraints (with the same lax ``str()`` / strict
+  equality semantics as ``match_resource``);
+- an ``==`` between an attribute and a literal, as the condition itself or as
+  an operand of its (nested) top-level ``and``s, provided no operand evaluated
+  before it can raise anything but a condition type error -- otherwise
+  skipping the rule could hide an exception the interpreter would raise.
+
+Skipping a rule that cannot match only changes the decision's ``reason`` when
+it would have been the last rule evaluated, so the last rule is always kept:
+decisions, rule ids, obligations and reasons are the same as evaluating every
+rule.  Attribute values that the index cannot look up exactly (values other
+than ``str``/``int``/``float``/``bool``/``None``) select every rule gated on
+that attribute.
+"""
+
+import math
+from collections.abc import Callable
+from typing import Any
+
+from .conditions import _LEAF, _MISMATCH, _UNSET, _is_literal, _is_literal_collection, _walker
+from .policy import MAX_CONDITION_DEPTH, _is_strict, operator_of
+
+#: Minimum number of gated rules for an index to be worth its per-request cost.
+MIN_GATED_RULES = 16
+
+# Values whose hashing agrees with ``==`` (dict lookups find exactly the equal keys).
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+_Gate = tuple[str, Any, tuple[Any, ...]]  # (kind, attribute, required values)
+
+
+class RuleIndex:
+    """Rules of one rule selection, indexed by their equality gates.
+
+    Built by :meth:`build` for a list of rules (in evaluation order);
+    :meth:`select` returns the sub-list, in the same order, that a request
+    has to evaluate.  Given the attribute slots of the policy's
+    :class:`~rbacx.core.conditions.CompiledConditions`, attribute values are
+    read through the same per-decision memo as the conditions.
+    """
+
+    __slots__ = ("rules", "_ungated", "_conditions", "_attrs", "_last")
+
+    def __init__(self, rules: list[dict[str, Any]]) -> None:
+        self.rules = rules
+        self._last = len(rules) - 1
+        self._ungated: list[int] = []
+        # path -> (walk, memo slot, value -> positions, all positions gated on the path)
+        self._conditions: dict[
+            tuple[str, ...],
+            tuple[Callable[[dict[str, Any]], Any], int | None, dict[Any, list[int]], list[int]],
+        ] = {}
+        # resource attribute -> (lax str(value) -> positions, strict value -> positions, all)
+        self._attrs: dict[str, tuple[dict[str, list[int]], dict[Any, list[int]], list[int]]] = {}
+
+    @classmethod
+    def build(
+        cls, rules: list[dict[str, Any]], slots: dict[tuple[str, ...], int] | None = None
+    ) -> "RuleIndex | None":
+        """Index *rules*, or return None when too few of them are gated."""
+        index = cls(rules)
+        gated = 0
+        for pos, rule in enumerate(rules):
+            gate = _gate(rule)
+            if gate is None or pos == index._last:
+                index._ungated.append(pos)
+                continue
+            gated += 1
+            kind, name, values = gate
+            if kind == "attr":
+                lax, strict, every = index._attrs.setdefault(name, ({}, {}, []))
+                for v in values:
+                    _add(lax, str(v), pos)
+                    _add(strict, v, pos)
+            else:
+                path = tuple(name.split("."))
+                entry = index._conditions.get(path)
+                if entry is None:
+                    slot = slots.get(path) if slots is not None else None
+                    entry = index._conditions[path] = (_walker(path), slot, {}, [])
+                _, _, table, every = entry
+                for v in values:
+                    _add(table, v, pos)
+            every.append(pos)
+        return index if gated >= MIN_GATED_RULES else None
+
+    def select(self, env: dict[str, Any], memo: list[Any] | None = None) -> list[dict[str, Any]]:
+        """Return the rules that can match *env*, in evaluation order."""
+        keep = list(self._ungated)
+        for walk, slot, table, every in self._conditions.values():
+            if slot is None or memo is None:
+                v = walk(env)
+            else:
+                v = memo[slot]
+                if v is _UNSET:
+                    v = memo[slot] = walk(env)
+            if type(v) in _PRIMITIVES:
+                keep.extend(table.get(v, ()))
+            else:
+                keep.extend(every)
+        if self._attrs:
+            res = env.get("resource") or {}
+            res_attrs = res.get("attrs") or res.get("attributes") or {}
+            if isinstance(res_attrs, dict):
+                strict = _is_strict(env)
+                for name, (lax, strict_table, every) in self._attrs.items():
+                    if name not in res_attrs:
+                        continue  # match_resource rejects a missing attribute
+                    rv = res_attrs[name]
+                    if strict:
+                        if type(rv) in _PRIMITIVES:
+                            keep.extend(strict_table.get(rv, ()))
+                        else:
+                            keep.extend(every)
+                        continue
+                    try:
+                        key = str(rv)
+                    except Exception:  # noqa: BLE001 - let the interpreter see it
+                        keep.extend(every)
+                        continue
+                    keep.extend(lax.get(key, ()))
+        keep.sort()
+        rules = self.rules
+        return [rules[i] for i in keep]
+
+
+def _add(table: dict[Any, list[int]], value: Any, pos: int) -> None:
+    bucket = table.setdefault(value, [])
+    if not bucket or bucket[-1] != pos:
+        bucket.append(pos)
+
+
+def _is_key(value: Any) -> bool:
+    """A literal that can be looked up exactly (NaN never equals anything)."""
+    return type(value) in _PRIMITIVES and not (isinstance(value, float) and math.isnan(value))
+
+
+def _gate(rule: Any) -> _Gate | None:
+    if not isinstance(rule, dict):
+        return None
+    rdef = rule.get("resource") or {}
+    if isinstance(rdef, dict):
+        r_attrs = rdef.get("attrs") or rdef.get("attributes") or {}
+        if isinstance(r_attrs, dict):
+            # every attribute constraint must hold; any indexable one gates the rule
+            for name, v in r_attrs.items():
+                values = tuple(v) if isinstance(v, list) else (v,)
+                if isinstance(name, str) and values and all(_is_key(x) for x in values):
+                    return "attr", name, values
+    cond = rule.get("condition")
+    if cond is None:
+        return None
+    roles = rule.get("roles")
+    # the roles shorthand (a hasAny, which only raises type errors) comes first
+    found = _condition_gate(cond, 1 if roles and isinstance(roles, list) else 0)
+    return ("condition", *found) if found is not None else None
+
+
+def _condition_gate(cond: Any, depth: int) -> tuple[str, tuple[Any, ...]] | None:
+    """First ``attr == literal`` that *cond* requires, reached before anything that may abort."""
+    if depth > MAX_CONDITION_DEPTH or not isinstance(cond, dict):
+        return None
+    op = operator_of(cond)
+    if op == "==":
+        args = cond["=="]
+        if isinstance(args, (list, tuple)) and len(args) == 2:
+            a, b = args
+            if not _is_literal(a) and _is_literal(b) and _is_key(b):
+                return str(a["attr"]), (b,)
+            if not _is_literal(b) and _is_literal(a) and _is_key(a):
+                return str(b["attr"]), (a,)
+        return None
+    if op == "and" and isinstance(cond["and"], (list, tuple)):
+        for c in cond["and"]:
+            found = _condition_gate(c, depth + 1)
+            if found is not None:
+                return found
+            if not _cannot_abort(c, depth + 1):
+                return None
+    return None
+
+
+def _cannot_abort(cond: Any, depth: int) -> bool:
+    """True if evaluating *cond* raises nothing but condition type/depth errors."""
+    if depth > MAX_CONDITION_DEPTH or not isinstance(cond, dict):
+        return True
+    op = operator_of(cond)
+    if op is None:
+        return True
+    if op == "rel":
+        expr = cond["rel"]
+        return (
+            not isinstance(expr, dict)
+            or expr.get("ctx") is None
+            or isinstance(expr.get("ctx"), dict)
+        )
+    args = cond[op]
+    if op in ("and", "or"):
+        return isinstance(args, (list, tuple)) and all(_cannot_abort(c, depth + 1) for c in args)
+    if op == "not":
+        return _cannot_abort(args, depth + 1)
+    if not isinstance(args, (list, tuple)) or len(args) != 2:
+        return False
+    if op == "in" and (_is_literal_collection(args[0]) or _is_literal_collection(args[1])):
+        return True
+    leaf = _LEAF.get(op)
+    return leaf is not None and leaf[1] <= _MISMATCH
+
+
+__all__ = ["MIN_GATED_RULES", "RuleIndex"]
@@ -9,10 +9,11 @@ from collections.abc import Callable, Sequence
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, ClassVar
 
+from .bulk import evaluate_bulk
 from .cache import AbstractCache
 from .decision import Decision, RuleTrace
 from .helpers import maybe_await
-from .model import Action, Context, Resource, Subject
+from .model import Action, Context, Resource, ResourceBatch, Subject
 from .obligations import BasicObligationChecker
 from .policy import decide as decide_policy
 from .policyset import decide as decide_policyset
@@ -23,7 +24,7 @@ from .ports import (
     RelationshipChecker,
     RoleResolver,
 )
-from .relctx import EVAL_LOOP, REL_CHECKER, REL_LOCAL_CACHE
+from .relctx import CONSISTENCY_TOKEN, EVAL_LOOP, REL_CHECKER, REL_DEADLINE, REL_LOCAL_CACHE
 
 try:
     # optional compile step to speed up decision making
@@ -100,6 +101,8 @@ class Guard:
         cache: AbstractCache | None = None,
         cache_ttl: int | None = 300,
         strict_types: bool = False,
+        decision_timeout: float | None = None,
+        reorder_conditions: bool = False,
     ) -> None:
         self.policy: dict[str, Any] = policy
         self.logger_sink = logger_sink
@@ -113,6 +116,12 @@ class Guard:
         self._compiled: Callable[[dict[str, Any]], dict[str, Any]] | None = None
         self.strict_types: bool = bool(strict_types)
         self.relationship_checker = relationship_checker
+        # Time budget (seconds) for ReBAC calls made while deciding one request;
+        # exposed to checkers through the REL_DEADLINE context variable.
+        self.decision_timeout: float | None = decision_timeout
+        # Opt-in: let the compiler evaluate and/or operands cheapest first (see
+        # compiler.compile); it may change Decision.reason and the order of rel checks.
+        self.reorder_conditions: bool = bool(reorder_conditions)
         # Registry of executable obligation handlers.
         # Keys are obligation type strings; values are sync or async callables.
         self._obligation_handlers: dict[str, Any] = {}
@@ -218,7 +227,20 @@ class Guard:
         etag = getattr(self, "policy_etag", None)
         if not etag:
             return None
-        return f"{etag}:{self._normalize_env_for_cache(env)}"
+        key = f"{etag}:{self._normalize_env_for_cache(env)}"
+        token = CONSISTENCY_TOKEN.get()
+        if token:
+            # decisions cached without the token may predate the caller's own writes
+            key = f"{key}|ct={token}"
+        return key
+
+    def _deadline(self) -> float | None:
+        """Absolute ReBAC deadline for a new decision (an enclosing one is never extended)."""
+        outer = REL_DEADLINE.get()
+        if self.decision_timeout is None:
+            return outer
+        mine = time.monotonic() + float(self.decision_timeout)
+        return mine if outer is None else min(outer, mine)
 
     # ---------------------------------------------------------------- decision core (async only)
 
@@ -253,6 +275,21 @@ class Guard:
         finally:
             EVAL_LOOP.reset(token)
 
+    async def _expand_roles(self, subject: Subject) -> Sequence[str]:
+        """The subject's roles as seen by policies (resolver may be sync or async)."""
+        direct: list[str] = list(subject.roles or [])
+        roles: Sequence[str] = direct
+        if self.role_resolver is not None:
+            try:
+                expand_subject = getattr(self.role_resolver, "expand_subject", None)
+                if expand_subject is not None:
+                    roles = await maybe_await(expand_subject(subject.id, direct))
+                else:
+                    roles = await maybe_await(self.role_resolver.expand(direct))
+            except Exception:
+                logger.exception("RBACX: role resolver failed", exc_info=True)
+        return roles
+
     # ---------------------------------------------------------------- evaluation core (single source of truth)
 
     async def _evaluate_core_async(
@@ -267,12 +304,7 @@ class Guard:
         start = _now()
 
         # Build env (resolver may be sync or async)
-        roles: list[str] = list(subject.roles or [])
-        if self.role_resolver is not None:
-            try:
-                roles = await maybe_await(self.role_resolver.expand(roles))
-            except Exception:
-                logger.exception("RBACX: role resolver failed", exc_info=True)
+        roles = await self._expand_roles(subject)
         env: dict[str, Any] = {
             "subject": {"id": subject.id, "roles": roles, "attrs": dict(subject.attrs or {})},
             "action": action.name,
@@ -308,11 +340,13 @@ class Guard:
             # Make ReBAC provider and a per-decision local cache available to policy code
             _t1 = REL_CHECKER.set(self.relationship_checker)
             _t2 = REL_LOCAL_CACHE.set({})
+            _t3 = REL_DEADLINE.set(self._deadline())
             try:
                 raw = await self._decide_async(env)
             finally:
                 REL_CHECKER.reset(_t1)
                 REL_LOCAL_CACHE.reset(_t2)
+                REL_DEADLINE.reset(_t3)
 
             if cache is not None:
                 try:
@@ -678,6 +712,125 @@ class Guard:
         fut = Guard._executor.submit(_runner)
         return fut.result()
 
+    # ---------------------------------------------------------------- bulk APIs
+
+    async def evaluate_bulk_async(
+        self,
+        subject: Subject,
+        action: Action,
+        resources: ResourceBatch,
+        context: Context | None = None,
+    ) -> int:
+        """Decide one request against every resource of a batch.
+
+        Returns a permit bitmap: bit *i* is set when ``resources`` row *i*
+        is allowed, exactly as :meth:`evaluate_async` would decide for that
+        resource alone (``resources.permitted(bitmap)`` lists their ids).
+
+        Each rule is evaluated once over the whole batch (see
+        :mod:`rbacx.core.bulk`), with one role expansion and one ReBAC local
+        cache for the call.  Rows whose decision carries obligations, all
+        rows when a custom obligation checker is configured, and every row of
+        a policy set are decided through :meth:`evaluate_async` instead, so
+        obligations and their handlers apply as usual.  The decision cache
+        and the decision log are not used for the other rows.
+        """
+        n = len(resources)
+        if n == 0:
+            return 0
+        roles = await self._expand_roles(subject)
+        env: dict[str, Any] = {
+            "subject": {"id": subject.id, "roles": roles, "attrs": dict(subject.attrs or {})},
+            "action": action.name,
+            "context": dict(getattr(context, "attrs", {}) or {}),
+        }
+        if self.strict_types:
+            env["__strict_types__"] = True
+
+        # the compiled decision function's rule selection and order, as evaluate_async uses
+        policy = self.policy
+        rules_for = getattr(self._compiled, "rules_for", None)
+        if rules_for is not None:
+            policy = rules_for(action.name, resources.type)
+
+        _t1 = REL_CHECKER.set(self.relationship_checker)
+        _t2 = REL_LOCAL_CACHE.set({})
+        _t3 = REL_DEADLINE.set(self._deadline())
+        _t4 = EVAL_LOOP.set(asyncio.get_running_loop())
+        try:
+            permit, recheck = await asyncio.to_thread(evaluate_bulk, policy, env, resources)
+        finally:
+            EVAL_LOOP.reset(_t4)
+            REL_CHECKER.reset(_t1)
+            REL_LOCAL_CACHE.reset(_t2)
+            REL_DEADLINE.reset(_t3)
+        if type(self.obligations) is not BasicObligationChecker:
+            recheck |= permit  # a custom checker may deny any permit
+
+        if recheck:
+            rows = [i for i, bit in enumerate(bin(recheck)[:1:-1]) if bit == "1"]
+            names = list(resources.attrs)
+            decisions = await asyncio.gather(
+                *(
+                    self._evaluate_core_async(
+                        subject,
+                        action,
+                        Resource(
+                            resources.type,
+                            resources.ids[i],
+                            {k: resources.attrs[k][i] for k in names},
+                        ),
+                        context,
+                    )
+                    for i in rows
+                )
+            )
+            permit &= ~recheck
+            for i, d in zip(rows, decisions, strict=True):
+                if d.allowed:
+                    permit |= 1 << i
+
+        if self.metrics is not None:
+            try:
+                observe = getattr(self.metrics, "observe", None)
+                if observe is not None:
+                    if inspect.iscoroutinefunction(observe):
+                        await observe("rbacx_batch_size", float(n))
+                    else:
+                        observe("rbacx_batch_size", float(n))
+            except Exception:
+                logger.exception("RBACX: metrics.observe(rbacx_batch_size) failed")
+
+        return permit
+
+    def evaluate_bulk_sync(
+        self,
+        subject: Subject,
+        action: Action,
+        resources: ResourceBatch,
+        context: Context | None = None,
+    ) -> int:
+        """Synchronous wrapper for :meth:`evaluate_bulk_async`.
+
+        Uses the same loop-detection strategy as :meth:`evaluate_sync`.
+        """
+        try:
+            asyncio.get_running_loop()
+            loop_running = True
+        except RuntimeError:
+            loop_running = False
+
+        if not loop_running:
+            return asyncio.run(self.evaluate_bulk_async(subject, action, resources, context))
+
+        def _runner() -> int:
+            return asyncio.run(self.evaluate_bulk_async(subject, action, resources, context))
+
+        if Guard._executor is None:
+            Guard._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rbacx-sync")
+        fut = Guard._executor.submit(_runner)
+        return fut.result()
+
     # convenience
 
     def is_allowed_sync(
@@ -709,6 +862,8 @@ class Guard:
             # compile if compiler available
             try:
                 if compile_policy is not None:
-                    self._compiled = compile_policy(self.policy)
+                    self._compiled = compile_policy(
+                        self.policy, reorder_conditions=self.reorder_conditions
+                    )
             except Exception:
                 self._compiled = None
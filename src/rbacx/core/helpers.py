@@ -1,4 +1,5 @@
 import asyncio
+import concurrent.futures
 import inspect
 from asyncio import AbstractEventLoop
 from typing import Any, Awaitable
@@ -29,5 +30,10 @@ def resolve_awaitable_in_worker(
     """
     if inspect.isawaitable(x):
         fut = asyncio.run_coroutine_threadsafe(_await_compat(x), loop)
-        return fut.result(timeout=timeout)
+        try:
+            return fut.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # do not leave the abandoned call running on the loop
+            fut.cancel()
+            raise
     return x
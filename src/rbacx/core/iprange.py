@@ -0,0 +1,83 @@
+"""Address ranges of the ``ipInRange`` operator.
+
+``{"ipInRange": [address, ranges]}`` is true when the IPv4/IPv6 *address*
+string lies in one of *ranges*: a CIDR string (``"10.0.0.0/8"``, ``"::1"``) or
+a list of them.  Host bits of a CIDR are ignored (``"10.1.2.3/8"`` is
+``10.0.0.0/8``), and an IPv4-mapped IPv6 address (``::ffff:10.0.0.1``) also
+matches the IPv4 ranges.
+
+:class:`IPRangeSet` parses the ranges once into sorted, merged intervals of
+integers per address family, so a membership test is a binary search: its cost
+grows with the logarithm of the number of ranges.
+"""
+
+import ipaddress
+from bisect import bisect_right
+from collections.abc import Iterable
+
+_Intervals = tuple[list[int], list[int]]  # (sorted starts, matching ends), disjoint
+
+
+class IPRangeSet:
+    """A set of IPv4/IPv6 networks, for logarithmic membership tests.
+
+    Raises ``ValueError`` for a range that is not a valid address or CIDR.
+    """
+
+    __slots__ = ("_v4", "_v6")
+
+    def __init__(self, ranges: Iterable[str]) -> None:
+        v4: list[tuple[int, int]] = []
+        v6: list[tuple[int, int]] = []
+        for r in ranges:
+            net = ipaddress.ip_network(r, strict=False)
+            bounds = (int(net.network_address), int(net.broadcast_address))
+            (v4 if net.version == 4 else v6).append(bounds)
+        self._v4 = _merge(v4)
+        self._v6 = _merge(v6)
+
+    def __contains__(self, address: str) -> bool:
+        """True if *address* is in the set; ``ValueError`` if it is not an IP address."""
+        ip = ipaddress.ip_address(address)
+        if ip.version == 4:
+            return _find(self._v4, int(ip))
+        mapped = ip.ipv4_mapped  # type: ignore[union-attr]
+        return _find(self._v6, int(ip)) or (mapped is not None and _find(self._v4, int(mapped)))
+
+    def __len__(self) -> int:
+        """Number of disjoint intervals the ranges merged into."""
+        return len(self._v4[0]) + len(self._v6[0])
+
+
+def range_error(ranges: object) -> str | None:
+    """Return why *ranges* is not a usable ``ipInRange`` operand, or None if it is."""
+    if isinstance(ranges, str):
+        ranges = [ranges]
+    if not isinstance(ranges, (list, tuple)) or not all(isinstance(r, str) for r in ranges):
+        return "ranges must be a string or a list of strings"
+    try:
+        IPRangeSet(ranges)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def _merge(bounds: list[tuple[int, int]]) -> _Intervals:
+    starts: list[int] = []
+    ends: list[int] = []
+    for lo, hi in sorted(bounds):
+        if ends and lo <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], hi)
+        else:
+            starts.append(lo)
+            ends.append(hi)
+    return starts, ends
+
+
+def _find(intervals: _Intervals, x: int) -> bool:
+    starts, ends = intervals
+    i = bisect_right(starts, x) - 1
+    return i >= 0 and x <= ends[i]
+
+
+__all__ = ["IPRangeSet", "range_error"]
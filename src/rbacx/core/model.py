@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -24,3 +25,50 @@ class Action:
 @dataclass(frozen=True, slots=True)
 class Context:
     attrs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceBatch:
+    """Resources of one type in columnar form, for ``Guard.evaluate_bulk_*``.
+
+    Row *i* is the resource ``Resource(type, ids[i], {k: attrs[k][i] for k in attrs})``:
+    every attribute column has one value per id.  Decisions over a batch are
+    bitmaps, where bit *i* is set when resource *i* is permitted.
+    """
+
+    type: str
+    ids: list[str | None]
+    attrs: dict[str, list[Any]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for name, column in self.attrs.items():
+            if len(column) != len(self.ids):
+                raise ValueError(
+                    f"attribute column {name!r} has {len(column)} values for {len(self.ids)} ids"
+                )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_resources(cls, resources: Sequence[Resource]) -> "ResourceBatch":
+        """Build a batch from resources sharing one type and one set of attribute names."""
+        if not resources:
+            raise ValueError("cannot build a ResourceBatch from no resources")
+        rtype = resources[0].type
+        names = list(resources[0].attrs or {})
+        for r in resources:
+            if r.type != rtype:
+                raise ValueError(f"resource types differ: {rtype!r} and {r.type!r}")
+            if set(r.attrs or {}) != set(names):
+                raise ValueError("resources have different attribute names")
+        return cls(
+            type=rtype,
+            ids=[r.id for r in resources],
+            attrs={k: [r.attrs[k] for r in resources] for k in names},
+        )
+
+    def permitted(self, bitmap: int) -> list[str | None]:
+        """Ids of the rows whose bit is set in *bitmap*."""
+        bits = bin(bitmap)[:1:-1]  # lowest bit first
+        return [rid for rid, bit in zip(self.ids, bits, strict=False) if bit == "1"]
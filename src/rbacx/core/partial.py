@@ -0,0 +1,437 @@
+"""Partial evaluation of a policy for query pushdown.
+
+:func:`partial_evaluate` decides a policy for a known subject, action and
+context while treating the resource (``resource.*``) as unknown.  Everything
+that does not depend on the resource is evaluated, and what remains is a
+*residual* condition in the policy condition language -- ``True``, ``False``,
+or a condition over ``resource.*`` -- that permits exactly the resources
+``evaluate`` permits::
+
+    residual = partial_evaluate(policy, env, resource_type="doc")
+    eval_condition(residual, {**env, "resource": resource})  # == decision is permit
+
+Resources are compared as typed values, the way a database column holds them:
+the residual assumes every attribute the policy reads is present and holds
+values of the type the policy compares it with, and that ``resource.type`` and
+``resource.id`` are strings.  (Lax-mode resource constraints compare with
+``str()``; for values of the literal's type that is plain equality.)  For a
+resource on which evaluating the residual raises a condition error -- e.g. a
+``NULL`` compared with ``>`` -- the decision is not determined by the residual
+and the resource must be treated as denied.
+
+:func:`to_sql` renders residuals made of simple operators (``==``, ``!=``,
+ordering comparisons, ``in`` over literals, ``and``/``or``/``not``) as a
+parameterized SQL ``WHERE`` clause, so the database filters with its indexes.
+
+Relationship checks (``rel``) stay in the residual as they are; obligations are
+not part of the decision computed here.
+"""
+
+import math
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from .bulk import _rule_condition
+from .policy import (
+    MAX_CONDITION_DEPTH,
+    ConditionDepthError,
+    ConditionTypeError,
+    _is_strict,
+    eval_condition,
+    match_actions,
+    operator_of,
+    resolve,
+)
+
+Residual = bool | dict[str, Any]
+
+# (true, false, total): the residuals under which a condition evaluates to True and to
+# False without error; ``total`` when no folded error makes "false" differ from "not true"
+_Parts = tuple[Residual, Residual, bool]
+
+_ERROR: _Parts = (False, False, False)
+_ORDERING = {">": "<", "<": ">", ">=": "<=", "<=": ">="}  # operator -> flipped
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def partial_evaluate(
+    policy: dict[str, Any], env: dict[str, Any], *, resource_type: str | None = None
+) -> Residual:
+    """Return the residual condition under which *policy* permits a resource.
+
+    *env* holds the known part of the request (``subject``, ``action``,
+    ``context``, ``__strict_types__``); its ``resource``, if any, is ignored.
+    With *resource_type*, the resource type is known too and rules for other
+    types are dropped.  Only single policies are supported (``ValueError``
+    for policy sets).
+    """
+    if "policies" in policy:
+        raise ValueError("partial evaluation supports single policies, not policy sets")
+    return _Partial(env, resource_type).policy(policy)
+
+
+class _Partial:
+    def __init__(self, env: dict[str, Any], resource_type: str | None) -> None:
+        self.env = {k: v for k, v in env.items() if k != "resource"}
+        self.resource_type = resource_type
+        if resource_type is not None:
+            self.env["resource"] = {"type": resource_type}
+        self.strict = _is_strict(env)
+
+    # ------------------------------- policy -------------------------------
+
+    def policy(self, policy: dict[str, Any]) -> Residual:
+        rules = policy.get("rules") or []
+        if not isinstance(rules, list):
+            return False
+        algo = (policy.get("algorithm") or "deny-overrides").lower()
+        action = self.env.get("action") or ""
+        matches: list[tuple[bool, Residual]] = []  # (is_permit, rule applies)
+        for rule in rules:
+            if not match_actions(rule, action):
+                continue
+            applies = self.resource(rule.get("resource") or {})
+            cond = _rule_condition(rule)
+            if applies is not False and cond is not None:
+                applies = _and([applies, self.condition(cond, 0)[0]])
+            if applies is not False:
+                matches.append(((rule.get("effect") or "permit").lower() != "deny", applies))
+
+        permits = [m for is_permit, m in matches if is_permit]
+        denies = [m for is_permit, m in matches if not is_permit]
+        if algo == "deny-overrides":
+            return _and([_or(permits), _not(_or(denies))])
+        if algo == "permit-overrides":
+            return _or(permits)
+        if algo == "first-applicable":
+            # the first applicable rule decides: M1 ? e1 : (M2 ? e2 : ... deny)
+            out: Residual = False
+            for is_permit, m in reversed(matches):
+                out = _or([m, out]) if is_permit else _and([_not(m), out])
+            return out
+        return False
+
+    def resource(self, rdef: Any) -> Residual:
+        """Residual of ``match_resource(rdef, resource)``."""
+        if not isinstance(rdef, dict):
+            return False
+        parts: list[Residual] = []
+        r_type = rdef.get("type")
+        if r_type is not None:
+            allowed = list(r_type) if isinstance(r_type, list) else [r_type]
+            if "*" not in {str(x) for x in allowed}:
+                if self.strict:
+                    if not all(isinstance(x, str) for x in allowed):
+                        return False
+                    names = allowed
+                else:
+                    names = [str(x) for x in allowed]
+                if self.resource_type is not None:
+                    if self.resource_type not in names:
+                        return False
+                else:
+                    parts.append({"in": [{"attr": "resource.type"}, names]})
+        r_id = rdef.get("id")
+        if r_id is not None:
+            parts.append({"==": [{"attr": "resource.id"}, r_id if self.strict else str(r_id)]})
+        r_attrs = rdef.get("attrs") or rdef.get("attributes") or {}
+        if isinstance(r_attrs, dict):
+            for k, v in r_attrs.items():
+                token = {"attr": f"resource.attrs.{k}"}
+                parts.append(
+                    {"in": [token, list(v)]} if isinstance(v, list) else {"==": [token, v]}
+                )
+        return _and(parts)
+
+    # ------------------------------- conditions -------------------------------
+
+    def condition(self, cond: Any, depth: int) -> _Parts:
+        if depth > MAX_CONDITION_DEPTH:
+            return _ERROR
+        if not isinstance(cond, dict):
+            return (True, False, True) if cond else (False, True, True)
+        op = operator_of(cond)
+        if op is None:
+            return False, True, True
+        if op == "rel":
+            return _unknown({"rel": cond["rel"]})
+        if op in ("and", "or"):
+            subs = cond[op]
+            if not isinstance(subs, Iterable):
+                return _ERROR
+            return self._junction(op == "and", [self.condition(c, depth + 1) for c in subs])
+        if op == "not":
+            t, f, total = self.condition(cond["not"], depth + 1)
+            return f, t, total
+        return self._leaf(op, cond[op], depth)
+
+    def _junction(self, is_and: bool, parts: list[_Parts]) -> _Parts:
+        if all(total for _, _, total in parts):
+            # evaluation order matters here: an operand that raises hides the ones after it
+            out = (_and if is_and else _or)([t for t, _, _ in parts], ordered=True)
+            return out, _not(out), True
+        # operands are evaluated in order until one decides (false for and, true for or)
+        decided: list[Residual] = []
+        passed: list[Residual] = []  # residuals of the operands so far not deciding
+        for t, f, _ in parts:
+            mine, other = (f, t) if is_and else (t, f)
+            decided.append(_and([*passed, mine]))
+            passed.append(other)
+        if is_and:
+            return _and(passed), _or(decided), False
+        return _or(decided), _and(passed), False
+
+    def _leaf(self, op: str, args: Any, depth: int) -> _Parts:
+        try:
+            a, b = args
+        except (TypeError, ValueError):
+            return _unknown({op: args})  # raises when reached, as evaluate does
+        tokens = [a, b]
+        if op == "between":
+            # the range's bounds are resolved once more by _op_between
+            b = self._known(b)
+            if isinstance(b, (list, tuple)):
+                tokens.extend(b)
+                b = [self._known(x) for x in b]
+        if not any(self._is_unknown(t) for t in tokens):
+            try:
+                ok = eval_condition({op: [a, b]}, self.env, depth)
+            except (ConditionTypeError, ConditionDepthError):
+                return _ERROR
+            except Exception:  # noqa: BLE001 - keep it, to raise where evaluate would
+                return _unknown({op: [self._known(a), self._known(b)]})
+            return (True, False, True) if ok else (False, True, True)
+        return _unknown({op: [self._known(a), self._known(b)]})
+
+    def _is_unknown(self, token: Any) -> bool:
+        if not (isinstance(token, dict) and "attr" in token):
+            return False
+        path = str(token["attr"]).split(".")
+        if path[0] != "resource":
+            return False
+        return not (self.resource_type is not None and path[1:2] == ["type"])
+
+    def _known(self, token: Any) -> Any:
+        """*token* with its value substituted when it is known."""
+        if not (isinstance(token, dict) and "attr" in token) or self._is_unknown(token):
+            return token
+        value = resolve(token, self.env)
+        if isinstance(value, dict) and "attr" in value:
+            return token  # a literal would read as an attribute reference
+        return value
+
+
+def _unknown(leaf: dict[str, Any]) -> _Parts:
+    return leaf, {"not": leaf}, True
+
+
+def _and(parts: Iterable[Residual], *, ordered: bool = False) -> Residual:
+    return _junction("and", parts, ordered)
+
+
+def _or(parts: Iterable[Residual], *, ordered: bool = False) -> Residual:
+    return _junction("or", parts, ordered)
+
+
+def _junction(op: str, parts: Iterable[Residual], ordered: bool) -> Residual:
+    """Fold constants into an and/or of residuals.
+
+    With *ordered*, the operands keep the interpreter's semantics, where an
+    operand that raises hides the ones after it: a deciding constant then
+    only absorbs the operands before it when none of them can raise.
+    """
+    unit = op == "and"  # the constant that is dropped; ``not unit`` decides
+    out: list[Any] = []
+    for p in parts:
+        if p is unit:
+            continue
+        if p is (not unit):
+            if ordered and any(_can_raise(x) for x in out):
+                out.append(p)
+                break
+            return not unit
+        if isinstance(p, dict) and list(p) == [op]:
+            out.extend(p[op])
+        else:
+            out.append(p)
+    if not out:
+        return unit
+    return out[0] if len(out) == 1 else {op: out}
+
+
+def _can_raise(residual: Any) -> bool:
+    if isinstance(residual, bool):
+        return False
+    op = operator_of(residual)
+    args = residual.get(op) if op is not None else None
+    if op in ("and", "or") and isinstance(args, list):
+        return any(_can_raise(c) for c in args)
+    if op == "not":
+        return _can_raise(args)
+    if op in ("==", "!=") and isinstance(args, list) and len(args) == 2:
+        return False
+    if op == "in" and isinstance(args, list) and len(args) == 2:
+        return not any(isinstance(x, (list, tuple, set, frozenset)) for x in args)
+    return True
+
+
+def _not(p: Residual) -> Residual:
+    if isinstance(p, bool):
+        return not p
+    if list(p) == ["not"]:
+        return p["not"]  # type: ignore[no-any-return]
+    return {"not": p}
+
+
+# ------------------------------- SQL -------------------------------
+
+
+def to_sql(
+    residual: Residual,
+    columns: Mapping[str, str] | None = None,
+    *,
+    placeholder: str = "?",
+) -> tuple[str, list[Any]]:
+    """Render *residual* as a SQL ``WHERE`` clause and its parameters.
+
+    *columns* maps attribute paths (``"resource.attrs.owner"``) to SQL
+    column expressions, which are inserted verbatim.  Without it,
+    ``resource.id``, ``resource.type`` and ``resource.attrs.<name>`` map to
+    the column of that name (names must be plain identifiers).  Values are
+    always passed as parameters, written as *placeholder*.
+
+    Equality and ``in`` treat ``NULL`` like ``None``.  A ``NULL`` compared
+    with ``<``/``>``/``<=``/``>=`` is a type error for ``evaluate``, which
+    denies; such a comparison is guarded by ``IS NOT NULL`` where it is
+    rendered, and ``and``/``or``/``not`` keep the evaluation order, so a row is
+    selected only where the residual evaluates to true without an error.
+    Raises ``ValueError`` for operators and operands that have no SQL
+    rendering here (``rel``, string and collection operators, comparisons
+    between two columns).
+    """
+    renderer = _SQL(columns, placeholder)
+    return renderer.render(residual), renderer.params
+
+
+class _SQL:
+    def __init__(self, columns: Mapping[str, str] | None, placeholder: str) -> None:
+        self.columns = columns
+        self.placeholder = placeholder
+        self.params: list[Any] = []
+
+    def render(self, node: Any, negated: bool = False) -> str:
+        """SQL that holds where *node* evaluates, without an error, to ``not negated``."""
+        if isinstance(node, bool):
+            return "1 = 1" if node is not negated else "1 = 0"
+        if not isinstance(node, dict):
+            raise ValueError(f"cannot render residual {node!r} as SQL")
+        op = operator_of(node)
+        if op == "not":
+            return self.render(node["not"], not negated)
+        if negated and not _sql_can_raise(node):
+            return f"NOT ({self.render(node)})"
+        if op in ("and", "or") and isinstance(node[op], list):
+            children = node[op]
+            if not children:
+                return self.render(op == "and", negated)
+            if (op == "and") is not negated:
+                # every child must come out the same way
+                parts = [self.render(c, negated) for c in children]
+                return "(" + " AND ".join(parts) + ")"
+            # the first child that decides, after the ones before it did not
+            # (a child that cannot raise needs no "did not decide" guard)
+            terms = []
+            for i, child in enumerate(children):
+                before = [self.render(c, not negated) for c in children[:i] if _sql_can_raise(c)]
+                term = [*before, self.render(child, negated)]
+                terms.append(term[0] if len(term) == 1 else "(" + " AND ".join(term) + ")")
+            return "(" + " OR ".join(terms) + ")"
+        args = node.get(op) if op is not None else None
+        if not isinstance(args, (list, tuple)) or len(args) != 2:
+            raise ValueError(f"cannot render condition {node!r} as SQL")
+        a, b = args
+        if op in ("==", "!="):
+            col, value = self._column_and_value(a, b, node)
+            if value is None:
+                return f"{col} IS NULL" if op == "==" else f"{col} IS NOT NULL"
+            p = self._param(value, node)
+            return (
+                f"({col} IS NOT NULL AND {col} = {p})"
+                if op == "=="
+                else f"({col} IS NULL OR {col} <> {p})"
+            )
+        if op in _ORDERING:
+            if not _is_token(a):
+                a, b, op = b, a, _ORDERING[op]
+            col, value = self._column_and_value(a, b, node)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"cannot render condition {node!r} as SQL")
+            cmp = f"{col} {op} {self._param(value, node)}"
+            return f"({col} IS NOT NULL AND {f'NOT ({cmp})' if negated else cmp})"
+        if op == "in" and _is_token(a) and isinstance(b, (list, tuple, set, frozenset)):
+            col = self._column(a, node)
+            values = list(b)
+            present = [v for v in values if v is not None]
+            parts = []
+            if len(present) != len(values):
+                parts.append(f"{col} IS NULL")
+            if present:
+                marks = ", ".join(self._param(v, node) for v in present)
+                in_list = f"{col} IN ({marks})"
+                parts.append(in_list if parts else f"({col} IS NOT NULL AND {in_list})")
+            if not parts:
+                return self.render(False)
+            return parts[0] if len(parts) == 1 else "(" + " OR ".join(parts) + ")"
+        raise ValueError(f"cannot render condition {node!r} as SQL")
+
+    def _column_and_value(self, a: Any, b: Any, node: Any) -> tuple[str, Any]:
+        if _is_token(a) and not _is_token(b):
+            return self._column(a, node), b
+        if _is_token(b) and not _is_token(a):
+            return self._column(b, node), a
+        raise ValueError(f"cannot render condition {node!r} as SQL")
+
+    def _column(self, token: dict[str, Any], node: Any) -> str:
+        path = str(token["attr"])
+        if self.columns is not None:
+            col = self.columns.get(path)
+        else:
+            parts = path.split(".")
+            name = None
+            if parts[:1] == ["resource"] and len(parts) == 2 and parts[1] in ("id", "type"):
+                name = parts[1]
+            elif parts[:2] == ["resource", "attrs"] and len(parts) == 3:
+                name = parts[2]
+            col = name if name is not None and _IDENTIFIER.match(name) else None
+        if col is None:
+            raise ValueError(f"no SQL column for {path!r} in {node!r}")
+        return col
+
+    def _param(self, value: Any, node: Any) -> str:
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise ValueError(f"cannot render value {value!r} of {node!r} as SQL")
+        if isinstance(value, float) and math.isnan(value):
+            raise ValueError(f"cannot render NaN in {node!r} as SQL")
+        self.params.append(value)
+        return self.placeholder
+
+
+def _sql_can_raise(node: Any) -> bool:
+    """Whether *node* holds an ordering comparison, a type error on ``NULL``."""
+    if not isinstance(node, dict):
+        return False
+    op = operator_of(node)
+    args = node.get(op) if op is not None else None
+    if op in ("and", "or") and isinstance(args, list):
+        return any(_sql_can_raise(c) for c in args)
+    if op == "not":
+        return _sql_can_raise(args)
+    return op in _ORDERING
+
+
+def _is_token(x: Any) -> bool:
+    return isinstance(x, dict) and "attr" in x
+
+
+__all__ = ["Residual", "partial_evaluate", "to_sql"]
@@ -0,0 +1,335 @@
+"""Patterns of the ``matches`` (regular expression) and ``glob`` operators.
+
+Both operators test a whole string: ``{"matches": [value, pattern]}`` is true
+when the regular expression *pattern* matches all of *value*
+(``re.fullmatch``), ``{"glob": [value, pattern]}`` when the shell-style
+pattern does (``*``, ``?``, ``[seq]``, ``[!seq]``; case-sensitive, and ``*``
+also matches ``/``).
+
+Patterns may come from policies loaded from external sources, so they are
+checked before use (:func:`compile_pattern`):
+
+- a pattern is at most :data:`MAX_PATTERN_LENGTH` characters long;
+- regular expressions must not contain backreferences (``\\1``,
+  ``(?P=name)``), nor variable-length parts that can split the same text in
+  many ways: two repetitions that can match the same character must be
+  separated by a required character the first cannot match (``.*.*``,
+  ``\\d+\\d*``, ``.*x.*`` and ``a?a?`` are refused, ``[^/]+/.*`` is not),
+  and a repeated group must not be able to run into its own next iteration
+  nor hold alternatives that match the same text (``(a+)+``, ``(a|aa)*``,
+  ``(a|a)*`` and ``(x{1,3})*`` are refused,
+  ``[a-z]+(\\.[a-z]+)*`` is not).  The check is syntactic and errs on the
+  side of rejecting; a "contains" test is best written as a glob
+  (``*text*``);
+- glob patterns are translated by :func:`fnmatch.translate`, whose output
+  does not backtrack catastrophically.
+
+Values longer than :data:`MAX_MATCH_LENGTH` characters are not matched (the
+operators raise a type error, which fails closed): an accepted pattern may
+still scan the value once per position of a repetition.
+"""
+
+import fnmatch
+import re
+from collections.abc import Iterator
+from typing import Any
+
+try:  # the standard library's regular expression parser
+    from re import _constants as _sre  # type: ignore[attr-defined]
+    from re import _parser as _sre_parse  # type: ignore[attr-defined]
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_constants as _sre  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+#: Maximum length of a ``matches``/``glob`` pattern, in characters.
+MAX_PATTERN_LENGTH: int = 1024
+
+#: Maximum length of a value tested by ``matches``/``glob``, in characters.
+MAX_MATCH_LENGTH: int = 1024
+
+#: Operators taking a pattern as their second operand.
+PATTERN_OPS: tuple[str, ...] = ("matches", "glob")
+
+# items of Python 3.11+ that never backtrack once matched
+_ATOMIC_GROUP = getattr(_sre, "ATOMIC_GROUP", None)
+_POSSESSIVE_REPEAT = getattr(_sre, "POSSESSIVE_REPEAT", None)
+
+# character sets are compared over these and the characters of the pattern
+_UNIVERSE = frozenset(range(256)) | frozenset(map(ord, "\u0100\u0416\u0663\u2003\u4e2d\U0001f600"))
+_CATEGORIES = {
+    f"CATEGORY_{name}": re.compile(expr)
+    for name, expr in (
+        ("DIGIT", r"\d"),
+        ("NOT_DIGIT", r"\D"),
+        ("SPACE", r"\s"),
+        ("NOT_SPACE", r"\S"),
+        ("WORD", r"\w"),
+        ("NOT_WORD", r"\W"),
+    )
+}
+
+
+class PatternError(ValueError):
+    """Raised for a ``matches``/``glob`` pattern that is invalid or unsafe."""
+
+
+def compile_pattern(op: str, pattern: str) -> re.Pattern[str]:
+    """Check and compile the pattern of a ``matches`` (*op*) or ``glob`` condition.
+
+    The returned expression is meant for ``fullmatch``.  Raises
+    :class:`PatternError` when the pattern is too long, not a valid regular
+    expression, or may backtrack catastrophically.
+    """
+    if op not in PATTERN_OPS:
+        raise PatternError(f"not a pattern operator: {op!r}")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise PatternError(f"pattern longer than {MAX_PATTERN_LENGTH} characters")
+    if op == "glob":
+        return re.compile(fnmatch.translate(pattern))
+    _check_backtracking(pattern)
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise PatternError(f"invalid regular expression: {e}") from e
+
+
+def pattern_error(op: str, pattern: Any) -> str | None:
+    """Return why *pattern* cannot be used with *op*, or None if it can."""
+    if not isinstance(pattern, str):
+        return "pattern must be a string"
+    try:
+        compile_pattern(op, pattern)
+    except PatternError as e:
+        return str(e)
+    return None
+
+
+def iter_patterns(cond: Any, ops: tuple[str, ...] = PATTERN_OPS) -> Iterator[tuple[str, Any]]:
+    """Yield ``(operator, second operand)`` for each test of *ops* in a condition tree.
+
+    By default the tests are the pattern operators; other operators whose
+    second operand is compiled at load (e.g. ``ipInRange``) can be given.
+    Walks ``and``/``or``/``not`` iteratively, so arbitrarily deep (invalid)
+    trees are safe to inspect.
+    """
+    stack = [cond]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        for op in ops:
+            args = node.get(op)
+            if isinstance(args, (list, tuple)) and len(args) == 2:
+                yield op, args[1]
+        for op in ("and", "or"):
+            subs = node.get(op)
+            if isinstance(subs, (list, tuple)):
+                stack.extend(reversed(subs))
+        if "not" in node:
+            stack.append(node["not"])
+
+
+def _check_backtracking(pattern: str) -> None:
+    """Reject backreferences, and repetitions that can split the same text in many ways."""
+    try:
+        parsed = _sre_parse.parse(pattern)
+        universe = _UNIVERSE | {ord(c) for c in pattern}
+        _Checker(universe).seq(parsed, [], bool(parsed.state.flags & re.IGNORECASE))
+    except re.error as e:
+        raise PatternError(f"invalid regular expression: {e}") from e
+    except RecursionError:
+        raise PatternError("pattern nested too deeply") from None
+
+
+class _Checker:
+    """One pass over a parsed expression, tracking the repetitions still *open*.
+
+    A variable-length repetition stays open until a required character it
+    cannot match follows it; until then, where it stops is not fixed by the
+    text.  Another variable-length part (repetition, optional group, or
+    alternation with overlapping branches) that can start with a character an
+    open repetition matches could take text from it, so the matcher may try
+    every split of the text between the two: the pattern is rejected.  A
+    repeated group is checked against its own next iteration the same way, must
+    not match the empty string, and must not contain alternatives that can
+    match the same text.  Character sets are approximated over
+    Latin-1, the characters of the pattern, and a few others.
+    """
+
+    def __init__(self, universe: frozenset[int]) -> None:
+        self.universe = universe
+        self.loops = 0  # repeats (of more than one iteration) around the current item
+
+    def seq(self, items: Any, open_: list[frozenset[int]], fold: bool) -> list[frozenset[int]]:
+        """Check a sequence; return the repetitions open after it."""
+        for op, av in items:
+            open_ = self.item(op, av, open_, fold)
+        return open_
+
+    def item(
+        self, op: Any, av: Any, open_: list[frozenset[int]], fold: bool
+    ) -> list[frozenset[int]]:
+        chars = self.chars(op, av, fold)
+        if chars is not None:  # a required character closes the repetitions it cannot match
+            return [r for r in open_ if not r.isdisjoint(chars)]
+        if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT):
+            return self.repeat(av, open_, fold)
+        if op == _sre.SUBPATTERN:
+            _, add, drop, body = av
+            return self.seq(body, open_, _ignorecase(fold, add, drop))
+        if op == _sre.BRANCH:
+            after: list[frozenset[int]] = []
+            for alt in av[1]:
+                after += self.seq(alt, open_, fold)
+            # two alternatives may match the same text if they can start alike or
+            # both match the empty string (what "(a|a)" leaves once its prefix is factored)
+            seen: set[int] = set()
+            empty = 0
+            overlap = False
+            for alt in av[1]:
+                first = self.first(alt, fold)
+                overlap = overlap or not seen.isdisjoint(first)
+                empty += not self.min(alt)
+                seen |= first
+            if self.loops and (overlap or empty > 1):
+                raise PatternError("ambiguous alternation may backtrack catastrophically")
+            if overlap or empty:
+                after.append(_vary(frozenset(seen), open_))
+            return _unique(after)
+        if op in (_sre.GROUPREF, _sre.GROUPREF_EXISTS):
+            raise PatternError("backreferences are not allowed")
+        if op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            self.seq(av[1], [], fold)
+            return open_
+        if op == _ATOMIC_GROUP:  # checked on its own: the matcher does not backtrack into it
+            self.seq(av, [], fold)
+        elif op == _POSSESSIVE_REPEAT:
+            self.repeat(av, [], fold)
+        else:  # anchors
+            return open_
+        if not self.min_item(op, av):
+            return open_
+        first = self.first_item(op, av, fold)
+        return [r for r in open_ if not r.isdisjoint(first)]
+
+    def repeat(self, av: Any, open_: list[frozenset[int]], fold: bool) -> list[frozenset[int]]:
+        lo, hi, body = av
+        if not hi:
+            return open_
+        first = self.first(body, fold)
+        self.loops += hi > 1
+        try:
+            after = self.seq(body, open_, fold)
+        finally:
+            self.loops -= hi > 1
+        if hi > 1 and (not self.min(body) or any(not r.isdisjoint(first) for r in after)):
+            raise PatternError("ambiguous repetition may backtrack catastrophically")
+        if lo == hi:
+            return after
+        if lo:
+            return [*after, first]
+        return [*_unique([*open_, *after]), _vary(first, open_)]
+
+    def chars(self, op: Any, av: Any, fold: bool) -> frozenset[int] | None:
+        """The characters a single-character item matches, or None for other items."""
+        if op == _sre.LITERAL:
+            return _fold({av}) if fold else frozenset((av,))
+        if op == _sre.NOT_LITERAL:
+            return self.universe - (_fold({av}) if fold else {av})
+        if op == _sre.ANY:
+            return self.universe
+        if op != _sre.IN:
+            return None
+        negate = False
+        out: set[int] = set()
+        for iop, iav in av:
+            if iop == _sre.NEGATE:
+                negate = True
+            elif iop == _sre.LITERAL:
+                out.add(iav)
+            elif iop == _sre.RANGE:
+                lo, hi = iav
+                out.update(c for c in self.universe if lo <= c <= hi)
+                out.update(iav)
+            elif iop == _sre.CATEGORY and str(iav) in _CATEGORIES:
+                test = _CATEGORIES[str(iav)].fullmatch
+                out.update(c for c in self.universe if test(chr(c)))
+            else:
+                return self.universe
+        chars = _fold(out) if fold else frozenset(out)
+        return self.universe - chars if negate else chars
+
+    def first(self, items: Any, fold: bool) -> frozenset[int]:
+        """The characters a match of the sequence can start with."""
+        out: set[int] = set()
+        for op, av in items:
+            out |= self.first_item(op, av, fold)
+            if self.min_item(op, av):
+                break
+        return frozenset(out)
+
+    def first_item(self, op: Any, av: Any, fold: bool) -> frozenset[int]:
+        chars = self.chars(op, av, fold)
+        if chars is not None:
+            return chars
+        if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _POSSESSIVE_REPEAT):
+            return self.first(av[2], fold) if av[1] else frozenset()
+        if op == _sre.SUBPATTERN:
+            return self.first(av[3], _ignorecase(fold, av[1], av[2]))
+        if op == _sre.BRANCH:
+            return frozenset().union(*(self.first(alt, fold) for alt in av[1]))
+        if op == _ATOMIC_GROUP:
+            return self.first(av, fold)
+        return frozenset()
+
+    def min(self, items: Any) -> int:
+        """Minimum length of a match of the sequence."""
+        return sum(self.min_item(op, av) for op, av in items)
+
+    def min_item(self, op: Any, av: Any) -> int:
+        if op in (_sre.LITERAL, _sre.NOT_LITERAL, _sre.ANY, _sre.IN):
+            return 1
+        if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT, _POSSESSIVE_REPEAT):
+            return int(av[0] * self.min(av[2]))
+        if op == _sre.SUBPATTERN:
+            return self.min(av[3])
+        if op == _sre.BRANCH:
+            return min(self.min(alt) for alt in av[1])
+        if op == _ATOMIC_GROUP:
+            return self.min(av)
+        return 0
+
+
+def _vary(first: frozenset[int], open_: list[frozenset[int]]) -> frozenset[int]:
+    """Check a variable-length part starting with *first* against the open repetitions."""
+    if any(not r.isdisjoint(first) for r in open_):
+        raise PatternError("ambiguous repetition may backtrack catastrophically")
+    return first
+
+
+def _unique(sets: list[frozenset[int]]) -> list[frozenset[int]]:
+    return list(dict.fromkeys(sets))
+
+
+def _fold(chars: set[int]) -> frozenset[int]:
+    out = set(chars)
+    for c in chars:
+        for v in (chr(c).lower(), chr(c).upper()):
+            if len(v) == 1:
+                out.add(ord(v))
+    return frozenset(out)
+
+
+def _ignorecase(fold: bool, add: int, drop: int) -> bool:
+    return bool((fold or add & re.IGNORECASE) and not drop & re.IGNORECASE)
+
+
+__all__ = [
+    "MAX_MATCH_LENGTH",
+    "MAX_PATTERN_LENGTH",
+    "PATTERN_OPS",
+    "PatternError",
+    "compile_pattern",
+    "iter_patterns",
+    "pattern_error",
+]
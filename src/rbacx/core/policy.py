@@ -1,11 +1,19 @@
 import json
 import logging
-from collections.abc import Iterable, Sequence
+import operator
+import re
+from collections.abc import Callable, Iterable, Sequence
 from datetime import datetime, timezone
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 from .helpers import resolve_awaitable_in_worker
-from .relctx import EVAL_LOOP, REL_CHECKER, REL_LOCAL_CACHE
+from .iprange import IPRangeSet
+from .patterns import MAX_MATCH_LENGTH, PatternError, compile_pattern
+from .relctx import EVAL_LOOP, REL_CHECKER, REL_LOCAL_CACHE, bounded_timeout
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .conditions import CompiledConditions
 
 logger = logging.getLogger("rbacx.policy")
 
@@ -214,9 +222,295 @@ def _as_collection(x: Any) -> Sequence[Any]:
     raise ConditionTypeError("condition_type_mismatch")
 
 
+class RoleBitset:
+    """Roles of the ``roles`` shorthand encoded as bits of an integer.
+
+    Built once per compiled policy: every distinct role named by a rule's
+    ``roles`` list gets a bit and every such rule a mask, so the shorthand is
+    matched against the subject's (expanded) roles with a single AND instead
+    of a ``hasAny`` scan.  Rules whose role list cannot be encoded (unhashable
+    entries) keep the ``hasAny`` path.
+    """
+
+    __slots__ = ("bits", "masks")
+
+    def __init__(self, rules: Iterable[Any]) -> None:
+        self.bits: dict[Any, int] = {}
+        #: ``id(rule)`` -> mask of the roles the rule accepts
+        self.masks: dict[int, int] = {}
+        for rule in rules:
+            roles = rule.get("roles") if isinstance(rule, dict) else None
+            if not roles or not isinstance(roles, list):
+                continue
+            mask = 0
+            try:
+                for role in roles:
+                    bit = self.bits.get(role)
+                    if bit is None:
+                        bit = self.bits[role] = 1 << len(self.bits)
+                    mask |= bit
+            except TypeError:
+                continue
+            self.masks[id(rule)] = mask
+
+    def encode(self, roles: Any) -> int | None:
+        """Return the mask of *roles*, or None when the shorthand must use ``hasAny``."""
+        if not isinstance(roles, (list, tuple, set, frozenset)):
+            return None  # hasAny raises the type error
+        bits = self.bits
+        mask = 0
+        try:
+            for role in roles:
+                mask |= bits.get(role, 0)
+        except TypeError:
+            return None
+        return mask
+
+
 # ------------------------------- conditions -------------------------------
 
 
+def _op_gt(a: Any, b: Any) -> bool:
+    n1, n2 = _ensure_numeric_strict(a, b)
+    return n1 > n2
+
+
+def _op_lt(a: Any, b: Any) -> bool:
+    n1, n2 = _ensure_numeric_strict(a, b)
+    return n1 < n2
+
+
+def _op_ge(a: Any, b: Any) -> bool:
+    n1, n2 = _ensure_numeric_strict(a, b)
+    return n1 >= n2
+
+
+def _op_le(a: Any, b: Any) -> bool:
+    n1, n2 = _ensure_numeric_strict(a, b)
+    return n1 <= n2
+
+
+def _op_contains(x1: Any, x2: Any) -> bool:
+    if isinstance(x1, (list, tuple, set, frozenset)):
+        return x2 in x1
+    if isinstance(x1, str) and isinstance(x2, str):
+        return x2 in x1
+    raise ConditionTypeError("condition_type_mismatch")
+
+
+def _op_in(x1: Any, x2: Any) -> bool:
+    # collections vs collections → overlap; otherwise standard membership
+    if isinstance(x1, (list, tuple, set, frozenset)) and isinstance(
+        x2, (list, tuple, set, frozenset)
+    ):
+        return any(val in x1 for val in x2)
+    if isinstance(x2, (list, tuple, set, frozenset)):
+        return x1 in x2
+    if isinstance(x1, (list, tuple, set, frozenset)):
+        return x2 in x1
+    if isinstance(x1, str) and isinstance(x2, str):
+        return x1 in x2
+    raise ConditionTypeError("condition_type_mismatch")
+
+
+def _op_has_all(a: Any, b: Any) -> bool:
+    col = _as_collection(a)
+    needed = _as_collection(b)
+    return all(x in col for x in needed)
+
+
+def _op_has_any(a: Any, b: Any) -> bool:
+    col = _as_collection(a)
+    options = _as_collection(b)
+    return any(x in col for x in options)
+
+
+def _op_starts_with(a: Any, b: Any) -> bool:
+    s1, s2 = _ensure_str(a, b)
+    return s1.startswith(s2)
+
+
+def _op_ends_with(a: Any, b: Any) -> bool:
+    s1, s2 = _ensure_str(a, b)
+    return s1.endswith(s2)
+
+
+@lru_cache(maxsize=256)
+def _pattern(op: str, pattern: str) -> re.Pattern[str] | None:
+    """Compiled pattern of a ``matches``/``glob`` condition, None if it is unusable."""
+    try:
+        return compile_pattern(op, pattern)
+    except PatternError:
+        return None
+
+
+def _op_pattern(op: str, a: Any, b: Any) -> bool:
+    value, pattern = _ensure_str(a, b)
+    compiled = _pattern(op, pattern)
+    if compiled is None or len(value) > MAX_MATCH_LENGTH:
+        raise ConditionTypeError("condition_type_mismatch")
+    return compiled.fullmatch(value) is not None
+
+
+def _op_matches(a: Any, b: Any) -> bool:
+    return _op_pattern("matches", a, b)
+
+
+def _op_glob(a: Any, b: Any) -> bool:
+    return _op_pattern("glob", a, b)
+
+
+@lru_cache(maxsize=64)
+def _ip_ranges(ranges: tuple[str, ...]) -> IPRangeSet | None:
+    """Parsed ranges of an ``ipInRange`` condition, None if one is invalid."""
+    try:
+        return IPRangeSet(ranges)
+    except ValueError:
+        return None
+
+
+def _op_ip_in_range(a: Any, b: Any) -> bool:
+    if isinstance(b, str):
+        b = (b,)
+    if not isinstance(a, str) or not isinstance(b, (list, tuple)):
+        raise ConditionTypeError("condition_type_mismatch")
+    if not all(isinstance(r, str) for r in b):
+        raise ConditionTypeError("condition_type_mismatch")
+    ranges = _ip_ranges(tuple(b))
+    if ranges is None:
+        raise ConditionTypeError("condition_type_mismatch")
+    try:
+        return a in ranges
+    except ValueError:
+        raise ConditionTypeError("condition_type_mismatch") from None
+
+
+def _op_before(a: Any, b: Any, strict: bool) -> bool:
+    return _parse_dt(a, strict=strict) < _parse_dt(b, strict=strict)
+
+
+def _op_after(a: Any, b: Any, strict: bool) -> bool:
+    return _parse_dt(a, strict=strict) > _parse_dt(b, strict=strict)
+
+
+def _op_between(value: Any, rng_val: Any, env: dict[str, Any], strict: bool) -> bool:
+    the_dt = _parse_dt(value, strict=strict)
+    if isinstance(rng_val, (list, tuple)) and len(rng_val) == 2:
+        start = _parse_dt(resolve(rng_val[0], env), strict=strict)
+        end = _parse_dt(resolve(rng_val[1], env), strict=strict)
+        return start <= the_dt <= end
+    raise ConditionTypeError("condition_type_mismatch")
+
+
+#: Operators taking two resolved operands (in precedence order, see ``OPERATORS``).
+BINARY_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": _op_gt,
+    "<": _op_lt,
+    ">=": _op_ge,
+    "<=": _op_le,
+    "contains": _op_contains,
+    "in": _op_in,
+    "hasAll": _op_has_all,
+    "hasAny": _op_has_any,
+    "startsWith": _op_starts_with,
+    "endsWith": _op_ends_with,
+    "matches": _op_matches,
+    "glob": _op_glob,
+    "ipInRange": _op_ip_in_range,
+}
+
+#: Datetime comparisons; tested after ``BINARY_OPS``, take the strict-types flag.
+DATE_OPS: dict[str, Callable[[Any, Any, bool], bool]] = {
+    "before": _op_before,
+    "after": _op_after,
+}
+
+#: Every condition operator, in precedence order: when a condition dict has
+#: several operator keys, the first one in this order is evaluated.
+OPERATORS: tuple[str, ...] = ("rel", *BINARY_OPS, *DATE_OPS, "between", "and", "or", "not")
+_OP_RANK: dict[Any, int] = {op: i for i, op in enumerate(OPERATORS)}
+
+
+def operator_of(cond: dict[Any, Any]) -> str | None:
+    """Return the operator a condition node is evaluated with, or None if it has none."""
+    if len(cond) == 1:
+        for key in cond:
+            return key if key in _OP_RANK else None
+    best: str | None = None
+    rank = len(OPERATORS)
+    for key in cond:
+        r = _OP_RANK.get(key)
+        if r is not None and r < rank:
+            best, rank = key, r
+    return best
+
+
+def _eval_rel(expr: Any, env: dict[str, Any]) -> bool:
+    """Evaluate a ``{"rel": ...}`` condition via the relationship checker in context."""
+    subject_str: str
+    resource_str: str
+    local_ctx: dict[str, Any] | None = None
+
+    if isinstance(expr, str):
+        relation = expr
+        subject_str = _canon_subject(env)
+        resource_str = _canon_resource(env)
+    elif isinstance(expr, dict):
+        relation = str(expr.get("relation") or "")
+        subject_str = _canon_subject(env, expr.get("subject"))
+        resource_str = _canon_resource(env, expr.get("resource"))
+        local_ctx = expr.get("ctx")
+    else:
+        return False
+    if not relation:
+        return False
+
+    # Caveats/conditions
+    env_ctx = env.get("context") or {}
+    rebac_ctx = dict(env_ctx.get("_rebac") or {})
+    if local_ctx:
+        rebac_ctx.update(dict(local_ctx))
+
+    checker = REL_CHECKER.get()
+    if checker is None:
+        return False  # fail-closed
+
+    cache = REL_LOCAL_CACHE.get()
+    key = (subject_str, relation, resource_str, _ctx_hash(rebac_ctx))
+    if isinstance(cache, dict) and key in cache:
+        return bool(cache[key])
+
+    # default 5s wait for async providers, shortened to the decision deadline if one is set
+    timeout = bounded_timeout(5.0)
+    try:
+        if timeout is not None and timeout <= 0:
+            raise TimeoutError("decision deadline exceeded")
+        res = checker.check(subject_str, relation, resource_str, context=rebac_ctx)
+
+        # If provider returned an awaitable, resolve it via captured loop (engine sets EVAL_LOOP)
+        loop = EVAL_LOOP.get()
+        if loop is not None:
+            res = resolve_awaitable_in_worker(res, loop, timeout=timeout)
+
+        allowed_bool = bool(res)
+    except Exception as exc:
+        logger.warning(
+            "ReBAC check() failed for (%s, %s, %s): %s",
+            subject_str,
+            relation,
+            resource_str,
+            exc,
+            exc_info=True,
+        )
+        allowed_bool = False
+
+    if isinstance(cache, dict):
+        cache[key] = allowed_bool
+    return allowed_bool
+
+
 def eval_condition(cond: Any, env: dict[str, Any], _depth: int = 0) -> bool:
     """Evaluate condition dict safely.
 
@@ -235,175 +529,46 @@ def eval_condition(cond: Any, env: dict[str, Any], _depth: int = 0) -> bool:
     if not isinstance(cond, dict):
         return bool(cond)
 
-    strict = _is_strict(env)  # STRICT: read once per condition tree
-
-    # ReBAC: relation check
-    if "rel" in cond:
-        expr = cond["rel"]
-        subject_str: str
-        resource_str: str
-        local_ctx: dict[str, Any] | None = None
-
-        if isinstance(expr, str):
-            relation = expr
-            subject_str = _canon_subject(env)
-            resource_str = _canon_resource(env)
-        elif isinstance(expr, dict):
-            relation = str(expr.get("relation") or "")
-            subject_str = _canon_subject(env, expr.get("subject"))
-            resource_str = _canon_resource(env, expr.get("resource"))
-            local_ctx = expr.get("ctx")
-        else:
+    op: Any
+    if len(cond) == 1:
+        (op,) = cond  # the common case: one operator per node
+        if op not in _OP_RANK:
             return False
-        if not relation:
+    else:
+        op = operator_of(cond)
+        if op is None:
             return False
 
-        # Caveats/conditions
-        env_ctx = env.get("context") or {}
-        rebac_ctx = dict(env_ctx.get("_rebac") or {})
-        if local_ctx:
-            rebac_ctx.update(dict(local_ctx))
+    # ReBAC: relation check
+    if op == "rel":
+        return _eval_rel(cond["rel"], env)
 
-        checker = REL_CHECKER.get()
-        if checker is None:
-            return False  # fail-closed
+    fn = BINARY_OPS.get(op)
+    if fn is not None:
+        x, y = cond[op]
+        return fn(resolve(x, env), resolve(y, env))
 
-        cache = REL_LOCAL_CACHE.get()
-        key = (subject_str, relation, resource_str, _ctx_hash(rebac_ctx))
-        if isinstance(cache, dict) and key in cache:
-            return bool(cache[key])
+    dt_fn = DATE_OPS.get(op)
+    if dt_fn is not None:
+        x, y = cond[op]
+        return dt_fn(resolve(x, env), resolve(y, env), _is_strict(env))
 
-        try:
-            res = checker.check(subject_str, relation, resource_str, context=rebac_ctx)
-
-            # If provider returned an awaitable, resolve it via captured loop (engine sets EVAL_LOOP)
-            loop = EVAL_LOOP.get()
-            if loop is not None:
-                res = resolve_awaitable_in_worker(res, loop, timeout=5.0)
-
-            allowed_bool = bool(res)
-        except Exception as exc:
-            logger.warning(
-                "ReBAC check() failed for (%s, %s, %s): %s",
-                subject_str,
-                relation,
-                resource_str,
-                exc,
-                exc_info=True,
-            )
-            allowed_bool = False
-
-        if isinstance(cache, dict):
-            cache[key] = allowed_bool
-        return allowed_bool
-
-    if "==" in cond:
-        a, b = cond["=="]
-        return resolve(a, env) == resolve(b, env)
-    if "!=" in cond:
-        a, b = cond["!="]
-        return resolve(a, env) != resolve(b, env)
-
-    if ">" in cond:
-        a, b = cond[">"]
-        n1, n2 = _ensure_numeric_strict(resolve(a, env), resolve(b, env))
-        return n1 > n2
-    if "<" in cond:
-        a, b = cond["<"]
-        n1, n2 = _ensure_numeric_strict(resolve(a, env), resolve(b, env))
-        return n1 < n2
-    if ">=" in cond:
-        a, b = cond[">="]
-        n1, n2 = _ensure_numeric_strict(resolve(a, env), resolve(b, env))
-        return n1 >= n2
-    if "<=" in cond:
-        a, b = cond["<="]
-        n1, n2 = _ensure_numeric_strict(resolve(a, env), resolve(b, env))
-        return n1 <= n2
-
-    if "contains" in cond:
-        a, b = cond["contains"]
-        x1, x2 = resolve(a, env), resolve(b, env)
-        if isinstance(x1, (list, tuple, set, frozenset)):
-            return x2 in x1
-        if isinstance(x1, str) and isinstance(x2, str):
-            return x2 in x1
-        raise ConditionTypeError("condition_type_mismatch")
-
-    if "in" in cond:
-        a, b = cond["in"]
-        x1, x2 = resolve(a, env), resolve(b, env)
-        # collections vs collections → overlap; otherwise standard membership
-        if isinstance(x1, (list, tuple, set, frozenset)) and isinstance(
-            x2, (list, tuple, set, frozenset)
-        ):
-            return any(val in x1 for val in x2)
-        if isinstance(x2, (list, tuple, set, frozenset)):
-            return x1 in x2
-        if isinstance(x1, (list, tuple, set, frozenset)):
-            return x2 in x1
-        if isinstance(x1, str) and isinstance(x2, str):
-            return x1 in x2
-        raise ConditionTypeError("condition_type_mismatch")
-
-    if "hasAll" in cond:
-        a, b = cond["hasAll"]
-        col = _as_collection(resolve(a, env))
-        needed = _as_collection(resolve(b, env))
-        return all(x in col for x in needed)
-
-    if "hasAny" in cond:
-        a, b = cond["hasAny"]
-        col = _as_collection(resolve(a, env))
-        options = _as_collection(resolve(b, env))
-        return any(x in col for x in options)
-
-    if "startsWith" in cond:
-        a, b = cond["startsWith"]
-        s1, s2 = _ensure_str(resolve(a, env), resolve(b, env))
-        return s1.startswith(s2)
-
-    if "endsWith" in cond:
-        a, b = cond["endsWith"]
-        s1, s2 = _ensure_str(resolve(a, env), resolve(b, env))
-        return s1.endswith(s2)
-
-    if "before" in cond:
-        a, b = cond["before"]
-        d1 = _parse_dt(resolve(a, env), strict=strict)  # STRICT: pass mode
-        d2 = _parse_dt(resolve(b, env), strict=strict)
-        return d1 < d2
-
-    if "after" in cond:
-        a, b = cond["after"]
-        d1 = _parse_dt(resolve(a, env), strict=strict)
-        d2 = _parse_dt(resolve(b, env), strict=strict)
-        return d1 > d2
-
-    if "between" in cond:
-        a, rng = cond["between"]
-        the_dt = _parse_dt(resolve(a, env), strict=strict)
-        rng_val = resolve(rng, env)
-        if isinstance(rng_val, (list, tuple)) and len(rng_val) == 2:
-            start = _parse_dt(resolve(rng_val[0], env), strict=strict)
-            end = _parse_dt(resolve(rng_val[1], env), strict=strict)
-            return start <= the_dt <= end
-        raise ConditionTypeError("condition_type_mismatch")
+    if op == "between":
+        x, rng = cond["between"]
+        return _op_between(resolve(x, env), resolve(rng, env), env, _is_strict(env))
 
-    if "and" in cond:
+    if op == "and":
         subs = cond["and"]
         if not isinstance(subs, Iterable):
             raise ConditionTypeError("condition_type_mismatch")
         return all(eval_condition(c, env, _depth + 1) for c in subs)
-    if "or" in cond:
+    if op == "or":
         subs = cond["or"]
         if not isinstance(subs, Iterable):
             raise ConditionTypeError("condition_type_mismatch")
         return any(eval_condition(c, env, _depth + 1) for c in subs)
-    if "not" in cond:
-        return not eval_condition(cond["not"], env, _depth + 1)
-
-    return False
+    # "not"
+    return not eval_condition(cond["not"], env, _depth + 1)
 
 
 # ------------------------------- evaluation -------------------------------
@@ -414,10 +579,33 @@ def evaluate(
     env: dict[str, Any],
     *,
     algorithm: str | None = None,
+    role_bits: RoleBitset | None = None,
+    conditions: "CompiledConditions | None" = None,
+    memo: list[Any] | None = None,
 ) -> dict[str, Any]:
+    """Evaluate *policy* (a single policy with ``rules``) against *env*.
+
+    ``role_bits`` and ``conditions`` are supplied by the policy compiler: the
+    encoded ``roles`` shorthand and each rule's compiled ``condition`` (keyed
+    by ``id(rule)``).  Without them conditions are interpreted.  ``memo`` is
+    the decision's memo for ``conditions`` when the caller has already used it.
+    """
+    # per-decision attribute memo shared by the compiled conditions
+    if memo is None:
+        memo = conditions.new_memo() if conditions is not None else []
     # Default algorithm: deny-overrides (conservative)
     algo = (algorithm or policy.get("algorithm") or "deny-overrides").lower()
 
+    # Roles shorthand fast path (compiled policies): encode the subject's roles
+    # once per decision, then each rule's shorthand is one AND.
+    role_masks: dict[int, int] = {}
+    subject_mask = 0
+    if role_bits is not None:
+        encoded = role_bits.encode(resolve({"attr": "subject.roles"}, env))
+        if encoded is not None:
+            role_masks = role_bits.masks
+            subject_mask = encoded
+
     decision: Effect = "deny"
     reason = "no_match"
     last_rule_id: str | None = None
@@ -484,19 +672,33 @@ def evaluate(
         # author intended.  Use `rbacx lint` to detect ROLES_CONDITION_OVERLAP.
         roles_shorthand = rule.get("roles")
         explicit_cond = rule.get("condition")
-        if roles_shorthand and isinstance(roles_shorthand, list):
+        cond: Any
+        cond_depth = 0
+        rule_mask = role_masks.get(id(rule)) if role_masks else None
+        if rule_mask is not None:
+            # same as the hasAny below; the explicit condition keeps the depth
+            # it would have under the "and"
+            cond = explicit_cond if rule_mask & subject_mask else False
+            cond_depth = 1
+        elif roles_shorthand and isinstance(roles_shorthand, list):
             roles_cond: dict[str, Any] = {
                 "hasAny": [{"attr": "subject.roles"}, list(roles_shorthand)]
             }
             if explicit_cond is not None:
-                cond: Any = {"and": [roles_cond, explicit_cond]}
+                cond = {"and": [roles_cond, explicit_cond]}
             else:
                 cond = roles_cond
         else:
             cond = explicit_cond
         if cond is not None:
             try:
-                if not eval_condition(cond, env):
+                fn = (
+                    conditions.get(id(rule))
+                    if conditions is not None and cond is explicit_cond
+                    else None
+                )
+                ok = fn(env, memo) if fn is not None else eval_condition(cond, env, cond_depth)
+                if not ok:
                     reason = "condition_mismatch"
                     if collect_trace:
                         trace.append(  # type: ignore[union-attr]
@@ -1,4 +1,4 @@
-from collections.abc import Awaitable
+from collections.abc import Awaitable, Sequence
 from typing import Any, Protocol
 
 
@@ -22,10 +22,19 @@ class PolicySource(Protocol):
 
 
 class RoleResolver(Protocol):
-    def expand(self, roles: list[str] | None) -> list[str] | Awaitable[list[str]]:
+    def expand(self, roles: list[str] | None) -> Sequence[str] | Awaitable[Sequence[str]]:
         """Return roles including inherited/derived ones."""
 
 
+# Optional extension: resolvers MAY implement expand_subject() to resolve roles from the
+# subject's identity (directory / DB group membership); Guard checks via hasattr.
+class SubjectRoleResolver(Protocol):
+    def expand_subject(
+        self, subject_id: str, roles: list[str] | None
+    ) -> Sequence[str] | Awaitable[Sequence[str]]:
+        """Return the subject's roles (``roles`` plus assigned ones) including inherited ones."""
+
+
 # Optional extension: sinks MAY implement observe() for histograms (adapters will check via hasattr).
 class MetricsObserve(Protocol):
     def observe(
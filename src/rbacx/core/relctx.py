@@ -1,4 +1,7 @@
+import time
 from asyncio import AbstractEventLoop
+from collections.abc import Iterator
+from contextlib import contextmanager
 from contextvars import ContextVar
 
 from .ports import RelationshipChecker
@@ -14,3 +17,69 @@ REL_LOCAL_CACHE: ContextVar[dict[tuple[str, str, str, str], bool] | None] = Cont
 # Event loop captured in the outer task so policy code (running in a worker thread)
 # can submit coroutines back to it via run_coroutine_threadsafe.
 EVAL_LOOP: ContextVar[AbstractEventLoop | None] = ContextVar("rbacx_eval_loop", default=None)
+
+# Absolute deadline (time.monotonic()) of the current decision, set by Guard when
+# `decision_timeout` is configured.  ReBAC calls get at most the time that is left.
+REL_DEADLINE: ContextVar[float | None] = ContextVar("rbacx_rel_deadline", default=None)
+
+
+def remaining_time() -> float | None:
+    """Seconds left until the current decision deadline (may be <= 0), or None if unset."""
+    deadline = REL_DEADLINE.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def bounded_timeout(timeout: float | None) -> float | None:
+    """*timeout* capped by the time left until the decision deadline (never negative)."""
+    left = remaining_time()
+    if left is None:
+        return timeout
+    left = max(left, 0.0)
+    return left if timeout is None else min(timeout, left)
+
+
+# Consistency token of the current request (a SpiceDB ZedToken, opaque to rbacx).
+# Set by adapters from a header/session or via `consistency_token()`; providers that
+# support it evaluate checks at least as fresh as this revision (read-your-writes).
+CONSISTENCY_TOKEN: ContextVar[str | None] = ContextVar("rbacx_consistency_token", default=None)
+
+
+@contextmanager
+def consistency_token(token: str | None) -> Iterator[None]:
+    """Make *token* the consistency requirement of ReBAC checks inside the block."""
+    t = CONSISTENCY_TOKEN.set(token or None)
+    try:
+        yield
+    finally:
+        CONSISTENCY_TOKEN.reset(t)
+
+
+# Failures seen by the ReBAC calls of the current `track_failures()` block.  A provider
+# that answers with its fail-closed default (False) because a call failed reports it,
+# so wrappers can tell that answer from a real denial (and e.g. not cache it).
+REL_FAILURES: ContextVar[list[BaseException | None] | None] = ContextVar(
+    "rbacx_rel_failures", default=None
+)
+
+
+def report_failure(exc: BaseException | None = None) -> None:
+    """Record that the answer being returned is a fail-closed default, not a decision."""
+    failures = REL_FAILURES.get()
+    if failures is not None:
+        failures.append(exc)
+
+
+@contextmanager
+def track_failures() -> Iterator[list[BaseException | None]]:
+    """Collect the failures reported by ReBAC calls made inside the block."""
+    failures: list[BaseException | None] = []
+    t = REL_FAILURES.set(failures)
+    try:
+        yield failures
+    finally:
+        REL_FAILURES.reset(t)
+        report_to = REL_FAILURES.get()  # an enclosing block sees them too
+        if report_to is not None:
+            report_to.extend(failures)
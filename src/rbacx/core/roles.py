@@ -1,26 +1,275 @@
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Iterable, Mapping, Sequence
+from functools import lru_cache
+from typing import Any
+
+from rbacx.core.cache import AbstractCache, DefaultInMemoryCache
 from rbacx.core.ports import RoleResolver
 
+logger = logging.getLogger("rbacx.core.roles")
+
+
+def _strongly_connected(graph: Mapping[str, Iterable[str]]) -> list[list[str]]:
+    """Tarjan's SCCs (iterative), in reverse topological order: parents come first."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    out: list[list[str]] = []
+    counter = 0
+
+    nodes = set(graph)
+    for parents in graph.values():
+        nodes.update(parents)
+
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        work: list[tuple[str, list[str]]] = [(root, list(graph.get(root, ())))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, todo = work[-1]
+            if todo:
+                nxt = todo.pop()
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack.add(nxt)
+                    work.append((nxt, list(graph.get(nxt, ()))))
+                elif nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                scc: list[str] = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    scc.append(member)
+                    if member == node:
+                        break
+                out.append(scc)
+    return out
+
 
 class StaticRoleResolver(RoleResolver):
     """Simple in-memory role resolver with inheritance.
 
     graph: {role: [parent_role, ...]}
-    expand(['manager']) -> ['manager', 'employee', 'user', ...]
+    expand(['manager']) -> ('employee', 'manager', 'user', ...)
+
+    The transitive closure of every role is computed once at construction
+    (inheritance cycles are allowed: every role of a cycle inherits all the
+    others, see :attr:`cycles`).  Expansions of role combinations are memoized
+    in an LRU of ``cache_size`` entries keyed by the frozenset of input roles,
+    and returned as sorted, immutable tuples.  The graph is read once; build a
+    new resolver to change it.
     """
 
-    def __init__(self, graph: dict[str, list[str]] | None = None) -> None:
+    def __init__(
+        self, graph: dict[str, list[str]] | None = None, *, cache_size: int = 1024
+    ) -> None:
         self.graph = graph or {}
+        self._closure: dict[str, frozenset[str]] = {}
+        self._sorted: dict[str, tuple[str, ...]] = {}
+        cycles: list[tuple[str, ...]] = []
+        for scc in _strongly_connected(self.graph):
+            members = set(scc)
+            if len(scc) > 1 or scc[0] in self.graph.get(scc[0], ()):
+                cycles.append(tuple(sorted(scc)))
+            # parents are finished before their children, so their closures are ready
+            for role in scc:
+                for parent in self.graph.get(role, ()):
+                    if parent not in members:
+                        members |= self._closure[parent]
+            closure = frozenset(members)
+            for role in scc:
+                self._closure[role] = closure
+        #: inheritance cycles found in the graph (each a sorted tuple of roles)
+        self.cycles: tuple[tuple[str, ...], ...] = tuple(sorted(cycles))
+        if self.cycles:
+            logger.warning("RBACX: role inheritance cycles: %s", list(self.cycles))
+        self._expand_set = lru_cache(maxsize=cache_size)(self._compute)
 
-    def expand(self, roles: list[str] | None) -> list[str]:
+    def expand(self, roles: Iterable[str] | None) -> tuple[str, ...]:
         if not roles:
-            return []
+            return ()
+        if isinstance(roles, (list, tuple)) and len(roles) == 1:
+            # single role: its sorted closure, cached per role of the graph (a bounded,
+            # trusted key set); a role the graph does not know expands to itself
+            role = roles[0]
+            hit = self._sorted.get(role)
+            if hit is None:
+                closure = self._closure.get(role)
+                if closure is None:
+                    return (role,)
+                hit = self._sorted[role] = tuple(sorted(closure))
+            return hit
+        return self._expand_set(frozenset(roles))
+
+    def _compute(self, roles: frozenset[str]) -> tuple[str, ...]:
         out: set[str] = set()
-        stack = list(roles)
-        while stack:
-            r = stack.pop()
-            if r in out:
-                continue
-            out.add(r)
-            for p in self.graph.get(r, []):
-                stack.append(p)
-        return sorted(out)
+        for r in roles:
+            out |= self._closure.get(r) or {r}
+        return tuple(sorted(out))
+
+
+class _Flight:
+    """One in-progress lookup that concurrent callers of the same key share."""
+
+    __slots__ = ("future", "started", "is_async")
+
+    def __init__(self) -> None:
+        self.future: concurrent.futures.Future[tuple[str, ...]] = concurrent.futures.Future()
+        self.started = threading.Event()
+        self.is_async = False
+
+
+class CachingRoleResolver(RoleResolver):
+    """Caching wrapper for a (slow) role resolver, e.g. one backed by a directory or DB.
+
+    Expansions are cached per subject (when the inner resolver implements
+    ``expand_subject``, see :class:`~rbacx.core.ports.SubjectRoleResolver`) or
+    per set of direct roles otherwise, for ``ttl`` seconds in an LRU of
+    ``maxsize`` entries; ``cache`` may be any
+    :class:`~rbacx.core.cache.AbstractCache`.
+
+    Concurrent misses for the same key are collapsed into one call of the
+    inner resolver (stampede protection); the other callers wait for its
+    result.  Inner resolvers may be sync or async: with an async resolver
+    misses return awaitables, hits are returned directly.  Failures are not
+    cached.
+    """
+
+    def __init__(
+        self,
+        inner: RoleResolver,
+        *,
+        cache: AbstractCache | None = None,
+        ttl: int | None = 300,
+        maxsize: int = 10_000,
+    ) -> None:
+        self.inner = inner
+        self.cache: AbstractCache = cache if cache is not None else DefaultInMemoryCache(maxsize)
+        self.ttl = ttl
+        self._per_subject = callable(getattr(inner, "expand_subject", None))
+        self._lock = threading.Lock()
+        self._inflight: dict[str, _Flight] = {}
+
+    # --------------- RoleResolver ---------------
+
+    def expand(self, roles: list[str] | None) -> Any:
+        direct = list(roles or [])
+        return self._resolve(_roles_key(None, direct), lambda: self.inner.expand(direct))
+
+    def expand_subject(self, subject_id: str, roles: list[str] | None) -> Any:
+        if not self._per_subject:
+            return self.expand(roles)
+        direct = list(roles or [])
+        return self._resolve(
+            _roles_key(subject_id, direct),
+            lambda: self.inner.expand_subject(subject_id, direct),  # type: ignore[attr-defined]
+        )
+
+    def invalidate(self, roles: list[str] | None = None, *, subject_id: str | None = None) -> None:
+        """Drop the cached expansion of *roles* (and *subject_id*, for per-subject caches)."""
+        sid = subject_id if self._per_subject else None
+        self.cache.delete(_roles_key(sid, list(roles or [])))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    # --------------- internals ---------------
+
+    def _resolve(self, key: str, call: Callable[[], Any]) -> Any:
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._inflight[key] = _Flight()
+        if not leader:
+            return self._follow(flight)
+        try:
+            res = call()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        if inspect.isawaitable(res):
+            flight.is_async = True
+            flight.started.set()
+            return self._lead_async(key, flight, res)
+        flight.started.set()
+        out = tuple(res or ())
+        self._land(key, flight, result=out)
+        return out
+
+    async def _lead_async(self, key: str, flight: _Flight, res: Awaitable[Any]) -> tuple[str, ...]:
+        try:
+            out = tuple(await res or ())
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result=out)
+        return out
+
+    def _follow(self, flight: _Flight) -> Any:
+        flight.started.wait()
+        if flight.is_async:
+
+            async def _wait() -> tuple[str, ...]:
+                return await asyncio.wrap_future(flight.future)
+
+            return _wait()
+        # a sync leader runs in another thread and does not need this one to progress
+        return flight.future.result()
+
+    def _land(
+        self,
+        key: str,
+        flight: _Flight,
+        *,
+        result: tuple[str, ...] | None = None,
+        error: BaseException | None = None,
+    ) -> None:
+        if result is not None:
+            self._store(key, result)
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.started.set()
+        if error is not None:
+            flight.future.set_exception(error)
+        else:
+            flight.future.set_result(result or ())
+
+    def _lookup(self, key: str) -> tuple[str, ...] | None:
+        try:
+            hit = self.cache.get(key)
+        except Exception:  # pragma: no cover
+            logger.debug("RBACX: role cache get failed", exc_info=True)
+            return None
+        return tuple(hit) if hit is not None else None
+
+    def _store(self, key: str, roles: tuple[str, ...]) -> None:
+        try:
+            self.cache.set(key, roles, ttl=self.ttl)
+        except Exception:  # pragma: no cover
+            logger.debug("RBACX: role cache set failed", exc_info=True)
+
+
+def _roles_key(subject_id: str | None, roles: Sequence[str]) -> str:
+    return "roles:" + json.dumps([subject_id, sorted({str(r) for r in roles})])
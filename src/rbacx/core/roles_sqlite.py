@@ -0,0 +1,163 @@
+"""SQLite-backed role resolver.
+
+:class:`SQLiteRoleResolver` keeps the role inheritance graph and the subjects'
+role assignments in two tables and expands roles with one recursive query.
+Standard library only; use it as a reference for resolvers backed by other
+databases.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Iterable
+
+logger = logging.getLogger("rbacx.core.roles_sqlite")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS role_parents (
+        role   TEXT NOT NULL,
+        parent TEXT NOT NULL,
+        PRIMARY KEY (role, parent)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS subject_roles (
+        subject TEXT NOT NULL,
+        role    TEXT NOT NULL,
+        PRIMARY KEY (subject, role)
+    ) WITHOUT ROWID
+    """,
+)
+
+# Closure of the seed roles over role_parents; UNION (not UNION ALL) makes the
+# recursion stop on cycles.
+_CLOSURE = """
+    WITH RECURSIVE closure(role) AS (
+        {seed}
+        UNION
+        SELECT p.parent FROM role_parents AS p JOIN closure AS c ON p.role = c.role
+    )
+    SELECT role FROM closure ORDER BY role
+"""
+
+
+def _values(n: int) -> str:
+    # a VALUES list is not subject to SQLite's limit on compound SELECT terms
+    return "SELECT column1 FROM (VALUES " + ",".join(["(?)"] * n) + ")"
+
+
+class SQLiteRoleResolver:
+    """
+    Role resolver backed by SQLite: a reference implementation for resolving
+    roles from a database instead of an in-memory graph.
+
+    Two tables are used:
+      - ``role_parents(role, parent)`` -- the inheritance graph (as in
+        :class:`~rbacx.core.roles.StaticRoleResolver`, cycles are allowed);
+      - ``subject_roles(subject, role)`` -- roles assigned to subjects, as a
+        directory's group memberships would be.
+
+    ``expand(roles)`` returns the closure of ``roles``; ``expand_subject(id, roles)``
+    (used by ``Guard`` when available) also adds the subject's assigned roles.
+    Each call is one recursive query served by the primary keys.  Results are
+    sorted tuples.  There is no caching here: wrap the resolver in
+    :class:`~rbacx.core.roles.CachingRoleResolver` so decisions don't hit the
+    database every time.
+
+    The connection is shared and serialized by a lock, so one instance can be
+    used from multiple threads.
+    """
+
+    def __init__(self, path: str = ":memory:", *, wal: bool = True, timeout: float = 5.0) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        if wal and path != ":memory:":
+            mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()
+            if not mode or str(mode[0]).lower() != "wal":  # pragma: no cover
+                logger.warning("SQLite WAL mode not available for %s; using %s", path, mode)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+
+    # ------------ writes ------------
+
+    def add_parent(self, role: str, parent: str) -> None:
+        """Make *role* inherit *parent*."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO role_parents (role, parent) VALUES (?, ?)", (role, parent)
+            )
+
+    def remove_parent(self, role: str, parent: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM role_parents WHERE role = ? AND parent = ?", (role, parent)
+            )
+
+    def load_graph(self, graph: dict[str, list[str]]) -> None:
+        """Add a ``{role: [parent_role, ...]}`` graph in one transaction."""
+        rows = [(role, parent) for role, parents in graph.items() for parent in parents]
+        self._executemany("INSERT OR IGNORE INTO role_parents (role, parent) VALUES (?, ?)", rows)
+
+    def assign(self, subject: str, role: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO subject_roles (subject, role) VALUES (?, ?)",
+                (subject, role),
+            )
+
+    def assign_many(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Assign ``(subject, role)`` pairs in one transaction."""
+        self._executemany(
+            "INSERT OR IGNORE INTO subject_roles (subject, role) VALUES (?, ?)", list(rows)
+        )
+
+    def revoke(self, subject: str, role: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM subject_roles WHERE subject = ? AND role = ?", (subject, role)
+            )
+
+    # ------------ reads ------------
+
+    def expand(self, roles: list[str] | None) -> tuple[str, ...]:
+        direct = [str(r) for r in roles or []]
+        if not direct:
+            return ()
+        return self._closure(_values(len(direct)), direct)
+
+    def expand_subject(self, subject_id: str, roles: list[str] | None) -> tuple[str, ...]:
+        direct = [str(r) for r in roles or []]
+        seed = "SELECT role FROM subject_roles WHERE subject = ?"
+        if direct:
+            seed += " UNION " + _values(len(direct))
+        return self._closure(seed, [subject_id, *direct])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------ internals ------------
+
+    def _closure(self, seed: str, params: list[str]) -> tuple[str, ...]:
+        with self._lock:
+            rows = self._conn.execute(_CLOSURE.format(seed=seed), params).fetchall()
+        return tuple(r[0] for r in rows)
+
+    def _executemany(self, sql: str, rows: list[tuple[str, str]]) -> None:
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany(sql, rows)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+
+__all__ = ["SQLiteRoleResolver"]
@@ -1,6 +1,9 @@
 from collections.abc import Iterable
 from typing import Any
 
+from rbacx.core.iprange import range_error
+from rbacx.core.patterns import iter_patterns, pattern_error
+
 Issue = dict[str, Any]
 
 
@@ -115,6 +118,47 @@ def _condition_references_subject_roles(cond: Any) -> bool:
     return False
 
 
+def _pattern_issues(cond: Any, rid: Any, idx: int) -> list[Issue]:
+    """Issues for the ``matches``/``glob`` patterns and ``ipInRange`` ranges of a condition."""
+    issues: list[Issue] = []
+    for op, pattern in iter_patterns(cond):
+        if isinstance(pattern, dict):
+            # compiled (and checked) per distinct value, at request time
+            issues.append(
+                {
+                    "code": "DYNAMIC_PATTERN",
+                    "id": rid,
+                    "index": idx,
+                    "op": op,
+                    "message": (
+                        f"The {op} pattern is read from {pattern.get('attr')!r}: it is "
+                        "compiled at request time and whoever controls that attribute "
+                        "controls the pattern. Prefer a literal pattern."
+                    ),
+                }
+            )
+            continue
+        error = pattern_error(op, pattern)
+        if error is not None:
+            issues.append(
+                {
+                    "code": "INVALID_PATTERN",
+                    "id": rid,
+                    "index": idx,
+                    "op": op,
+                    "pattern": pattern,
+                    "message": error,
+                }
+            )
+    for op, ranges in iter_patterns(cond, ("ipInRange",)):
+        error = None if isinstance(ranges, dict) else range_error(ranges)
+        if error is not None:
+            issues.append(
+                {"code": "INVALID_IP_RANGE", "id": rid, "index": idx, "op": op, "message": error}
+            )
+    return issues
+
+
 def analyze_policy(
     policy: dict[str, Any], *, require_attrs: dict[str, list[str]] | None = None
 ) -> list[Issue]:
@@ -176,6 +220,13 @@ def analyze_policy(
                 }
             )
 
+        # patterns and IP ranges that fail (type error) whenever they are reached
+        if explicit_cond is not None:
+            issues.extend(_pattern_issues(explicit_cond, rid, idx))
+        for ob in rule.get("obligations") or []:
+            if isinstance(ob, dict) and ob.get("condition") is not None:
+                issues.extend(_pattern_issues(ob["condition"], rid, idx))
+
         # Required attributes apply to PERMIT rules only
         rtype = _rtype(rule)
         effect = (rule.get("effect") or "permit").lower()
@@ -1,7 +1,11 @@
 import json
+from collections.abc import Iterator
 from importlib import resources
 from typing import Any
 
+from rbacx.core.iprange import range_error
+from rbacx.core.patterns import iter_patterns, pattern_error
+
 
 def validate_policy(policy: dict[str, Any]) -> None:
     try:
@@ -14,3 +18,35 @@ def validate_policy(policy: dict[str, Any]) -> None:
     )
     schema = json.loads(schema_text)
     jsonschema.validate(policy, schema)
+
+    # matches/glob patterns must compile and pass the backtracking checks, and
+    # ipInRange ranges must parse
+    for where, cond in _conditions(policy, ""):
+        for op, pattern in iter_patterns(cond):
+            if isinstance(pattern, dict):
+                continue  # taken from an attribute: checked when evaluated
+            error = pattern_error(op, pattern)
+            if error is not None:
+                raise jsonschema.ValidationError(f"{where}: invalid {op} pattern: {error}")
+        for _, ranges in iter_patterns(cond, ("ipInRange",)):
+            if isinstance(ranges, dict):
+                continue
+            error = range_error(ranges)
+            if error is not None:
+                raise jsonschema.ValidationError(f"{where}: invalid ipInRange ranges: {error}")
+
+
+def _conditions(policy: Any, where: str) -> Iterator[tuple[str, Any]]:
+    """``(location, condition)`` of every rule and obligation condition of a policy (set)."""
+    if not isinstance(policy, dict):
+        return
+    for i, sub in enumerate(policy.get("policies") or []):
+        yield from _conditions(sub, f"{where}policies[{i}].")
+    for i, rule in enumerate(policy.get("rules") or []):
+        if not isinstance(rule, dict):
+            continue
+        if "condition" in rule:
+            yield f"{where}rules[{i}].condition", rule["condition"]
+        for j, ob in enumerate(rule.get("obligations") or []):
+            if isinstance(ob, dict) and "condition" in ob:
+                yield f"{where}rules[{i}].obligations[{j}].condition", ob["condition"]
@@ -14,7 +14,12 @@ class OpenTelemetryMetrics(MetricsSink):
     Creates:
       - Counter: rbacx_decisions_total (labels: decision)
       - Histogram: rbacx_decision_seconds (unit: s)
-      - Histogram: rbacx_batch_size (unit: {request}) — evaluate_batch_* call sizes
+      - Histogram: rbacx_batch_size (unit: {request}) — evaluate_batch_* / evaluate_bulk_* call sizes
+      - Histogram: rbacx_rebac_pool_utilization (unit: 1, attribute: provider) — in-flight
+        requests / pool capacity of remote ReBAC clients
+      - Counter: rbacx_rebac_events_total (attributes: provider, event) — resilience events
+      - Gauge: rbacx_rebac_breaker_state (attribute: provider) — 0 closed, 1 half-open,
+        2 open; only with an API that has synchronous gauges (``Meter.create_gauge``)
 
     Notes:
       * OTEL recommends carrying the **unit** in metadata; we also keep `_seconds` in the name
@@ -27,12 +32,18 @@ class OpenTelemetryMetrics(MetricsSink):
     _counter: Any | None
     _hist: Any | None
     _batch_hist: Any | None
+    _pool_hist: Any | None
+    _events: Any | None
+    _breaker: Any | None
 
     def __init__(self) -> None:
         # Ensure attributes always exist
         self._counter = None
         self._hist = None
         self._batch_hist = None
+        self._pool_hist = None
+        self._events = None
+        self._breaker = None
 
         if get_meter is None:  # pragma: no cover
             return
@@ -76,14 +87,56 @@ class OpenTelemetryMetrics(MetricsSink):
         except Exception:  # pragma: no cover
             self._batch_hist = None
 
+        # Remote ReBAC connection-pool utilization
+        try:
+            create_hist = getattr(meter, "create_histogram", None)
+            if create_hist is not None:
+                self._pool_hist = create_hist(
+                    name="rbacx_rebac_pool_utilization",
+                    description="In-flight requests / pool capacity of remote ReBAC clients.",
+                    unit="1",
+                )
+            else:  # pragma: no cover
+                self._pool_hist = None
+        except Exception:  # pragma: no cover
+            self._pool_hist = None
+
+        # ReBAC resilience events and circuit-breaker state
+        try:
+            self._events = meter.create_counter(
+                name="rbacx_rebac_events_total",
+                description="ReBAC provider resilience events (hedge, timeout, error, rejected).",
+            )
+        except Exception:  # pragma: no cover
+            self._events = None
+        try:
+            create_gauge = getattr(meter, "create_gauge", None)
+            if create_gauge is not None:
+                self._breaker = create_gauge(
+                    name="rbacx_rebac_breaker_state",
+                    description="ReBAC circuit breaker state (0 closed, 1 half-open, 2 open).",
+                )
+        except Exception:  # pragma: no cover
+            self._breaker = None
+
     # -- MetricsSink ------------------------------------------------------------
 
     def inc(self, name: str, labels: dict[str, str] | None = None) -> None:
         """Increment the unified counter.
 
-        The *name* parameter is accepted for backward compatibility but ignored;
-        this sink always increments `rbacx_decisions_total`.
+        ``"rbacx_rebac_events_total"`` goes to the ReBAC events counter; any other
+        *name* is accepted for backward compatibility but ignored: this sink then
+        increments `rbacx_decisions_total`.
         """
+        if name == "rbacx_rebac_events_total":
+            try:
+                if self._events is not None:
+                    self._events.add(1, dict(labels or {}))
+            except Exception:  # pragma: no cover
+                __import__("logging").getLogger("rbacx.metrics.otel").debug(
+                    "OpenTelemetryMetrics.inc: failed to add to events counter", exc_info=True
+                )
+            return
         if self._counter is None:  # pragma: no cover
             return
         decision = (labels or {}).get("decision", "unknown")
@@ -101,6 +154,8 @@ class OpenTelemetryMetrics(MetricsSink):
 
         Routing:
           - ``"rbacx_batch_size"`` → ``rbacx_batch_size`` histogram.
+          - ``"rbacx_rebac_pool_utilization"`` → ``rbacx_rebac_pool_utilization`` histogram.
+          - ``"rbacx_rebac_breaker_state"`` → ``rbacx_rebac_breaker_state`` gauge (set).
           - Any other *name* → ``rbacx_decision_seconds`` latency histogram.
 
         Parameters
@@ -116,6 +171,12 @@ class OpenTelemetryMetrics(MetricsSink):
             if name == "rbacx_batch_size":
                 if self._batch_hist is not None:
                     self._batch_hist.record(float(value), attributes=dict(labels or {}))
+            elif name == "rbacx_rebac_pool_utilization":
+                if self._pool_hist is not None:
+                    self._pool_hist.record(float(value), attributes=dict(labels or {}))
+            elif name == "rbacx_rebac_breaker_state":
+                if self._breaker is not None:
+                    self._breaker.set(float(value), attributes=dict(labels or {}))
             else:
                 if self._hist is not None:
                     self._hist.record(float(value), attributes=dict(labels or {}))
@@ -7,6 +7,11 @@ try:
 except Exception:  # pragma: no cover
     Counter = Histogram = None  # type: ignore
 
+try:
+    from prometheus_client import Gauge  # type: ignore[import-not-found]
+except Exception:  # pragma: no cover
+    Gauge = None  # type: ignore
+
 
 class PrometheusMetrics(MetricsSink):
     """Prometheus-based MetricsSink with unified metric names.
@@ -14,7 +19,12 @@ class PrometheusMetrics(MetricsSink):
     Exposes:
       - rbacx_decisions_total{decision="allow|deny|..."}
       - rbacx_decision_seconds (Histogram) — optional latency distribution
-      - rbacx_batch_size (Histogram) — distribution of evaluate_batch_* call sizes
+      - rbacx_batch_size (Histogram) — distribution of evaluate_batch_* / evaluate_bulk_* call sizes
+      - rbacx_rebac_pool_utilization{provider="openfga|spicedb"} (Histogram) — in-flight
+        requests / pool capacity of remote ReBAC clients, sampled per request
+      - rbacx_rebac_events_total{provider, event} — hedges, timeouts, errors and
+        breaker rejections of ``ResilientRelationshipChecker``
+      - rbacx_rebac_breaker_state{provider} (Gauge) — 0 closed, 1 half-open, 2 open
 
     Notes:
       * Counter uses the `_total` suffix and latency uses `_seconds` to follow Prometheus/OpenMetrics naming.
@@ -28,12 +38,18 @@ class PrometheusMetrics(MetricsSink):
     _counter: Any | None
     _hist: Any | None
     _batch_hist: Any | None
+    _pool_hist: Any | None
+    _events: Any | None
+    _breaker: Any | None
 
     def __init__(self) -> None:
         # default to None so attributes are always defined
         self._counter = None
         self._hist = None
         self._batch_hist = None
+        self._pool_hist = None
+        self._events = None
+        self._breaker = None
 
         # create instruments only if the client is available
         if Counter is None or Histogram is None:  # pragma: no cover
@@ -56,15 +72,47 @@ class PrometheusMetrics(MetricsSink):
             "Distribution of rbacx evaluate_batch_* call sizes (number of requests per call).",
             buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
         )
+        # Connection-pool utilization of remote ReBAC checkers (0..1)
+        self._pool_hist = Histogram(
+            "rbacx_rebac_pool_utilization",
+            "In-flight requests / pool capacity of remote ReBAC clients.",
+            labelnames=("provider",),
+            buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+        )
+        # ReBAC resilience events and circuit-breaker state
+        self._events = Counter(
+            "rbacx_rebac_events_total",
+            "ReBAC provider resilience events (hedge, timeout, error, rejected, ...).",
+            labelnames=("provider", "event"),
+        )
+        if Gauge is not None:
+            self._breaker = Gauge(
+                "rbacx_rebac_breaker_state",
+                "ReBAC provider circuit breaker state (0 closed, 1 half-open, 2 open).",
+                labelnames=("provider",),
+            )
 
     # -- MetricsSink ------------------------------------------------------------
 
     def inc(self, name: str, labels: dict[str, str] | None = None) -> None:
         """Increment the unified counter.
 
-        The *name* parameter is accepted for backward compatibility but ignored;
-        this sink always increments `rbacx_decisions_total`.
+        ``"rbacx_rebac_events_total"`` goes to the ReBAC events counter; any other
+        *name* is accepted for backward compatibility but ignored: this sink then
+        increments `rbacx_decisions_total`.
         """
+        if name == "rbacx_rebac_events_total":
+            lbl = labels or {}
+            try:
+                if self._events is not None:
+                    self._events.labels(
+                        provider=lbl.get("provider", "unknown"), event=lbl.get("event", "unknown")
+                    ).inc()
+            except Exception:  # pragma: no cover
+                __import__("logging").getLogger("rbacx.metrics.prometheus").debug(
+                    "PrometheusMetrics.inc: failed to increment events counter", exc_info=True
+                )
+            return
         if self._counter is None:  # pragma: no cover
             return
         decision = (labels or {}).get("decision", "unknown")
@@ -82,6 +130,8 @@ class PrometheusMetrics(MetricsSink):
 
         Routing:
           - ``"rbacx_batch_size"`` → ``rbacx_batch_size`` histogram.
+          - ``"rbacx_rebac_pool_utilization"`` → pool histogram (``provider`` label).
+          - ``"rbacx_rebac_breaker_state"`` → breaker gauge (set, ``provider`` label).
           - Any other *name* → ``rbacx_decision_seconds`` latency histogram.
 
         Parameters
@@ -92,12 +142,20 @@ class PrometheusMetrics(MetricsSink):
             Value to record.  For latency use seconds; for batch size use the
             request count.
         labels: dict[str, str] | None
-            Currently unused (histograms have no labels by default).
+            Only ``provider`` is used (pool histogram); the others have no labels.
         """
         try:
             if name == "rbacx_batch_size":
                 if self._batch_hist is not None:
                     self._batch_hist.observe(float(value))
+            elif name == "rbacx_rebac_pool_utilization":
+                if self._pool_hist is not None:
+                    provider = (labels or {}).get("provider", "unknown")
+                    self._pool_hist.labels(provider=provider).observe(float(value))
+            elif name == "rbacx_rebac_breaker_state":
+                if self._breaker is not None:
+                    provider = (labels or {}).get("provider", "unknown")
+                    self._breaker.labels(provider=provider).set(float(value))
             else:
                 if self._hist is not None:
                     self._hist.observe(float(value))
@@ -0,0 +1,291 @@
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Any
+
+from ..core.helpers import _await_compat
+from ..core.ports import RelationshipChecker
+from ..core.relctx import EVAL_LOOP, bounded_timeout, report_failure
+
+logger = logging.getLogger("rbacx.rebac.batching")
+
+
+def _ctx_key(ctx: dict[str, Any] | None) -> str | None:
+    """Grouping key of a caveat context, or None if it cannot be compared safely.
+
+    Only plain JSON data (``str`` keys; ``str``/``int``/``float``/``bool``/
+    ``None``/``list``/``dict`` values) gets a key: it serializes losslessly.
+    Any other value (a ``datetime``, a tuple, ...) could share a serialization
+    with a different context, so such checks are not coalesced with others.
+    """
+    if not ctx:
+        return ""
+    if not _is_json(ctx):
+        return None
+    return json.dumps(ctx, sort_keys=True, separators=(",", ":"))
+
+
+def _is_json(value: Any) -> bool:
+    stack = [value]
+    while stack:
+        v = stack.pop()
+        t = type(v)
+        if t is dict:
+            if not all(type(k) is str for k in v):
+                return False
+            stack.extend(v.values())
+        elif t is list:
+            stack.extend(v)
+        elif t not in (str, int, float, bool, type(None)):
+            return False
+    return True
+
+
+class _Waiter(Future[bool]):
+    """A caller's pending check; ``failed`` once it resolved to the fail-closed default."""
+
+    failed = False
+
+
+class _Group:
+    """Pending checks that can share one ``batch_check`` call (same context and loop)."""
+
+    __slots__ = ("context", "loop", "waiters")
+
+    def __init__(self, context: dict[str, Any] | None, loop: AbstractEventLoop | None) -> None:
+        self.context = context
+        self.loop = loop
+        # identical triples share one slot in the outgoing batch
+        self.waiters: dict[tuple[str, str, str], list[_Waiter]] = {}
+
+
+class BatchingRelationshipChecker(RelationshipChecker):
+    """
+    Coalesce concurrent ``check()`` calls into ``batch_check()`` calls on *inner*.
+
+    Checks arriving within ``max_delay_ms`` of the first pending one (or until
+    ``max_batch`` distinct triples are pending) are sent as one batch -- an
+    OpenFGA ``/batch-check`` or SpiceDB ``BulkCheckPermissions`` request when
+    wrapping those checkers -- and the results are fanned back out.
+
+    Callers in a worker thread (the normal path during policy evaluation) block
+    until their batch resolves (at most ``timeout``, or less if the decision
+    deadline is closer); callers on a running event loop get an awaitable.
+    Checks are grouped by caveat context and by event loop, because async clients
+    must be driven on the loop that owns them.  If a batch fails, every check in
+    it is denied (fail-closed).
+    """
+
+    def __init__(
+        self,
+        inner: RelationshipChecker,
+        *,
+        max_batch: int = 100,
+        max_delay_ms: float = 2.0,
+        max_concurrent_batches: int = 4,
+        timeout: float | None = 5.0,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.inner = inner
+        self.max_batch = int(max_batch)
+        self.max_delay = float(max_delay_ms) / 1000.0
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._groups: dict[tuple[Any, int], _Group] = {}
+        self._pending = 0
+        self._oldest: float | None = None
+        self._closed = False
+        self._flusher: threading.Thread | None = None
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="rbacx-rebac-batch"
+        )
+
+    # --------------- public API ---------------
+
+    def check(
+        self, subject: str, relation: str, resource: str, *, context: dict[str, Any] | None = None
+    ) -> Any:
+        try:
+            running: AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        fut = self._enqueue((subject, relation, resource), context, running or EVAL_LOOP.get())
+        if running is not None:
+            return _wait(fut)
+        try:
+            ok = fut.result(timeout=bounded_timeout(self.timeout))
+        except Exception as exc:
+            logger.warning(
+                "ReBAC batched check timed out for (%s, %s, %s): %s",
+                subject,
+                relation,
+                resource,
+                exc,
+            )
+            report_failure(exc)
+            return False
+        if fut.failed:
+            report_failure()
+        return ok
+
+    def batch_check(
+        self, triples: list[tuple[str, str, str]], *, context: dict[str, Any] | None = None
+    ) -> Any:
+        # already a batch: pass straight through
+        return self.inner.batch_check(triples, context=context)
+
+    def flush(self) -> None:
+        """Send everything pending now instead of waiting for the window to close."""
+        with self._cond:
+            groups = self._take_locked()
+        self._dispatch(groups)
+
+    def close(self) -> None:
+        """Flush pending checks and stop the background threads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+        self._pool.shutdown(wait=True)
+
+    # --------------- internals ---------------
+
+    def _enqueue(
+        self,
+        triple: tuple[str, str, str],
+        context: dict[str, Any] | None,
+        loop: AbstractEventLoop | None,
+    ) -> _Waiter:
+        fut = _Waiter()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchingRelationshipChecker is closed")
+            ctx_key: Any = _ctx_key(context)
+            if ctx_key is None:
+                ctx_key = object()  # a group of its own
+            key = (ctx_key, id(loop) if loop is not None else 0)
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group(context, loop)
+            waiters = group.waiters.get(triple)
+            if waiters is None:
+                group.waiters[triple] = [fut]
+                self._pending += 1
+            else:
+                waiters.append(fut)
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._run_flusher, name="rbacx-rebac-batcher", daemon=True
+                )
+                self._flusher.start()
+            # wake the flusher to start the window, or to cut it short when full
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            elif self._pending >= self.max_batch:
+                self._cond.notify()
+        return fut
+
+    def _take_locked(self) -> list[_Group]:
+        groups = list(self._groups.values())
+        self._groups = {}
+        self._pending = 0
+        self._oldest = None
+        return groups
+
+    def _run_flusher(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._oldest is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._oldest + self.max_delay - time.monotonic()
+                    if remaining <= 0 or self._pending >= self.max_batch:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                groups = self._take_locked()
+            self._dispatch(groups)
+
+    def _dispatch(self, groups: list[_Group]) -> None:
+        for group in groups:
+            triples = list(group.waiters)
+            for i in range(0, len(triples), self.max_batch):
+                chunk = triples[i : i + self.max_batch]
+                self._pool.submit(self._send, group, chunk)
+
+    def _send(self, group: _Group, triples: list[tuple[str, str, str]]) -> None:
+        try:
+            res = self.inner.batch_check(triples, context=group.context)
+        except Exception as exc:
+            self._fail(group, triples, exc)
+            return
+        if not inspect.isawaitable(res):
+            self._resolve(group, triples, res)
+            return
+        loop = group.loop
+        if loop is not None and loop.is_running():
+            cfut = asyncio.run_coroutine_threadsafe(_await_compat(res), loop)
+
+            def _done(f: "Future[Any]") -> None:
+                exc = f.exception()
+                if exc is not None:
+                    self._fail(group, triples, exc)
+                else:
+                    self._resolve(group, triples, f.result())
+
+            cfut.add_done_callback(_done)
+            return
+        try:
+            self._resolve(group, triples, asyncio.run(_await_compat(res)))
+        except Exception as exc:
+            self._fail(group, triples, exc)
+
+    def _resolve(self, group: _Group, triples: list[tuple[str, str, str]], results: Any) -> None:
+        results = list(results) if results is not None else []
+        if len(results) != len(triples):
+            self._fail(group, triples, ValueError("batch_check returned a result of wrong length"))
+            return
+        for triple, ok in zip(triples, results, strict=True):
+            for fut in group.waiters[triple]:
+                _settle(fut, bool(ok))
+
+    def _fail(self, group: _Group, triples: list[tuple[str, str, str]], exc: BaseException) -> None:
+        logger.warning("ReBAC batched check failed for %d triples: %s", len(triples), exc)
+        for triple in triples:
+            for fut in group.waiters[triple]:
+                fut.failed = True
+                _settle(fut, False)
+
+
+async def _wait(fut: _Waiter) -> bool:
+    # reports a failure in the awaiting caller's context, like the sync path
+    ok = await asyncio.wrap_future(fut)
+    if fut.failed:
+        report_failure()
+    return ok
+
+
+def _settle(fut: _Waiter, ok: bool) -> None:
+    # a caller cancelling its await cancels its future (asyncio.wrap_future);
+    # the other callers waiting on the same batch still get their result
+    if fut.done():
+        return
+    try:
+        fut.set_result(ok)
+    except InvalidStateError:  # cancelled since the check above
+        pass
+
+
+__all__ = ["BatchingRelationshipChecker"]
@@ -0,0 +1,129 @@
+import csv
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import IO, Any
+
+from .compact import CompactRelationshipStore
+from .local import RelTuple, as_rel_tuple
+
+logger = logging.getLogger("rbacx.rebac.bulk")
+
+_CSV_HEADER = ["subject", "relation", "resource", "caveat"]
+
+
+def iter_ndjson(stream: IO[str] | Iterable[str]) -> Iterator[RelTuple]:
+    """Parse newline-delimited JSON tuples.
+
+    Each line is either an object ``{"subject", "relation", "resource"[, "caveat"]}``
+    or an array ``[subject, relation, resource(, caveat)]``.  Blank lines are skipped;
+    malformed lines raise ``ValueError`` with the line number.
+    """
+    for lineno, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+            if isinstance(obj, dict):
+                yield RelTuple(
+                    subject=str(obj["subject"]),
+                    relation=str(obj["relation"]),
+                    resource=str(obj["resource"]),
+                    caveat=obj.get("caveat") or None,
+                )
+            else:
+                yield as_rel_tuple(obj)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"invalid relationship tuple on line {lineno}: {e}") from e
+
+
+def iter_csv(stream: IO[str] | Iterable[str]) -> Iterator[RelTuple]:
+    """Parse CSV rows ``subject,relation,resource[,caveat]``.
+
+    A leading header row (``subject,relation,resource[,caveat]``) is skipped.
+    """
+    for lineno, row in enumerate(csv.reader(stream), start=1):
+        if not row:
+            continue
+        if lineno == 1 and [c.strip().lower() for c in row] == _CSV_HEADER[: len(row)]:
+            continue
+        if len(row) not in (3, 4):
+            raise ValueError(f"invalid relationship tuple on line {lineno}: {row!r}")
+        yield as_rel_tuple([c.strip() for c in row])
+
+
+def load_tuples(store: Any, tuples: Iterable[Any], *, chunk_size: int = 10_000) -> int:
+    """Feed *tuples* into *store* in chunks of *chunk_size*.
+
+    Uses ``store.add_many()`` when available (one call per chunk — one
+    transaction for ``SQLiteRelationshipStore``), otherwise ``store.add()``
+    per tuple.  Returns the number of tuples read from *tuples*.
+    """
+    it = iter(tuples)
+    add_many = getattr(store, "add_many", None)
+    total = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        if add_many is not None:
+            add_many(chunk)
+        else:
+            for item in chunk:
+                t = as_rel_tuple(item)
+                store.add(t.subject, t.relation, t.resource, caveat=t.caveat)
+        total += len(chunk)
+        logger.debug("loaded %d relationship tuples", total)
+    return total
+
+
+def load_ndjson(store: Any, stream: IO[str] | Iterable[str], *, chunk_size: int = 10_000) -> int:
+    """Load NDJSON tuples (see :func:`iter_ndjson`) into *store*."""
+    return load_tuples(store, iter_ndjson(stream), chunk_size=chunk_size)
+
+
+def load_csv(store: Any, stream: IO[str] | Iterable[str], *, chunk_size: int = 10_000) -> int:
+    """Load CSV tuples (see :func:`iter_csv`) into *store*."""
+    return load_tuples(store, iter_csv(stream), chunk_size=chunk_size)
+
+
+def save_snapshot(store: Any, path: str) -> None:
+    """Write a binary snapshot of any store exposing ``iter_tuples()``.
+
+    ``CompactRelationshipStore`` is written directly; other stores are
+    converted to the compact layout first.
+    """
+    if not isinstance(store, CompactRelationshipStore):
+        compact = CompactRelationshipStore()
+        compact.add_many(store.iter_tuples())
+        store = compact
+    store.save_snapshot(path)
+
+
+def load_snapshot(
+    path: str, *, into: Any = None, use_mmap: bool = True, chunk_size: int = 10_000
+) -> Any:
+    """Load a snapshot written by :func:`save_snapshot`.
+
+    Without *into*, returns a ``CompactRelationshipStore`` served straight from the
+    memory-mapped file (near-instant, regardless of size).  With *into* (e.g. an
+    ``InMemoryRelationshipStore``), streams the tuples into that store and returns it.
+    """
+    snap = CompactRelationshipStore.load_snapshot(path, use_mmap=use_mmap)
+    if into is None:
+        return snap
+    load_tuples(into, snap.iter_tuples(), chunk_size=chunk_size)
+    return into
+
+
+__all__ = [
+    "iter_ndjson",
+    "iter_csv",
+    "load_tuples",
+    "load_ndjson",
+    "load_csv",
+    "save_snapshot",
+    "load_snapshot",
+]
@@ -0,0 +1,179 @@
+import inspect
+import json
+import logging
+from typing import Any
+
+from ..core.cache import AbstractCache, DefaultInMemoryCache
+from ..core.ports import RelationshipChecker
+from ..core.relctx import CONSISTENCY_TOKEN, track_failures
+
+logger = logging.getLogger("rbacx.rebac.caching")
+
+
+def _key(subject: str, relation: str, resource: str, context: dict[str, Any] | None) -> str:
+    if context:
+        try:
+            ctx = json.dumps(context, sort_keys=True, separators=(",", ":"), default=str)
+        except Exception:
+            ctx = repr(context)
+    else:
+        ctx = ""
+    return f"rebac:{subject}|{relation}|{resource}|{ctx}"
+
+
+class CachingRelationshipChecker(RelationshipChecker):
+    """
+    Cross-request result cache for a ReBAC provider that honors consistency tokens.
+
+    Entries remember the consistency token (ZedToken) they were checked with:
+
+    - A request **without** a token (minimize-latency reads) is served any cached
+      entry for the triple and context.
+    - A request **with** token *T* (``rbacx.core.relctx.consistency_token`` or an
+      adapter's ``consistency=``) only trusts entries checked with *T*; anything
+      else is re-checked by the provider at least as fresh as *T* and the fresh
+      result replaces the cached one.
+
+    So the user who just shared a document sees the new relationship on their
+    next request, while everybody else keeps hitting the cache.  Tokens are
+    opaque, so entries are never compared by age, only by equality.
+
+    Results (including denials) live for ``ttl`` seconds; ``cache`` may be any
+    :class:`~rbacx.core.cache.AbstractCache` (an in-process LRU by default).
+    A denial the provider returned because its call failed (reported through
+    :func:`rbacx.core.relctx.report_failure`) is not cached, so an outage is
+    not remembered past its end.
+
+    With ``async_mode`` every answer, cached or not, is an awaitable.  By
+    default it is inferred from *inner* (or the checker it wraps): a coroutine
+    ``check``, or an OpenFGA / SpiceDB checker built with ``async_mode=True``.
+    """
+
+    def __init__(
+        self,
+        inner: RelationshipChecker,
+        *,
+        cache: AbstractCache | None = None,
+        ttl: int | None = 60,
+        maxsize: int = 10_000,
+        async_mode: bool | None = None,
+    ) -> None:
+        self.inner = inner
+        self.cache: AbstractCache = cache if cache is not None else DefaultInMemoryCache(maxsize)
+        self.ttl = ttl
+        self.async_mode = _is_async(inner) if async_mode is None else bool(async_mode)
+
+    # --------------- RelationshipChecker ---------------
+
+    def check(
+        self, subject: str, relation: str, resource: str, *, context: dict[str, Any] | None = None
+    ) -> Any:
+        token = CONSISTENCY_TOKEN.get()
+        key = _key(subject, relation, resource, context)
+        hit = self._lookup(key, token)
+        if hit is not None:
+            return _ready(hit) if self.async_mode else hit
+        with track_failures() as failures:
+            res = self.inner.check(subject, relation, resource, context=context)
+        if inspect.isawaitable(res) or self.async_mode:
+
+            async def _store() -> bool:
+                with track_failures() as later:
+                    ok = bool(await res if inspect.isawaitable(res) else res)
+                self._keep(key, ok, token, failures or later)
+                return ok
+
+            return _store()
+        ok = bool(res)
+        self._keep(key, ok, token, failures)
+        return ok
+
+    def batch_check(
+        self, triples: list[tuple[str, str, str]], *, context: dict[str, Any] | None = None
+    ) -> Any:
+        token = CONSISTENCY_TOKEN.get()
+        keys = [_key(s, r, o, context) for s, r, o in triples]
+        out: list[bool | None] = [self._lookup(k, token) for k in keys]
+        missing = [i for i, v in enumerate(out) if v is None]
+        if not missing:
+            hits = [bool(v) for v in out]
+            return _ready(hits) if self.async_mode else hits
+        with track_failures() as failures:
+            res = self.inner.batch_check([triples[i] for i in missing], context=context)
+
+        def _merge(results: Any, failed: bool) -> list[bool]:
+            results = list(results)
+            if len(results) != len(missing):
+                logger.warning("RBACX: batch_check returned a result of wrong length")
+                results = [False] * len(missing)
+                failed = True
+            for i, ok in zip(missing, results, strict=True):
+                out[i] = bool(ok)
+                # the provider does not say which triples failed: keep none of them
+                self._keep(keys[i], bool(ok), token, failed)
+            return [bool(v) for v in out]
+
+        if inspect.isawaitable(res) or self.async_mode:
+
+            async def _run() -> list[bool]:
+                with track_failures() as later:
+                    results = await res if inspect.isawaitable(res) else res
+                return _merge(results, bool(failures or later))
+
+            return _run()
+        return _merge(res, bool(failures))
+
+    def invalidate(
+        self, subject: str, relation: str, resource: str, *, context: dict[str, Any] | None = None
+    ) -> None:
+        """Drop the cached result for one triple (and caveat context)."""
+        self.cache.delete(_key(subject, relation, resource, context))
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    # --------------- internals ---------------
+
+    def _lookup(self, key: str, token: str | None) -> bool | None:
+        try:
+            entry = self.cache.get(key)
+        except Exception:  # pragma: no cover
+            logger.debug("RBACX: ReBAC cache get failed", exc_info=True)
+            return None
+        if entry is None:
+            return None
+        allowed, checked_with = entry
+        if token is not None and checked_with != token:
+            return None
+        return bool(allowed)
+
+    def _keep(self, key: str, allowed: bool, token: str | None, failed: Any) -> None:
+        # a fail-closed default is not the provider's answer: do not remember it
+        if not failed:
+            self._store(key, allowed, token)
+
+    def _store(self, key: str, allowed: bool, token: str | None) -> None:
+        try:
+            self.cache.set(key, (allowed, token), ttl=self.ttl)
+        except Exception:  # pragma: no cover
+            logger.debug("RBACX: ReBAC cache set failed", exc_info=True)
+
+
+def _is_async(inner: Any) -> bool:
+    # OpenFGAChecker / SpiceDBChecker hold an async client in async mode; wrappers
+    # (resilience, batching) answer the way the checker they wrap does
+    seen: set[int] = set()
+    while inner is not None and id(inner) not in seen:
+        seen.add(id(inner))
+        check = getattr(inner, "check", None)
+        if inspect.iscoroutinefunction(check) or getattr(inner, "_aclient", None) is not None:
+            return True
+        inner = getattr(inner, "inner", None)
+    return False
+
+
+async def _ready(value: Any) -> Any:
+    return value
+
+
+__all__ = ["CachingRelationshipChecker"]
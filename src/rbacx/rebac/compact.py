@@ -0,0 +1,361 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .local import RelTuple, as_rel_tuple
+
+# Caveat column value for tuples without a caveat.
+_NO_CAVEAT = 0xFFFFFFFF
+
+# Snapshot layout (all sections 4-byte aligned, uint32 in the byte order named
+# in the header):
+#   magic(8) | byte order(1) | pad(3) | n_strings, n_rows, blob_len (uint32 x 3)
+#   string offsets [n_strings + 1] | utf-8 string blob (padded)
+#   subject, relation, resource, caveat columns [n_rows each]
+#   resource offsets [n_strings + 1] | resource rows [n_rows]
+#   subject offsets [n_strings + 1]  | subject rows [n_rows]
+_SNAPSHOT_MAGIC = b"RBXREL01"
+_SNAPSHOT_HEADER = struct.Struct("<8sc3xIII")
+
+
+# RelTuple is a frozen slots dataclass: its generated __init__ goes through
+# object.__setattr__ per field.  Rows are materialized on every lookup, so fill
+# the slots through their descriptors directly (same object, ~3x cheaper).
+_new_tuple = object.__new__
+_set_subject = RelTuple.__dict__["subject"].__set__
+_set_relation = RelTuple.__dict__["relation"].__set__
+_set_resource = RelTuple.__dict__["resource"].__set__
+_set_caveat = RelTuple.__dict__["caveat"].__set__
+
+
+def _zeros(n: int) -> array:
+    return array("I", bytes(4 * n))
+
+
+def _to_array(col: Any) -> array:
+    if isinstance(col, array):
+        return col
+    out = array("I")
+    out.frombytes(col.cast("B"))
+    return out
+
+
+def _counting_order(col: Any, rows: Iterable[int], n_rows: int, n_ids: int) -> tuple[array, array]:
+    """Stable counting sort of *rows* by ``col[row]``.
+
+    Returns ``(ordered_rows, offsets)`` where rows with key ``k`` live in
+    ``ordered_rows[offsets[k]:offsets[k + 1]]`` (CSR layout).
+    """
+    offsets = _zeros(n_ids + 1)
+    for r in rows:
+        offsets[col[r] + 1] += 1
+    for k in range(n_ids):
+        offsets[k + 1] += offsets[k]
+    cursor = array("I", offsets)
+    out = _zeros(n_rows)
+    for r in rows:
+        k = col[r]
+        out[cursor[k]] = r
+        cursor[k] += 1
+    return out, offsets
+
+
+class _CSRIndex:
+    """Immutable CSR adjacency over rows ``[0, size)`` of the tuple columns."""
+
+    __slots__ = ("size", "res_offsets", "res_rows", "subj_offsets", "subj_rows")
+
+    def __init__(
+        self,
+        size: int,
+        res_offsets: Any,
+        res_rows: Any,
+        subj_offsets: Any,
+        subj_rows: Any,
+    ) -> None:
+        self.size = size
+        self.res_offsets = res_offsets
+        self.res_rows = res_rows
+        self.subj_offsets = subj_offsets
+        self.subj_rows = subj_rows
+
+
+_EMPTY_INDEX = _CSRIndex(0, _zeros(1), _zeros(0), _zeros(1), _zeros(0))
+
+_Pending = dict[tuple[int, int], list[int]]
+
+
+class CompactRelationshipStore:
+    """
+    Memory-compact tuple store with the same interface as ``InMemoryRelationshipStore``.
+
+    Layout:
+      - every object/relation/caveat string is interned once to a 32-bit id;
+      - tuples live in four ``array('I')`` columns (subject, relation, resource, caveat),
+        i.e. 16 bytes per tuple instead of a ``RelTuple`` object stored twice;
+      - lookups use CSR adjacency: for each object id an offset range into a row
+        permutation sorted by relation, so ``direct_for_resource`` and ``by_subject``
+        are an offset read plus a binary search.
+
+    Tuples added after the last compaction are kept in a small pending index and
+    merged into the CSR arrays once ``compact_threshold`` rows (and at least a
+    quarter of the compacted size) accumulate, or on an explicit :meth:`compact`.
+    The store is built for load-then-serve workloads; readers never take the
+    write lock.
+    """
+
+    def __init__(self, *, compact_threshold: int = 65_536) -> None:
+        self.compact_threshold = int(compact_threshold)
+        self._ids: dict[str, int] = {}
+        self._strings: list[str] = []
+        self._subj = array("I")
+        self._rel = array("I")
+        self._res = array("I")
+        self._cav = array("I")
+        # (index, pending by (resource, relation), pending by (subject, relation));
+        # pending maps hold rows >= index.size.  Swapped as one tuple so readers
+        # always see a consistent pair.
+        self._state: tuple[_CSRIndex, _Pending, _Pending] = (_EMPTY_INDEX, {}, {})
+        self._lock = threading.Lock()
+        # mmap / bytes backing columns loaded from a snapshot (kept alive here)
+        self._buffer: Any = None
+
+    # ------------ writes ------------
+
+    def add(self, subject: str, relation: str, resource: str, *, caveat: str | None = None) -> None:
+        with self._lock:
+            self._append(subject, relation, resource, caveat)
+            self._maybe_compact_locked()
+
+    def add_many(self, tuples: Iterable[Any]) -> int:
+        """Add ``RelTuple`` items or ``(subject, relation, resource[, caveat])`` sequences.
+
+        Compaction is checked once per call.  Returns the number of tuples added.
+        """
+        n = 0
+        append = self._append
+        with self._lock:
+            for item in tuples:
+                if isinstance(item, RelTuple):
+                    append(item.subject, item.relation, item.resource, item.caveat)
+                elif len(item) == 3:
+                    append(str(item[0]), str(item[1]), str(item[2]), None)
+                else:
+                    t = as_rel_tuple(item)
+                    append(t.subject, t.relation, t.resource, t.caveat)
+                n += 1
+            self._maybe_compact_locked()
+        return n
+
+    def compact(self) -> None:
+        """Merge pending tuples into the CSR arrays."""
+        with self._lock:
+            if len(self._subj) != self._state[0].size:
+                self._compact_locked()
+
+    # ------------ reads ------------
+
+    def direct_for_resource(self, relation: str, resource: str) -> Iterable[RelTuple]:
+        return self._lookup(resource, relation, by_resource=True)
+
+    def by_subject(self, subject: str, relation: str) -> Iterable[RelTuple]:
+        return self._lookup(subject, relation, by_resource=False)
+
+    def iter_tuples(self) -> Iterator[RelTuple]:
+        """Yield every stored tuple in insertion order."""
+        for row in range(len(self._subj)):
+            yield self._tuple(row)
+
+    def __len__(self) -> int:
+        return len(self._subj)
+
+    # ------------ snapshots ------------
+
+    def save_snapshot(self, path: str) -> None:
+        """Write a binary snapshot that :meth:`load_snapshot` can memory-map.
+
+        Pending tuples are compacted first.  The file is replaced atomically.
+        """
+        self.compact()
+        with self._lock:
+            idx = self._state[0]
+            encoded = [x.encode("utf-8") for x in self._strings]
+            str_offsets = array("I", [0])
+            for b in encoded:
+                str_offsets.append(str_offsets[-1] + len(b))
+            blob = b"".join(encoded)
+            blob += b"\0" * (-len(blob) % 4)
+            sections = (
+                str_offsets,
+                self._subj,
+                self._rel,
+                self._res,
+                self._cav,
+                idx.res_offsets,
+                idx.res_rows,
+                idx.subj_offsets,
+                idx.subj_rows,
+            )
+            order = b"<" if sys.byteorder == "little" else b">"
+            header = _SNAPSHOT_HEADER.pack(
+                _SNAPSHOT_MAGIC, order, len(self._strings), len(self._subj), len(blob)
+            )
+            directory = os.path.dirname(path) or "."
+            fd, tmp = tempfile.mkstemp(prefix=".rbacx.tmp.", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(header)
+                    f.write(memoryview(sections[0]).cast("B"))
+                    f.write(blob)
+                    for col in sections[1:]:
+                        f.write(memoryview(col).cast("B"))
+                os.replace(tmp, path)
+            finally:
+                try:
+                    os.unlink(tmp)
+                except FileNotFoundError:
+                    pass
+
+    @classmethod
+    def load_snapshot(
+        cls, path: str, *, use_mmap: bool = True, compact_threshold: int = 65_536
+    ) -> "CompactRelationshipStore":
+        """Load a snapshot written by :meth:`save_snapshot`.
+
+        With ``use_mmap=True`` (default) the tuple columns and CSR indexes are
+        served straight from the memory-mapped file; only the string table is
+        decoded into Python objects.  The first write copies the columns into
+        private arrays.
+        """
+        with open(path, "rb") as f:
+            if use_mmap:
+                buf: Any = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                buf = f.read()
+        view = memoryview(buf)
+        magic, order, n_strings, n_rows, blob_len = _SNAPSHOT_HEADER.unpack_from(view, 0)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path!r} is not an rbacx relationship snapshot")
+        native = (order == b"<") == (sys.byteorder == "little")
+        pos = _SNAPSHOT_HEADER.size
+
+        def _take(count: int) -> Any:
+            nonlocal pos
+            chunk = view[pos : pos + 4 * count]
+            if len(chunk) != 4 * count:
+                raise ValueError(f"truncated relationship snapshot {path!r}")
+            pos += 4 * count
+            if native:
+                return chunk.cast("I")
+            swapped = array("I", chunk.tobytes())  # pragma: no cover - foreign byte order
+            swapped.byteswap()  # pragma: no cover
+            return swapped  # pragma: no cover
+
+        str_offsets = _take(n_strings + 1)
+        blob = view[pos : pos + blob_len]
+        pos += blob_len
+
+        store = cls(compact_threshold=compact_threshold)
+        strings = [
+            str(blob[str_offsets[i] : str_offsets[i + 1]], "utf-8") for i in range(n_strings)
+        ]
+        store._strings = strings
+        store._ids = {x: i for i, x in enumerate(strings)}
+        store._subj = _take(n_rows)
+        store._rel = _take(n_rows)
+        store._res = _take(n_rows)
+        store._cav = _take(n_rows)
+        res_offsets = _take(n_strings + 1)
+        res_rows = _take(n_rows)
+        subj_offsets = _take(n_strings + 1)
+        subj_rows = _take(n_rows)
+        store._state = (_CSRIndex(n_rows, res_offsets, res_rows, subj_offsets, subj_rows), {}, {})
+        store._buffer = buf
+        return store
+
+    # ------------ internals ------------
+
+    def _intern(self, value: str) -> int:
+        i = self._ids.get(value)
+        if i is None:
+            i = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = i
+        return i
+
+    def _append(self, subject: str, relation: str, resource: str, caveat: str | None) -> None:
+        if self._buffer is not None:
+            # columns are read-only views into a snapshot: copy on first write
+            self._subj = _to_array(self._subj)
+            self._rel = _to_array(self._rel)
+            self._res = _to_array(self._res)
+            self._cav = _to_array(self._cav)
+            self._buffer = None
+        s = self._intern(subject)
+        r = self._intern(relation)
+        o = self._intern(resource)
+        row = len(self._subj)
+        self._subj.append(s)
+        self._rel.append(r)
+        self._res.append(o)
+        self._cav.append(_NO_CAVEAT if caveat is None else self._intern(caveat))
+        _, pending_res, pending_subj = self._state
+        pending_res.setdefault((o, r), []).append(row)
+        pending_subj.setdefault((s, r), []).append(row)
+
+    def _maybe_compact_locked(self) -> None:
+        # Geometric trigger: pending must reach both the configured threshold and a
+        # quarter of the compacted rows, so repeated loads cost amortized O(n).
+        size = self._state[0].size
+        if len(self._subj) - size >= max(self.compact_threshold, size // 4):
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        n = len(self._subj)
+        n_ids = len(self._strings)
+        # Sort by relation first, then (stably) by object: each object's CSR range
+        # ends up ordered by relation id and can be binary-searched.
+        by_rel, _ = _counting_order(self._rel, range(n), n, n_ids)
+        res_rows, res_offsets = _counting_order(self._res, by_rel, n, n_ids)
+        subj_rows, subj_offsets = _counting_order(self._subj, by_rel, n, n_ids)
+        self._state = (_CSRIndex(n, res_offsets, res_rows, subj_offsets, subj_rows), {}, {})
+
+    def _lookup(self, obj: str, relation: str, *, by_resource: bool) -> list[RelTuple]:
+        o = self._ids.get(obj)
+        r = self._ids.get(relation)
+        if o is None or r is None:
+            return []
+        idx, pending_res, pending_subj = self._state
+        if by_resource:
+            offsets, rows, pending = idx.res_offsets, idx.res_rows, pending_res
+        else:
+            offsets, rows, pending = idx.subj_offsets, idx.subj_rows, pending_subj
+        out: list[RelTuple] = []
+        if o + 1 < len(offsets):
+            lo, hi = offsets[o], offsets[o + 1]
+            if lo < hi:
+                rel_of = self._rel.__getitem__
+                start = bisect_left(rows, r, lo, hi, key=rel_of)
+                end = bisect_right(rows, r, start, hi, key=rel_of)
+                out.extend(self._tuple(rows[i]) for i in range(start, end))
+        for row in pending.get((o, r), ()):
+            if row >= idx.size:
+                out.append(self._tuple(row))
+        return out
+
+    def _tuple(self, row: int) -> RelTuple:
+        strings = self._strings
+        cav = self._cav[row]
+        t = _new_tuple(RelTuple)
+        _set_subject(t, strings[self._subj[row]])
+        _set_relation(t, strings[self._rel[row]])
+        _set_resource(t, strings[self._res[row]])
+        _set_caveat(t, None if cav == _NO_CAVEAT else strings[cav])
+        return t
@@ -1,7 +1,9 @@
 import logging
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Callable, Iterable
+from typing import Any, Callable, Iterable, Iterator, Literal, Protocol
 
 from ..core.ports import RelationshipChecker
 
@@ -46,7 +48,7 @@ UsersetExpr = This | ComputedUserset | TupleToUserset | list["UsersetExpr"]
 # ---------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RelTuple:
     subject: str  # e.g. "user:42" or "folder:10" (for object->object edges)
     relation: str  # e.g. "viewer", "parent"
@@ -54,20 +56,126 @@ class RelTuple:
     caveat: str | None = None  # optional caveat name from registry
 
 
+def as_rel_tuple(item: Any) -> RelTuple:
+    """Coerce a ``RelTuple`` or a ``(subject, relation, resource[, caveat])`` sequence."""
+    if isinstance(item, RelTuple):
+        return item
+    if len(item) == 3:
+        s, r, o = item
+        return RelTuple(subject=str(s), relation=str(r), resource=str(o))
+    s, r, o, c = item
+    return RelTuple(subject=str(s), relation=str(r), resource=str(o), caveat=c or None)
+
+
+@dataclass(frozen=True, slots=True)
+class RelationshipUpdate:
+    """One change to a tuple store, modeled on SpiceDB ``RelationshipUpdate``.
+
+    ``create`` adds the tuple unless one with the same ``(subject, relation,
+    resource)`` exists, ``touch`` adds it or replaces the caveat of an existing
+    one, ``delete`` removes it (any caveat).
+    """
+
+    operation: Literal["create", "touch", "delete"]
+    relationship: RelTuple
+
+
+class RelationshipStore(Protocol):
+    """Read interface the local checker needs from a tuple store."""
+
+    def direct_for_resource(self, relation: str, resource: str) -> Iterable[RelTuple]: ...
+
+    def by_subject(self, subject: str, relation: str) -> Iterable[RelTuple]: ...
+
+
 class InMemoryRelationshipStore:
     """
     Minimal tuple store with indexes by (resource, relation) and (subject, relation).
-    Suitable for tests/dev. For production, implement the same interface on top of a DB.
+    Suitable for tests/dev. For large tuple sets use
+    :class:`rbacx.rebac.compact.CompactRelationshipStore` (same interface, compact
+    in-memory columns) or :class:`rbacx.rebac.sqlite.SQLiteRelationshipStore` (on disk).
+
+    Writers serialize on a lock; readers never lock.  Deletes, touches and
+    :meth:`apply` batches build replacement index buckets and publish each one
+    once, instead of mutating a list a concurrent ``check`` may be iterating, so
+    a reader sees a bucket either before or after the write.  ``revision``
+    increases with every write call (one step per :meth:`apply` batch).
     """
 
     def __init__(self) -> None:
         self._by_res_rel: dict[tuple[str, str], list[RelTuple]] = {}
         self._by_subj_rel: dict[tuple[str, str], list[RelTuple]] = {}
+        self._lock = threading.Lock()
+        self._revision = 0
+
+    @property
+    def revision(self) -> int:
+        """Monotonically increasing write counter."""
+        return self._revision
 
     def add(self, subject: str, relation: str, resource: str, *, caveat: str | None = None) -> None:
         t = RelTuple(subject=subject, relation=relation, resource=resource, caveat=caveat)
-        self._by_res_rel.setdefault((resource, relation), []).append(t)
-        self._by_subj_rel.setdefault((subject, relation), []).append(t)
+        with self._lock:
+            self._insert(t)
+            self._revision += 1
+
+    def add_many(self, tuples: Iterable[Any]) -> int:
+        """Add ``RelTuple`` items or ``(subject, relation, resource[, caveat])`` sequences.
+
+        Returns the number of tuples added.
+        """
+        n = 0
+        with self._lock:
+            by_res = self._by_res_rel
+            by_subj = self._by_subj_rel
+            for item in tuples:
+                t = as_rel_tuple(item)
+                by_res.setdefault((t.resource, t.relation), []).append(t)
+                by_subj.setdefault((t.subject, t.relation), []).append(t)
+                n += 1
+            self._revision += 1
+        return n
+
+    def delete(self, subject: str, relation: str, resource: str) -> int:
+        """Remove every tuple ``(subject, relation, resource)`` regardless of caveat.
+
+        Returns the number of tuples removed.
+        """
+        t = RelTuple(subject=subject, relation=relation, resource=resource)
+        with self._lock:
+            n = self._write([RelationshipUpdate("delete", t)])
+            self._revision += 1
+        return n
+
+    def touch(
+        self, subject: str, relation: str, resource: str, *, caveat: str | None = None
+    ) -> None:
+        """Insert the tuple, replacing any existing one with the same identity."""
+        t = RelTuple(subject=subject, relation=relation, resource=resource, caveat=caveat)
+        with self._lock:
+            self._write([RelationshipUpdate("touch", t)])
+            self._revision += 1
+
+    def apply(self, updates: Iterable[RelationshipUpdate]) -> int:
+        """Apply a batch of updates, bumping ``revision`` once.
+
+        The whole batch is validated before anything changes: an unknown
+        operation raises ``ValueError`` and leaves the store untouched.  Readers
+        may see some buckets of a batch before others.  Returns the new revision.
+        """
+        batch = list(updates)
+        for u in batch:
+            if u.operation not in ("create", "touch", "delete"):
+                raise ValueError(f"unknown relationship update operation: {u.operation!r}")
+        with self._lock:
+            self._write(batch)
+            self._revision += 1
+            return self._revision
+
+    def iter_tuples(self) -> Iterator[RelTuple]:
+        """Yield every stored tuple."""
+        for bucket in list(self._by_res_rel.values()):
+            yield from bucket
 
     def direct_for_resource(self, relation: str, resource: str) -> Iterable[RelTuple]:
         return self._by_res_rel.get((resource, relation), ())
@@ -75,6 +183,58 @@ class InMemoryRelationshipStore:
     def by_subject(self, subject: str, relation: str) -> Iterable[RelTuple]:
         return self._by_subj_rel.get((subject, relation), ())
 
+    # --------------- internals (caller holds the lock) ---------------
+
+    def _insert(self, t: RelTuple) -> None:
+        self._by_res_rel.setdefault((t.resource, t.relation), []).append(t)
+        self._by_subj_rel.setdefault((t.subject, t.relation), []).append(t)
+
+    def _write(self, updates: list[RelationshipUpdate]) -> int:
+        """Stage *updates* on copies of the buckets they touch, then publish each once.
+
+        Returns the number of tuples removed by ``delete`` updates.
+        """
+        by_res: dict[tuple[str, str], list[RelTuple]] = {}
+        by_subj: dict[tuple[str, str], list[RelTuple]] = {}
+
+        def res_bucket(t: RelTuple) -> list[RelTuple]:
+            key = (t.resource, t.relation)
+            if key not in by_res:
+                by_res[key] = list(self._by_res_rel.get(key, ()))
+            return by_res[key]
+
+        def subj_bucket(t: RelTuple) -> list[RelTuple]:
+            key = (t.subject, t.relation)
+            if key not in by_subj:
+                by_subj[key] = list(self._by_subj_rel.get(key, ()))
+            return by_subj[key]
+
+        removed = 0
+        for u in updates:
+            t = u.relationship
+            rb = res_bucket(t)
+            exists = any(x.subject == t.subject for x in rb)
+            if u.operation == "create" and exists:
+                continue
+            if exists and u.operation in ("touch", "delete"):
+                kept = [x for x in rb if x.subject != t.subject]
+                if u.operation == "delete":
+                    removed += len(rb) - len(kept)
+                rb[:] = kept
+                sb = subj_bucket(t)
+                sb[:] = [x for x in sb if x.resource != t.resource]
+            if u.operation in ("create", "touch"):
+                rb.append(t)
+                subj_bucket(t).append(t)
+
+        for index, staged in ((self._by_res_rel, by_res), (self._by_subj_rel, by_subj)):
+            for key, bucket in staged.items():
+                if bucket:
+                    index[key] = bucket
+                elif key in index:
+                    del index[key]
+        return removed
+
 
 # ---------------------------
 # LocalRelationshipChecker
@@ -101,7 +261,7 @@ class LocalRelationshipChecker(RelationshipChecker):
 
     def __init__(
         self,
-        store: InMemoryRelationshipStore,
+        store: RelationshipStore,
         *,
         # rules: mapping[object_type][relation] -> UsersetExpr
         rules: dict[str, dict[str, UsersetExpr]] | None = None,
@@ -165,21 +325,96 @@ class LocalRelationshipChecker(RelationshipChecker):
     def batch_check(
         self, triples: list[tuple[str, str, str]], *, context: dict[str, Any] | None = None
     ) -> list[bool]:
-        # Simple sequential evaluation with a tiny per-call memo
-        memo: dict[tuple[str, str, str], bool] = {}
-        out: list[bool] = []
+        """Check many triples, sharing one graph expansion per subject.
+
+        Triples with the same subject are answered by a single multi-source search
+        (see :meth:`_check_shared`), so filtering a list of resources costs one walk
+        over the reachable graph instead of one BFS per resource.
+        """
+        seeds_by_subject: dict[str, dict[tuple[str, str], None]] = {}
         for s, r, o in triples:
-            key = (s, r, o)
-            if key in memo:
-                out.append(memo[key])
-            else:
-                res = self.check(s, r, o, context=context)
-                memo[key] = res
-                out.append(res)
-        return out
+            seeds_by_subject.setdefault(s, {})[(r, o)] = None
+
+        results: dict[tuple[str, str, str], bool] = {}
+        for s, seeds in seeds_by_subject.items():
+            if len(seeds) == 1:
+                ((r, o),) = seeds
+                results[(s, r, o)] = self.check(s, r, o, context=context)
+                continue
+            for (r, o), ok in self._check_shared(s, list(seeds), context).items():
+                results[(s, r, o)] = ok
+        return [results[t] for t in triples]
 
     # --------------- internals ---------------
 
+    def _check_shared(
+        self, subject: str, seeds: list[tuple[str, str]], context: dict[str, Any] | None
+    ) -> dict[tuple[str, str], bool]:
+        """
+        Multi-source BFS over (relation, object) nodes for one subject.
+
+        Every node is expanded once, at its smallest depth from any seed.  Reverse
+        edges are recorded so that when a node turns out to be allowed, its shortest
+        distance-to-allowed is propagated back towards the seeds; a seed is granted
+        as soon as that distance is within ``max_depth`` -- exactly the condition
+        under which :meth:`check` would find it.  Limits scale with the number of
+        seeds; seeds left unresolved when a limit hits are denied.
+        """
+        max_depth = self.max_depth
+        result = dict.fromkeys(seeds, False)
+        unresolved = set(seeds)
+        deadline = time.perf_counter_ns() + self.deadline_ms * 1_000_000 * len(seeds)
+        budget = self.max_nodes * len(seeds)
+
+        depth: dict[tuple[str, str], int] = dict.fromkeys(seeds, 0)
+        parents: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        dist: dict[tuple[str, str], int] = {}  # shortest known distance to an allowed node
+
+        def relax(node: tuple[str, str], d: int) -> None:
+            stack = [(node, d)]
+            while stack:
+                v, dv = stack.pop()
+                if dv > max_depth or dist.get(v, max_depth + 1) <= dv:
+                    continue
+                dist[v] = dv
+                if v in unresolved:
+                    unresolved.discard(v)
+                    result[v] = True
+                for p in parents.get(v, ()):
+                    stack.append((p, dv + 1))
+
+        frontier = deque(seeds)
+        visits = 0
+        while frontier and unresolved:
+            node = frontier.popleft()
+            visits += 1
+            if visits > budget or time.perf_counter_ns() > deadline:
+                break
+            rel, obj = node
+
+            if self._direct_allowed(subject, rel, obj, context):
+                # anything reached only through an allowed node cannot do better
+                relax(node, 0)
+                continue
+
+            d = depth[node]
+            if d >= max_depth:
+                continue
+            expr = self._lookup_expr(_split_ref(obj)[0], rel)
+            if expr is None:
+                continue
+
+            for _, r2, o2 in self._expand(expr, subject, obj):
+                child = (r2, o2)
+                parents.setdefault(child, []).append(node)
+                if child not in depth:
+                    depth[child] = d + 1
+                    frontier.append(child)
+                elif child in dist:
+                    relax(node, dist[child] + 1)
+
+        return result
+
     def _direct_allowed(
         self, subject: str, relation: str, resource: str, context: dict[str, Any] | None
     ) -> bool:
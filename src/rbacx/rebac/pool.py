@@ -0,0 +1,87 @@
+import asyncio
+import inspect
+import logging
+import threading
+from typing import Any
+
+logger = logging.getLogger("rbacx.rebac.pool")
+
+POOL_UTILIZATION_METRIC = "rbacx_rebac_pool_utilization"
+
+
+class PoolTracker:
+    """Count requests in flight against a client's connection capacity.
+
+    Used as a context manager around every outbound call (sync or async code --
+    it never awaits).  :meth:`stats` reports current/peak usage; when a metrics
+    sink with ``observe()`` is given, each call start records the utilization
+    (in-flight / capacity, 0..1) as ``rbacx_rebac_pool_utilization`` with a
+    ``provider`` label.  A utilization that sits at 1.0 means callers are
+    queueing for a connection slot.
+    """
+
+    def __init__(self, provider: str, capacity: int | None, metrics: Any = None) -> None:
+        self.provider = provider
+        self.capacity = capacity if capacity and capacity > 0 else None
+        self._observe = getattr(metrics, "observe", None) if metrics is not None else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak = 0
+        self._total = 0
+
+    def __enter__(self) -> "PoolTracker":
+        with self._lock:
+            self._in_flight += 1
+            self._total += 1
+            in_flight = self._in_flight
+            if in_flight > self._peak:
+                self._peak = in_flight
+        if self._observe is not None and self.capacity is not None:
+            self._emit(min(1.0, in_flight / self.capacity))
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot: ``in_flight``, ``peak``, ``total``, ``capacity``, ``utilization``."""
+        with self._lock:
+            in_flight, peak, total = self._in_flight, self._peak, self._total
+        return {
+            "in_flight": in_flight,
+            "peak": peak,
+            "total": total,
+            "capacity": self.capacity,
+            "utilization": (in_flight / self.capacity) if self.capacity else None,
+        }
+
+    def _emit(self, value: float) -> None:
+        emit_metric(self._observe, POOL_UTILIZATION_METRIC, value, {"provider": self.provider})
+
+
+def emit_metric(fn: Any, *args: Any) -> None:
+    """Call a (sync or async) metrics method without blocking or raising.
+
+    Async sinks are scheduled on the running loop, if any, and dropped otherwise.
+    """
+    if fn is None:
+        return
+    try:
+        res = fn(*args)
+        if inspect.isawaitable(res):
+            try:
+                asyncio.get_running_loop().create_task(_consume(res))
+            except RuntimeError:
+                close = getattr(res, "close", None)
+                if close is not None:
+                    close()
+    except Exception:  # pragma: no cover
+        logger.debug("RBACX: metrics call failed", exc_info=True)
+
+
+async def _consume(aw: Any) -> None:
+    await aw
+
+
+__all__ = ["PoolTracker", "POOL_UTILIZATION_METRIC", "emit_metric"]
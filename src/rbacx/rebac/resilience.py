@@ -0,0 +1,425 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import inspect
+import logging
+import threading
+import time
+from asyncio import AbstractEventLoop
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+from ..core.helpers import _await_compat
+from ..core.ports import RelationshipChecker
+from ..core.relctx import EVAL_LOOP, bounded_timeout, report_failure
+from .pool import emit_metric
+
+logger = logging.getLogger("rbacx.rebac.resilience")
+
+EVENTS_METRIC = "rbacx_rebac_events_total"
+BREAKER_STATE_METRIC = "rbacx_rebac_breaker_state"
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# gauge encoding of the breaker state
+_STATE_VALUE = {CLOSED: 0.0, HALF_OPEN: 1.0, OPEN: 2.0}
+# distinct classes before Python 3.11
+_TIMEOUTS = (TimeoutError, concurrent.futures.TimeoutError, asyncio.TimeoutError)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    ``failure_threshold`` failures in a row open the circuit: calls are rejected
+    without reaching the provider for ``recovery_timeout`` seconds.  Then a single
+    trial call is let through (half-open); its success closes the circuit, its
+    failure opens it again.  *on_change(state)* is called on every transition.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 10.0,
+        *,
+        on_change: Callable[[str], None] | None = None,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        self.failure_threshold = int(failure_threshold)
+        self.recovery_timeout = float(recovery_timeout)
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the trial slot when half-open)."""
+        changed = None
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = changed = HALF_OPEN
+            if self._state == HALF_OPEN:
+                if self._trial_in_flight:
+                    allowed = False
+                else:
+                    self._trial_in_flight = allowed = True
+            else:
+                allowed = True
+        self._notify(changed)
+        return allowed
+
+    def record_success(self) -> None:
+        changed = None
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != CLOSED:
+                self._state = changed = CLOSED
+        self._notify(changed)
+
+    def release(self) -> None:
+        """Give back a trial slot claimed by :meth:`allow` for a call that never completed."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        changed = None
+        with self._lock:
+            self._trial_in_flight = False
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = changed = OPEN
+                self._opened_at = time.monotonic()
+        self._notify(changed)
+
+    def _notify(self, state: str | None) -> None:
+        if state is not None and self._on_change is not None:
+            self._on_change(state)
+
+
+class _LatencyWindow:
+    """Sliding window of recent call latencies with a cached quantile."""
+
+    def __init__(self, size: int, quantile: float, min_samples: int) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, int(size)))
+        self._q = float(quantile)
+        self._min = max(1, int(min_samples))
+        self._lock = threading.Lock()
+        self._cached: float | None = None
+        self._stale = 0
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale += 1
+            # re-sorting on every sample is wasteful; refresh every 16 samples
+            if self._stale >= 16:
+                self._cached = None
+
+    def value(self) -> float | None:
+        with self._lock:
+            n = len(self._samples)
+            if n < self._min:
+                return None
+            if self._cached is None:
+                ordered = sorted(self._samples)
+                self._cached = ordered[min(n - 1, int(self._q * n))]
+                self._stale = 0
+            return self._cached
+
+
+class ResilientRelationshipChecker(RelationshipChecker):
+    """
+    Deadline-aware, hedging, circuit-breaking wrapper around a ReBAC provider.
+
+    - **Deadlines**: each call gets ``timeout`` seconds, cut down to what is left
+      of the decision deadline (``Guard(decision_timeout=...)``).  The providers
+      read the same deadline, so the wire timeout shrinks with it.  A call that
+      runs out of time resolves to ``False``.
+    - **Hedging**: when a ``check()`` has not answered after the
+      ``hedge_quantile`` latency of recent calls (p95 by default, at least
+      ``min_hedge_delay_ms``), one duplicate request is sent and the first answer
+      wins.  Hedging needs ``hedge_min_samples`` observations before it kicks in;
+      ``hedge_quantile=None`` disables it.  ``batch_check()`` is never hedged.
+    - **Circuit breaker**: after ``failure_threshold`` consecutive failures
+      (exceptions or timeouts) calls are denied immediately for
+      ``recovery_timeout`` seconds (fail-closed), then one trial call probes the
+      provider.
+
+    With ``metrics``, events are counted as ``rbacx_rebac_events_total`` (labels
+    ``provider`` and ``event``: ``hedge``, ``hedge_won``, ``timeout``, ``error``,
+    ``rejected``) and breaker transitions are observed as
+    ``rbacx_rebac_breaker_state`` (0 closed, 1 half-open, 2 open).
+
+    Note that the bundled providers already turn RPC errors into ``False``; the
+    breaker therefore reacts to slow or hanging providers (timeouts) and to
+    checkers that raise.
+    """
+
+    def __init__(
+        self,
+        inner: RelationshipChecker,
+        *,
+        timeout: float | None = None,
+        hedge_quantile: float | None = 0.95,
+        min_hedge_delay_ms: float = 1.0,
+        hedge_min_samples: int = 20,
+        latency_window: int = 512,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 10.0,
+        max_workers: int = 16,
+        metrics: Any = None,
+        name: str | None = None,
+    ) -> None:
+        self.inner = inner
+        self.timeout = timeout
+        self.name = name or type(inner).__name__
+        self.hedging = hedge_quantile is not None
+        self.min_hedge_delay = float(min_hedge_delay_ms) / 1000.0
+        self._latency = _LatencyWindow(
+            latency_window, 0.95 if hedge_quantile is None else hedge_quantile, hedge_min_samples
+        )
+        self._inc = getattr(metrics, "inc", None) if metrics is not None else None
+        self._observe = getattr(metrics, "observe", None) if metrics is not None else None
+        self.breaker = CircuitBreaker(
+            failure_threshold, recovery_timeout, on_change=self._breaker_changed
+        )
+        self._max_workers = int(max_workers)
+        self._pool: concurrent.futures.ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        self._counts_lock = threading.Lock()
+        self._counts: dict[str, int] = {}
+
+    # --------------- RelationshipChecker ---------------
+
+    def check(
+        self, subject: str, relation: str, resource: str, *, context: dict[str, Any] | None = None
+    ) -> Any:
+        return self._call(
+            lambda: self.inner.check(subject, relation, resource, context=context),
+            hedge=self.hedging,
+            fallback=False,
+        )
+
+    def batch_check(
+        self, triples: list[tuple[str, str, str]], *, context: dict[str, Any] | None = None
+    ) -> Any:
+        if not triples:
+            return []
+        return self._call(
+            lambda: self.inner.batch_check(triples, context=context),
+            hedge=False,
+            fallback=[False] * len(triples),
+        )
+
+    # --------------- diagnostics / lifecycle ---------------
+
+    def stats(self) -> dict[str, Any]:
+        """Event counters, breaker state and the current hedge delay."""
+        with self._counts_lock:
+            out: dict[str, Any] = dict(self._counts)
+        out["breaker_state"] = self.breaker.state
+        out["hedge_delay"] = self._hedge_delay() if self.hedging else None
+        return out
+
+    def close(self) -> None:
+        """Shut down the worker pool used for sync calls, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    # --------------- internals ---------------
+
+    def _call(self, fn: Callable[[], Any], *, hedge: bool, fallback: Any) -> Any:
+        budget = bounded_timeout(self.timeout)
+        if budget is not None and budget <= 0:
+            self._event("timeout")
+            report_failure()
+            return fallback
+        delay = self._hedge_delay() if hedge else None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if not self.breaker.allow():
+                self._event("rejected")
+                report_failure()
+                return fallback
+            return self._call_sync(fn, budget, delay, fallback, EVAL_LOOP.get())
+        # the breaker is consulted when the coroutine runs, not when it is created
+        return self._call_async(fn, budget, delay, fallback)
+
+    def _hedge_delay(self) -> float | None:
+        q = self._latency.value()
+        return None if q is None else max(q, self.min_hedge_delay)
+
+    def _call_sync(
+        self,
+        fn: Callable[[], Any],
+        budget: float | None,
+        delay: float | None,
+        fallback: Any,
+        loop: AbstractEventLoop | None,
+    ) -> Any:
+        start = time.monotonic()
+        end = None if budget is None else start + budget
+        ctx = contextvars.copy_context()
+
+        def attempt() -> Any:
+            # each attempt runs in its own copy of the caller's context (deadline included)
+            res = ctx.copy().run(fn)
+            if inspect.isawaitable(res):
+                left = None if end is None else max(0.0, end - time.monotonic())
+                if loop is not None and loop.is_running():
+                    fut = asyncio.run_coroutine_threadsafe(_await_compat(res), loop)
+                    try:
+                        return fut.result(timeout=left)
+                    finally:
+                        fut.cancel()
+                return asyncio.run(asyncio.wait_for(_await_compat(res), left))
+            return res
+
+        pool = self._workers()
+        primary = pool.submit(attempt)
+        pending = [primary]
+        hedge_at = None if delay is None else start + delay
+        error: BaseException | None = None
+        while pending:
+            now = time.monotonic()
+            if end is not None and now >= end:
+                break
+            wake = min((t for t in (end, hedge_at) if t is not None), default=None)
+            done, _ = concurrent.futures.wait(
+                pending,
+                timeout=None if wake is None else max(0.0, wake - now),
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for f in done:
+                pending.remove(f)
+                exc = f.exception()
+                if exc is None:
+                    for other in pending:
+                        other.cancel()
+                    return self._succeeded(start, f.result(), hedged=f is not primary)
+                error = exc
+            if pending and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                pending.append(pool.submit(attempt))
+                self._event("hedge")
+        for f in pending:
+            f.cancel()
+        return self._failed(fallback, error, timed_out=bool(pending))
+
+    def _call_async(
+        self, fn: Callable[[], Any], budget: float | None, delay: float | None, fallback: Any
+    ) -> Any:
+        async def attempt() -> Any:
+            res = fn()
+            if inspect.isawaitable(res):
+                res = await res
+            return res
+
+        async def _run() -> Any:
+            if not self.breaker.allow():
+                self._event("rejected")
+                report_failure()
+                return fallback
+            try:
+                return await _attempts()
+            except BaseException:
+                # cancelled before an outcome was recorded: free a half-open trial slot
+                self.breaker.release()
+                raise
+
+        async def _attempts() -> Any:
+            start = time.monotonic()
+            end = None if budget is None else start + budget
+            primary = asyncio.ensure_future(attempt())
+            pending = {primary}
+            hedge_at = None if delay is None else start + delay
+            error: BaseException | None = None
+            try:
+                while pending:
+                    now = time.monotonic()
+                    if end is not None and now >= end:
+                        break
+                    wake = min((t for t in (end, hedge_at) if t is not None), default=None)
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=None if wake is None else max(0.0, wake - now),
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for t in done:
+                        exc = t.exception()
+                        if exc is None:
+                            return self._succeeded(start, t.result(), hedged=t is not primary)
+                        error = exc
+                    if pending and hedge_at is not None and time.monotonic() >= hedge_at:
+                        hedge_at = None
+                        pending.add(asyncio.ensure_future(attempt()))
+                        self._event("hedge")
+                return self._failed(fallback, error, timed_out=bool(pending))
+            finally:
+                for t in pending:
+                    t.cancel()
+
+        return _run()
+
+    def _succeeded(self, start: float, value: Any, *, hedged: bool) -> Any:
+        # latency as seen from the primary's start: a lower bound for slow primaries
+        self._latency.add(time.monotonic() - start)
+        self.breaker.record_success()
+        if hedged:
+            self._event("hedge_won")
+        return value
+
+    def _failed(self, fallback: Any, error: BaseException | None, *, timed_out: bool) -> Any:
+        self.breaker.record_failure()
+        timed_out = timed_out or isinstance(error, _TIMEOUTS)
+        if timed_out:
+            self._event("timeout")
+            logger.warning("ReBAC %s call timed out; denying", self.name)
+        else:
+            self._event("error")
+            logger.warning("ReBAC %s call failed; denying: %s", self.name, error)
+        report_failure(error)
+        return fallback
+
+    def _workers(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="rbacx-rebac-resilience"
+                )
+            return self._pool
+
+    def _event(self, event: str) -> None:
+        with self._counts_lock:
+            self._counts[event] = self._counts.get(event, 0) + 1
+        emit_metric(self._inc, EVENTS_METRIC, {"provider": self.name, "event": event})
+
+    def _breaker_changed(self, state: str) -> None:
+        logger.info("ReBAC %s circuit breaker is now %s", self.name, state)
+        emit_metric(
+            self._observe, BREAKER_STATE_METRIC, _STATE_VALUE[state], {"provider": self.name}
+        )
+
+
+__all__ = [
+    "ResilientRelationshipChecker",
+    "CircuitBreaker",
+    "EVENTS_METRIC",
+    "BREAKER_STATE_METRIC",
+]
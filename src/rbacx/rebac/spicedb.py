@@ -1,5 +1,9 @@
+import contextvars
 import importlib
+import itertools
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Protocol, runtime_checkable
 
@@ -10,6 +14,8 @@ try:
     from authzed.api.v1 import (
         BulkCheckPermissionRequest,
         BulkCheckPermissionRequestItem,
+        CheckBulkPermissionsRequest,
+        CheckBulkPermissionsRequestItem,
         CheckPermissionRequest,
         CheckPermissionResponse,
         Consistency,
@@ -28,6 +34,8 @@ except Exception:  # pragma: no cover
     ZedClient = None  # type: ignore[misc,assignment]
 
 from ..core.ports import RelationshipChecker
+from ..core.relctx import CONSISTENCY_TOKEN, bounded_timeout, report_failure
+from .pool import PoolTracker
 
 logger = logging.getLogger("rbacx.rebac.spicedb")
 
@@ -41,6 +49,16 @@ class SpiceDBConfig:
     insecure: bool = False  # True for local/dev without TLS
     prefer_fully_consistent: bool = False
     timeout_seconds: float = 2.0
+    # sync batch_check without a bulk RPC: max CheckPermission calls in flight
+    sync_batch_concurrency: int = 8
+    # connection tuning: N independent channels used round-robin (each is one
+    # HTTP/2 connection, so N * max_concurrent_streams calls can be in flight)
+    grpc_channels: int = 1
+    max_concurrent_streams: int = 100  # server-side stream limit per connection
+    keepalive_time_ms: int | None = None  # ping interval on idle connections
+    keepalive_timeout_ms: int | None = None  # drop the connection if a ping is not acked
+    keepalive_permit_without_calls: bool = False
+    grpc_options: tuple[tuple[str, Any], ...] = ()  # extra raw channel arguments
 
 
 # ---- minimal typed protocols for the clients (common surface we use) ----
@@ -76,27 +94,53 @@ class SpiceDBChecker(RelationshipChecker):
     ReBAC provider backed by the SpiceDB/Authzed gRPC API.
 
     - Single checks use ``CheckPermission``.
-    - Batch checks use ``BulkCheckPermissions`` (one gRPC call for N triples)
-      in async mode; falls back to sequential sync calls otherwise.
-    - Consistency: ZedToken (at_least_as_fresh) or fully_consistent.
+    - Batch checks use the bulk RPC (one gRPC call for N triples) in both
+      modes; without it, single checks run concurrently.
+    - Consistency: ZedToken (at_least_as_fresh) or fully_consistent.  Without an
+      explicit ``zed_token`` the request's token from ``rbacx.core.relctx``
+      (``consistency_token()`` / adapter ``consistency=``) is used.
     - Caveats: pass context as google.protobuf.Struct.
+    - Connections: ``grpc_channels`` clients are created and used round-robin;
+      keepalive and raw channel arguments come from ``SpiceDBConfig``.  In-flight
+      calls are tracked against ``grpc_channels * max_concurrent_streams``: see
+      :meth:`pool_stats`; with ``metrics`` the utilization is observed as
+      ``rbacx_rebac_pool_utilization``.
     """
 
-    def __init__(self, config: SpiceDBConfig, *, async_mode: bool = False) -> None:
+    def __init__(
+        self, config: SpiceDBConfig, *, async_mode: bool = False, metrics: Any = None
+    ) -> None:
         if ZedClient is None:
             raise RuntimeError(
                 "SpiceDBChecker requires 'authzed' and 'grpcio'. "
                 "Install with extra: rbacx[rebac-spicedb]"
             )
         self.cfg = config
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+        channels = max(1, int(config.grpc_channels))
+        self._inflight = PoolTracker(
+            "spicedb", channels * max(1, int(config.max_concurrent_streams)), metrics
+        )
+        self._rr = itertools.count()
+        options = self._channel_options()
+        # channel options are only passed when configured (older clients lack the argument)
+        kw: dict[str, Any] = {"options": options} if options else {}
 
         # Explicit types for mypy: either the sync or async client is set (the other is None)
         self._client: _ZedSyncClient | None
         self._aclient: _ZedAsyncClient | None
+        # all channels; _client/_aclient is the first one
+        self._clients: list[Any]
 
         if config.insecure:
             # Dev/local (no TLS): pass the raw token string directly to InsecureClient
-            self._client = ZedInsecureClient(config.endpoint, config.token or "")
+            self._clients = [
+                ZedInsecureClient(config.endpoint, config.token or "", **kw)
+                for _ in range(channels)
+            ]
+            self._client = self._clients[0]
             self._aclient = None
         else:
             if async_mode:
@@ -109,13 +153,23 @@ class SpiceDBChecker(RelationshipChecker):
                         "authzed.api.v1.AsyncClient is not available; "
                         "update 'authzed' package or disable async_mode."
                     ) from exc
+                creds = self._bearer(config.token)
+                self._clients = [AsyncClient(config.endpoint, creds, **kw) for _ in range(channels)]
                 self._client = None
-                self._aclient = AsyncClient(config.endpoint, self._bearer(config.token))
+                self._aclient = self._clients[0]
             else:
                 # TLS client + bearer credentials (via grpcutil)
-                self._client = ZedClient(config.endpoint, self._bearer(config.token))
+                creds = self._bearer(config.token)
+                self._clients = [ZedClient(config.endpoint, creds, **kw) for _ in range(channels)]
+                self._client = self._clients[0]
                 self._aclient = None
 
+    def pool_stats(self) -> dict[str, Any]:
+        """In-flight / peak / total calls and utilization of the stream capacity."""
+        stats = self._inflight.stats()
+        stats["channels"] = len(self._clients)
+        return stats
+
     # -------------- RelationshipChecker --------------
 
     def check(
@@ -129,6 +183,7 @@ class SpiceDBChecker(RelationshipChecker):
     ) -> (
         bool | Any
     ):  # Here Any = Awaitable[bool], but without 'from __future__ import annotations' mypy complains
+        zed_token = zed_token or CONSISTENCY_TOKEN.get()
         req = self._build_request(
             subject=subject,
             relation=relation,
@@ -136,21 +191,25 @@ class SpiceDBChecker(RelationshipChecker):
             context=context,
             zed_token=zed_token,
         )
+        timeout = self._timeout()
 
         if self._aclient is not None:
-            aclient = self._aclient  # early binding to narrow the type
+            aclient = self._pick(self._aclient)  # early binding to narrow the type
 
             async def _run() -> bool:
                 try:
-                    resp = await aclient.CheckPermission(req, timeout=self.cfg.timeout_seconds)
+                    with self._inflight:
+                        resp = await aclient.CheckPermission(req, timeout=timeout)
                     return (
                         resp.permissionship == CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
                     )
                 except RpcError as e:  # type: ignore[misc]
                     logger.warning("SpiceDB async check RPC error: %s", e, exc_info=True)
+                    report_failure(e)
                     return False
-                except Exception:  # pragma: no cover
+                except Exception as exc:  # pragma: no cover
                     logger.error("SpiceDB async check unexpected error", exc_info=True)
+                    report_failure(exc)
                     return False
 
             return _run()
@@ -159,13 +218,16 @@ class SpiceDBChecker(RelationshipChecker):
             raise RuntimeError("No sync gRPC client configured for SpiceDBChecker")
 
         try:
-            resp = self._client.CheckPermission(req, timeout=self.cfg.timeout_seconds)
+            with self._inflight:
+                resp = self._pick(self._client).CheckPermission(req, timeout=timeout)
             return resp.permissionship == CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
         except RpcError as e:  # type: ignore[misc]
             logger.warning("SpiceDB check RPC error: %s", e, exc_info=True)
+            report_failure(e)
             return False
-        except Exception:  # pragma: no cover
+        except Exception as exc:  # pragma: no cover
             logger.error("SpiceDB check unexpected error", exc_info=True)
+            report_failure(exc)
             return False
 
     def batch_check(
@@ -177,92 +239,133 @@ class SpiceDBChecker(RelationshipChecker):
     ) -> list[bool] | Any:  # Any = Awaitable[list[bool]]
         """Check multiple (subject, relation, resource) triples in one call.
 
-        *Async mode* uses ``BulkCheckPermissions`` when available (authzed ≥ 0.9)
-        — a single gRPC round-trip for all *triples*, preserving order.  Falls
-        back to concurrent ``CheckPermission`` calls when the bulk RPC is absent.
-
-        *Sync mode* falls back to sequential ``CheckPermission`` calls (the
-        SpiceDB sync gRPC client does not expose a bulk endpoint).
+        Uses the bulk RPC when the client has one (``CheckBulkPermissions``, or the
+        older ``BulkCheckPermissions``) -- a single gRPC round-trip for all
+        *triples*, preserving order.  Without it, async mode gathers concurrent
+        ``CheckPermission`` calls and sync mode issues them from a thread pool
+        bounded by ``SpiceDBConfig.sync_batch_concurrency``.  Every item carries
+        the same consistency requirement.
 
         On any RPC error the affected item resolves to ``False`` (fail-closed).
         """
         if not triples:
             return []
+        zed_token = zed_token or CONSISTENCY_TOKEN.get()
+        timeout = self._timeout()
 
         if self._aclient is not None:
-            aclient = self._aclient
-            # BulkCheckPermissions was added in authzed ≥ 0.9; detect at runtime.
-            _has_bulk = hasattr(aclient, "BulkCheckPermissions")
+            aclient = self._pick(self._aclient)
+            bulk = self._bulk_rpc(aclient)
 
             async def _run() -> list[bool]:
-                # Build consistency once for the whole batch
-                consistency: Any = None
-                if zed_token:
-                    consistency = Consistency(at_least_as_fresh=ZedToken(token=zed_token))
-                elif self.cfg.prefer_fully_consistent:
-                    consistency = Consistency(fully_consistent=True)
-
-                ctx_struct = _dict_to_struct(context) if context else None
-
-                items: list[Any] = []
-                for s, r, o in triples:
-                    obj_type, obj_id = (o.split(":", 1) + [""])[:2]
-                    subj_type, subj_id = (s.split(":", 1) + [""])[:2]
-                    items.append(
-                        BulkCheckPermissionRequestItem(
-                            resource=ObjectReference(object_type=obj_type, object_id=obj_id),
-                            permission=r,
-                            subject=SubjectReference(
-                                object=ObjectReference(object_type=subj_type, object_id=subj_id)
-                            ),
-                            context=ctx_struct,
-                        )
-                    )
-
-                req = BulkCheckPermissionRequest(
-                    items=items,
-                    consistency=consistency,
-                )
-
-                if not _has_bulk:
-                    # Older authzed client — fall back to concurrent single checks
+                if bulk is None:
+                    # client without a bulk RPC -- fall back to concurrent single checks
                     import asyncio as _aio
 
                     results = await _aio.gather(
                         *[
-                            self._check_single_async(s, r, o, context=context, zed_token=zed_token)
+                            self._check_single_async(
+                                s, r, o, context=context, zed_token=zed_token, timeout=timeout
+                            )
                             for s, r, o in triples
                         ]
                     )
                     return list(results)
 
+                method, req = bulk[0], self._build_bulk_request(bulk, triples, context, zed_token)
                 try:
-                    resp = await aclient.BulkCheckPermissions(req, timeout=self.cfg.timeout_seconds)
-                    # resp.pairs is a list of BulkCheckPermissionPair ordered
-                    # by input position when the API preserves order.
-                    # Each pair has .item (echo) and .item.permissionship.
-                    out: list[bool] = []
-                    for pair in resp.pairs:
-                        allowed = (
-                            pair.item.permissionship
-                            == CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
-                        )
-                        out.append(allowed)
-                    return out
+                    with self._inflight:
+                        resp = await method(req, timeout=timeout)
+                    return self._parse_bulk_response(resp, len(triples))
                 except RpcError as exc:
                     logger.warning("SpiceDB BulkCheckPermissions RPC error: %s", exc, exc_info=True)
+                    report_failure(exc)
                     return [False] * len(triples)
-                except Exception:
+                except Exception as exc:
                     logger.error("SpiceDB BulkCheckPermissions unexpected error", exc_info=True)
+                    report_failure(exc)
                     return [False] * len(triples)
 
             return _run()
 
-        # sync mode: no bulk gRPC endpoint on sync client — sequential fallback
-        return [self.check(s, r, o, context=context, zed_token=zed_token) for s, r, o in triples]
+        if self._client is None:
+            raise RuntimeError("No sync gRPC client configured for SpiceDBChecker")
+
+        bulk = self._bulk_rpc(self._pick(self._client))
+        if bulk is not None:
+            req = self._build_bulk_request(bulk, triples, context, zed_token)
+            try:
+                with self._inflight:
+                    resp = bulk[0](req, timeout=timeout)
+                return self._parse_bulk_response(resp, len(triples))
+            except RpcError as exc:  # type: ignore[misc]
+                logger.warning("SpiceDB CheckBulkPermissions RPC error: %s", exc, exc_info=True)
+                report_failure(exc)
+                return [False] * len(triples)
+            except Exception as exc:
+                logger.error("SpiceDB CheckBulkPermissions unexpected error", exc_info=True)
+                report_failure(exc)
+                return [False] * len(triples)
+
+        if len(triples) == 1 or self.cfg.sync_batch_concurrency <= 1:
+            return [
+                self.check(s, r, o, context=context, zed_token=zed_token) for s, r, o in triples
+            ]
+
+        # no bulk RPC on this client: bounded concurrent single checks, input order kept;
+        # each runs in a copy of the caller's context (decision deadline, consistency token)
+        pool = self._sync_pool()
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                self.check,
+                s,
+                r,
+                o,
+                context=context,
+                zed_token=zed_token,
+            )
+            for s, r, o in triples
+        ]
+        return [bool(f.result()) for f in futures]
+
+    def close(self) -> None:
+        """Shut down the sync batch thread pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
 
     # -------------- helpers --------------
 
+    def _timeout(self) -> float:
+        # configured timeout, shortened to the current decision deadline (if any)
+        t = bounded_timeout(self.cfg.timeout_seconds)
+        return self.cfg.timeout_seconds if t is None else t
+
+    def _pick(self, client: Any) -> Any:
+        """Next channel in round-robin order (*client* itself when there is only one)."""
+        clients = self._clients
+        if len(clients) < 2:
+            return client
+        return clients[next(self._rr) % len(clients)]
+
+    def _channel_options(self) -> list[tuple[str, Any]]:
+        cfg = self.cfg
+        opts: list[tuple[str, Any]] = []
+        if cfg.keepalive_time_ms is not None:
+            opts.append(("grpc.keepalive_time_ms", int(cfg.keepalive_time_ms)))
+        if cfg.keepalive_timeout_ms is not None:
+            opts.append(("grpc.keepalive_timeout_ms", int(cfg.keepalive_timeout_ms)))
+        if cfg.keepalive_permit_without_calls:
+            opts.append(("grpc.keepalive_permit_without_calls", 1))
+        if cfg.grpc_channels > 1:
+            # channels with identical arguments share subchannels (one TCP connection)
+            # through gRPC's global pool; a local pool gives each channel its own
+            opts.append(("grpc.use_local_subchannel_pool", 1))
+        opts.extend(cfg.grpc_options)
+        return opts
+
     @staticmethod
     def _bearer(token: str | None):
         """Return gRPC call credentials for the TLS-enabled Client.
@@ -283,6 +386,72 @@ class SpiceDBChecker(RelationshipChecker):
             ) from exc
         return bearer_token_credentials(token)
 
+    @staticmethod
+    def _bulk_rpc(client: Any) -> tuple[Any, Any, Any] | None:
+        """Return ``(method, request_cls, item_cls)`` for the client's bulk check RPC."""
+        method = getattr(client, "BulkCheckPermissions", None)
+        if method is not None:
+            return method, BulkCheckPermissionRequest, BulkCheckPermissionRequestItem
+        method = getattr(client, "CheckBulkPermissions", None)
+        if method is not None:
+            return method, CheckBulkPermissionsRequest, CheckBulkPermissionsRequestItem
+        return None
+
+    def _build_bulk_request(
+        self,
+        bulk: tuple[Any, Any, Any],
+        triples: list[tuple[str, str, str]],
+        context: dict[str, Any] | None,
+        zed_token: str | None,
+    ) -> Any:
+        _, request_cls, item_cls = bulk
+        # consistency and caveat context are built once for the whole batch
+        consistency: Any = None
+        if zed_token:
+            consistency = Consistency(at_least_as_fresh=ZedToken(token=zed_token))
+        elif self.cfg.prefer_fully_consistent:
+            consistency = Consistency(fully_consistent=True)
+        ctx_struct = _dict_to_struct(context) if context else None
+
+        items: list[Any] = []
+        for s, r, o in triples:
+            obj_type, obj_id = (o.split(":", 1) + [""])[:2]
+            subj_type, subj_id = (s.split(":", 1) + [""])[:2]
+            items.append(
+                item_cls(
+                    resource=ObjectReference(object_type=obj_type, object_id=obj_id),
+                    permission=r,
+                    subject=SubjectReference(
+                        object=ObjectReference(object_type=subj_type, object_id=subj_id)
+                    ),
+                    context=ctx_struct,
+                )
+            )
+        return request_cls(items=items, consistency=consistency)
+
+    @staticmethod
+    def _parse_bulk_response(resp: Any, n: int) -> list[bool]:
+        # pairs come back in request order; a pair carrying an error has no
+        # HAS_PERMISSION item and therefore resolves to False
+        out = [
+            pair.item.permissionship == CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
+            for pair in resp.pairs
+        ]
+        if len(out) != n:
+            logger.warning("SpiceDB bulk check returned %d results for %d items", len(out), n)
+            report_failure()
+            return [False] * n
+        return out
+
+    def _sync_pool(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.cfg.sync_batch_concurrency,
+                    thread_name_prefix="rbacx-spicedb",
+                )
+            return self._pool
+
     def _build_request(
         self,
         *,
@@ -319,11 +488,13 @@ class SpiceDBChecker(RelationshipChecker):
         *,
         context: dict[str, Any] | None = None,
         zed_token: str | None = None,
+        timeout: float | None = None,
     ) -> bool:
         """Pure async single-check for internal use."""
         aclient = self._aclient
         if aclient is None:
             raise RuntimeError("No async gRPC client configured for SpiceDBChecker")
+        aclient = self._pick(aclient)
         req = self._build_request(
             subject=subject,
             relation=relation,
@@ -332,11 +503,16 @@ class SpiceDBChecker(RelationshipChecker):
             zed_token=zed_token,
         )
         try:
-            resp = await aclient.CheckPermission(req, timeout=self.cfg.timeout_seconds)
+            with self._inflight:
+                resp = await aclient.CheckPermission(
+                    req, timeout=self.cfg.timeout_seconds if timeout is None else timeout
+                )
             return resp.permissionship == CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
         except RpcError as e:  # type: ignore[misc]
             logger.warning("SpiceDB async check RPC error: %s", e, exc_info=True)
+            report_failure(e)
             return False
-        except Exception:  # pragma: no cover
+        except Exception as exc:  # pragma: no cover
             logger.error("SpiceDB async check unexpected error", exc_info=True)
+            report_failure(exc)
             return False
@@ -0,0 +1,208 @@
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from .local import RelTuple, as_rel_tuple
+
+logger = logging.getLogger("rbacx.rebac.sqlite")
+
+# Caveat-less tuples are stored with an empty caveat: WITHOUT ROWID tables
+# require NOT NULL primary-key columns.
+_NO_CAVEAT = ""
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS rel_tuples (
+        subject  TEXT NOT NULL,
+        relation TEXT NOT NULL,
+        resource TEXT NOT NULL,
+        caveat   TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (resource, relation, subject, caveat)
+    ) WITHOUT ROWID
+    """,
+    # Covering index for by_subject(); the primary key already covers
+    # direct_for_resource(), so neither lookup touches the base table twice.
+    """
+    CREATE INDEX IF NOT EXISTS rel_tuples_by_subject
+        ON rel_tuples (subject, relation, resource, caveat)
+    """,
+)
+
+
+def _row_to_tuple(row: Sequence[str]) -> RelTuple:
+    subject, relation, resource, caveat = row
+    return RelTuple(subject=subject, relation=relation, resource=resource, caveat=caveat or None)
+
+
+def _normalize(item: Any) -> tuple[str, str, str, str]:
+    t = as_rel_tuple(item)
+    return t.subject, t.relation, t.resource, t.caveat or _NO_CAVEAT
+
+
+class SQLiteRelationshipStore:
+    """
+    Relationship tuple store persisted in SQLite.
+
+    Implements the same read interface as ``InMemoryRelationshipStore``
+    (``direct_for_resource`` / ``by_subject``) so it can be passed to
+    ``LocalRelationshipChecker`` unchanged, but keeps tuples on disk:
+      - both lookups are served by covering indexes (one B-tree range scan each);
+      - file databases use WAL journaling so readers are not blocked by imports;
+      - a small read-through LRU keeps hot (resource, relation) / (subject, relation)
+        lists in memory; writes invalidate the affected entries.
+
+    Tuples have set semantics: adding the same tuple twice stores it once.
+    The connection is shared and serialized by a lock, so one instance can be
+    used from multiple threads.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        cache_size: int = 4096,
+        wal: bool = True,
+        timeout: float = 5.0,
+    ) -> None:
+        self.path = path
+        self._cache_size = int(cache_size)
+        self._cache: OrderedDict[tuple[str, str, str], tuple[RelTuple, ...]] = OrderedDict()
+        self._lock = threading.RLock()
+        # isolation_level=None -> autocommit; bulk imports open explicit transactions
+        self._conn = sqlite3.connect(
+            path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        if wal and path != ":memory:":
+            mode = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()
+            if not mode or str(mode[0]).lower() != "wal":  # pragma: no cover
+                logger.warning("SQLite WAL mode not available for %s; using %s", path, mode)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            self._conn.execute(stmt)
+
+    # ------------ writes ------------
+
+    def add(self, subject: str, relation: str, resource: str, *, caveat: str | None = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO rel_tuples (subject, relation, resource, caveat) "
+                "VALUES (?, ?, ?, ?)",
+                (subject, relation, resource, caveat or _NO_CAVEAT),
+            )
+            self._invalidate(subject, relation, resource)
+
+    def add_many(self, tuples: Iterable[Any], *, chunk_size: int = 10_000) -> int:
+        """Bulk-import tuples, one transaction per *chunk_size* rows.
+
+        Items may be ``RelTuple`` instances or ``(subject, relation, resource)``
+        / ``(subject, relation, resource, caveat)`` sequences.  Returns the
+        number of newly stored tuples (duplicates are ignored).
+        """
+        added = 0
+        chunk: list[tuple[str, str, str, str]] = []
+        for item in tuples:
+            chunk.append(_normalize(item))
+            if len(chunk) >= chunk_size:
+                added += self._insert_chunk(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert_chunk(chunk)
+        return added
+
+    def _insert_chunk(self, rows: list[tuple[str, str, str, str]]) -> int:
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany(
+                    "INSERT OR IGNORE INTO rel_tuples (subject, relation, resource, caveat) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                inserted = max(cur.rowcount, 0)
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            # a bulk import may touch any cached key
+            self._cache.clear()
+            return inserted
+
+    # ------------ reads ------------
+
+    def direct_for_resource(self, relation: str, resource: str) -> Iterable[RelTuple]:
+        return self._cached(
+            ("r", resource, relation),
+            "SELECT subject, relation, resource, caveat FROM rel_tuples "
+            "WHERE resource = ? AND relation = ?",
+            (resource, relation),
+        )
+
+    def by_subject(self, subject: str, relation: str) -> Iterable[RelTuple]:
+        return self._cached(
+            ("s", subject, relation),
+            "SELECT subject, relation, resource, caveat FROM rel_tuples "
+            "INDEXED BY rel_tuples_by_subject WHERE subject = ? AND relation = ?",
+            (subject, relation),
+        )
+
+    def iter_tuples(self, *, page_size: int = 10_000) -> Iterator[RelTuple]:
+        """Yield every stored tuple, ordered by (resource, relation).
+
+        Pages through the primary key so the lock is only held per page.
+        """
+        last: tuple[str, str, str, str] | None = None
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._conn.execute(
+                        "SELECT resource, relation, subject, caveat FROM rel_tuples "
+                        "ORDER BY resource, relation, subject, caveat LIMIT ?",
+                        (page_size,),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT resource, relation, subject, caveat FROM rel_tuples "
+                        "WHERE (resource, relation, subject, caveat) > (?, ?, ?, ?) "
+                        "ORDER BY resource, relation, subject, caveat LIMIT ?",
+                        (*last, page_size),
+                    ).fetchall()
+            if not rows:
+                return
+            for resource, relation, subject, caveat in rows:
+                yield _row_to_tuple((subject, relation, resource, caveat))
+            last = tuple(rows[-1])  # type: ignore[assignment]
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM rel_tuples").fetchone()
+            return int(row[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._conn.close()
+
+    # ------------ internals ------------
+
+    def _cached(
+        self, key: tuple[str, str, str], sql: str, params: tuple[str, str]
+    ) -> tuple[RelTuple, ...]:
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+            rows = tuple(_row_to_tuple(r) for r in self._conn.execute(sql, params))
+            if self._cache_size > 0:
+                self._cache[key] = rows
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+            return rows
+
+    def _invalidate(self, subject: str, relation: str, resource: str) -> None:
+        self._cache.pop(("r", resource, relation), None)
+        self._cache.pop(("s", subject, relation), None)
@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .local import RelationshipUpdate, RelTuple
+
+logger = logging.getLogger("rbacx.rebac.watch")
+
+_OPERATIONS = ("create", "touch", "delete")
+
+
+@dataclass(frozen=True, slots=True)
+class WatchResponse:
+    """A batch of updates plus the upstream revision it brings the store up to.
+
+    Mirrors SpiceDB ``WatchResponse`` (``updates`` + ``changes_through``): the
+    token is opaque to rbacx and only reported back via ``RelationshipWatcher.last_token``.
+    """
+
+    updates: tuple[RelationshipUpdate, ...]
+    changes_through: str | None = None
+
+
+class ChangeSource(Protocol):
+    """Feed of relationship changes consumed by :class:`RelationshipWatcher`."""
+
+    def read(self, timeout: float) -> WatchResponse | None:
+        """Return the next batch, or ``None`` if nothing arrived within *timeout* seconds."""
+        ...
+
+
+class ApplyingStore(Protocol):
+    def apply(self, updates: Iterable[RelationshipUpdate]) -> int: ...
+
+
+def parse_update(obj: dict[str, Any]) -> RelationshipUpdate:
+    """Build an update from ``{"operation", "subject", "relation", "resource"[, "caveat"]}``."""
+    op = obj.get("operation", "touch")
+    if op not in _OPERATIONS:
+        raise ValueError(f"unknown relationship update operation: {op!r}")
+    t = RelTuple(
+        subject=str(obj["subject"]),
+        relation=str(obj["relation"]),
+        resource=str(obj["resource"]),
+        caveat=obj.get("caveat") or None,
+    )
+    return RelationshipUpdate(operation=op, relationship=t)
+
+
+def parse_response(obj: dict[str, Any]) -> WatchResponse:
+    """Build a response from ``{"updates": [...], "changes_through": "..."}``.
+
+    A bare update object (no ``updates`` key) is accepted as a one-update batch.
+    """
+    if "updates" in obj:
+        updates = tuple(parse_update(u) for u in obj["updates"])
+    else:
+        updates = (parse_update(obj),)
+    token = obj.get("changes_through")
+    return WatchResponse(updates=updates, changes_through=None if token is None else str(token))
+
+
+class QueueChangeSource:
+    """In-process feed: producers ``put()`` responses, the watcher reads them.
+
+    Stand-in for a streaming ``Watch`` RPC in tests and single-process setups.
+    """
+
+    def __init__(self, q: "queue.Queue[WatchResponse] | None" = None) -> None:
+        self.queue: queue.Queue[WatchResponse] = q if q is not None else queue.Queue()
+
+    def put(
+        self, updates: Iterable[RelationshipUpdate], *, changes_through: str | None = None
+    ) -> None:
+        self.queue.put(WatchResponse(updates=tuple(updates), changes_through=changes_through))
+
+    def read(self, timeout: float) -> WatchResponse | None:
+        try:
+            return self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class NDJSONChangeSource:
+    """Tail an append-only NDJSON change log.
+
+    Each line is one batch (see :func:`parse_response`).  Only complete lines
+    are consumed; the read offset survives across calls, so the file can be
+    appended to while the watcher runs.  Malformed lines are logged and skipped.
+    """
+
+    def __init__(self, path: str, *, start_at_end: bool = False) -> None:
+        self.path = path
+        self._offset = 0
+        self._pending: list[WatchResponse] = []
+        if start_at_end:
+            try:
+                self._offset = os.path.getsize(path)
+            except OSError:
+                self._offset = 0
+
+    def read(self, timeout: float) -> WatchResponse | None:
+        if not self._pending:
+            self._fill()
+        if not self._pending and timeout > 0:
+            time.sleep(timeout)
+            self._fill()
+        return self._pending.pop(0) if self._pending else None
+
+    def _fill(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n")
+        if end < 0:
+            return
+        self._offset += end + 1
+        for raw in data[:end].splitlines():
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                self._pending.append(parse_response(json.loads(line)))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning("RBACX: skipping invalid change record in %s: %s", self.path, e)
+
+
+class RelationshipWatcher:
+    """Apply a change feed to a store incrementally.
+
+    Each :class:`WatchResponse` is applied with one ``store.apply()`` call, so the
+    store's ``revision`` advances once per upstream batch while concurrent checks
+    keep reading without locks.  Use :meth:`poll_once` for explicit draining or
+    :meth:`start`/:meth:`stop` for a background thread.
+
+    A batch whose ``apply()`` raises is kept and retried before anything else
+    is read from the feed, so the store never skips a batch and
+    :attr:`last_token` never moves past one that was not applied.
+    """
+
+    def __init__(
+        self,
+        store: ApplyingStore,
+        source: ChangeSource,
+        *,
+        poll_interval: float = 0.5,
+        thread_daemon: bool = True,
+    ) -> None:
+        self.store = store
+        self.source = source
+        self.poll_interval = float(poll_interval)
+        self.thread_daemon = bool(thread_daemon)
+        self._last_token: str | None = None
+        self._last_error: Exception | None = None
+        self._failed: WatchResponse | None = None  # batch to retry before reading more
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # Public API -------------------------------------------------------------
+
+    def poll_once(self, timeout: float = 0.0) -> int:
+        """Apply every batch available now (waiting up to *timeout* for the first).
+
+        Returns the number of batches applied.  If a batch fails to apply, the
+        exception propagates and the batch is retried by the next call.
+        """
+        applied = 0
+        wait = timeout
+        while True:
+            resp = self._failed
+            if resp is None:
+                resp = self.source.read(wait)
+                if resp is None:
+                    return applied
+            wait = 0.0
+            self._failed = resp
+            self._apply(resp)
+            self._failed = None
+            applied += 1
+
+    def start(self) -> None:
+        """Start the background consumer thread (no-op if already running)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop, name="rbacx-rebac-watch", daemon=self.thread_daemon
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0) -> None:
+        """Signal the consumer thread to stop and optionally wait for it."""
+        with self._lock:
+            if not self._thread:
+                return
+            self._stop_event.set()
+            self._thread.join(timeout=timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    # Diagnostics ------------------------------------------------------------
+
+    @property
+    def last_token(self) -> str | None:
+        """``changes_through`` of the last applied batch (resume point for the feed)."""
+        return self._last_token
+
+    @property
+    def last_error(self) -> Exception | None:
+        return self._last_error
+
+    # Internals --------------------------------------------------------------
+
+    def _apply(self, resp: WatchResponse) -> None:
+        self.store.apply(resp.updates)
+        if resp.changes_through is not None:
+            self._last_token = resp.changes_through
+
+    def _run_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll_once(self.poll_interval)
+                self._last_error = None
+            except Exception as e:
+                # keep serving the last good state and retry the batch after a pause;
+                # a broken batch must not kill the thread
+                self._last_error = e
+                logger.exception("RBACX: relationship watch error", exc_info=e)
+                self._stop_event.wait(self.poll_interval)
+
+
+__all__ = [
+    "WatchResponse",
+    "ChangeSource",
+    "QueueChangeSource",
+    "NDJSONChangeSource",
+    "RelationshipWatcher",
+    "parse_update",
+    "parse_response",
+]
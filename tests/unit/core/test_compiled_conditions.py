@@ -0,0 +1,476 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from rbacx.core.compiler import compile as compile_policy
+from rbacx.core.conditions import CompiledConditions, compile_condition
+from rbacx.core.policy import (
+    MAX_CONDITION_DEPTH,
+    ConditionDepthError,
+    ConditionTypeError,
+    eval_condition,
+    evaluate,
+)
+
+ENV = {
+    "subject": {"id": "u1", "roles": ["admin", "dev"], "attrs": {"level": 3, "name": "ann"}},
+    "action": "read",
+    "resource": {"type": "doc", "id": "1", "attrs": {"tags": ["a", "b"], "owner": "ann"}},
+    "context": {
+        "now": "2026-01-02T00:00:00Z",
+        "ts": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "ip": "10.1.2.3",
+    },
+}
+
+OPERANDS = [
+    {"attr": "subject.attrs.level"},
+    {"attr": "subject.attrs.name"},
+    {"attr": "subject.roles"},
+    {"attr": "resource.attrs.tags"},
+    {"attr": "resource.attrs.owner"},
+    {"attr": "context.now"},
+    {"attr": "context.ts"},
+    {"attr": "context.ip"},
+    {"attr": "missing.path"},
+    3,
+    "ann",
+    "a",
+    ["a", "x"],
+    "2026-01-01T00:00:00Z",
+    ["2025-01-01T00:00:00Z", {"attr": "context.now"}],
+    ["2025-01-01T00:00:00Z", "2027-01-01T00:00:00Z"],
+    True,
+    None,
+    2.5,
+    10**400,
+    1_700_000_000,
+    "not a date",
+    [["unhashable"], "a"],
+    ("dev", "ops"),
+    {"k": "v"},
+    # patterns (matches / glob), including ones the pattern guard rejects
+    "a.*",
+    "[a-n]+",
+    "an*",
+    "*.?",
+    "(a+)+",
+    "(",
+    "x" * 2000,
+    # addresses and ranges (ipInRange)
+    "10.0.0.0/8",
+    ["10.0.0.0/8", "::1/128"],
+    "10.1.2.3",
+    "::1",
+    "not-a-cidr",
+]
+OPS = [
+    "==",
+    "!=",
+    ">",
+    "<",
+    ">=",
+    "<=",
+    "contains",
+    "in",
+    "hasAll",
+    "hasAny",
+    "startsWith",
+    "endsWith",
+    "matches",
+    "glob",
+    "ipInRange",
+    "before",
+    "after",
+    "between",
+]
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return type(e)
+
+
+def _random_cond(rnd, depth=0):
+    k = rnd.random()
+    if depth < 4 and k < 0.3:
+        op = rnd.choice(["and", "or"])
+        return {op: [_random_cond(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]}
+    if depth < 4 and k < 0.4:
+        return {"not": _random_cond(rnd, depth + 1)}
+    if k < 0.45:
+        return rnd.choice([True, False, 0, "x", {"unknown": 1}, {"==": [1]}, {"and": "ab"}])
+    if k < 0.5:
+        # several operators in one dict: the first in evaluation order wins
+        return {"endsWith": ["ann", "n"], "==": [1, 2]}
+    return {rnd.choice(OPS): [rnd.choice(OPERANDS), rnd.choice(OPERANDS)]}
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_compiled_conditions_match_the_interpreter(strict):
+    env = dict(ENV, __strict_types__=True) if strict else ENV
+    rnd = random.Random(41)
+    for _ in range(3000):
+        cond = _random_cond(rnd)
+        fn = compile_condition(cond)
+        expected = _outcome(eval_condition, cond, env)
+        assert _outcome(fn, env) == expected, cond
+
+
+@pytest.mark.parametrize("op", ["matches", "glob", "ipInRange"])
+def test_compiled_pattern_and_ip_operators_match_the_interpreter(op):
+    for a in OPERANDS:
+        for b in OPERANDS:
+            cond = {op: [a, b]}
+            assert _outcome(compile_condition(cond), ENV) == _outcome(eval_condition, cond, ENV)
+
+
+def test_depth_guard_is_lazy_and_matches_interpreter():
+    deep: object = True
+    for _ in range(MAX_CONDITION_DEPTH + 1):
+        deep = {"not": {"not": deep}}
+    fn = compile_condition(deep)
+    with pytest.raises(ConditionDepthError):
+        fn(ENV)
+    # short-circuited before the deep branch: no error, as in eval_condition
+    cond = {"or": [True, deep]}
+    assert compile_condition(cond)(ENV) is eval_condition(cond, ENV) is True
+
+
+def test_compiled_policy_uses_compiled_conditions(monkeypatch):
+    import rbacx.core.policy as policy_mod
+
+    policy = {
+        "algorithm": "permit-overrides",
+        "rules": [
+            {
+                "id": "r1",
+                "effect": "permit",
+                "actions": ["read"],
+                "roles": ["admin"],
+                "condition": {">=": [{"attr": "subject.attrs.level"}, 3]},
+            },
+            {
+                "id": "r2",
+                "effect": "deny",
+                "actions": ["read"],
+                "condition": {"hasAny": [{"attr": "resource.attrs.tags"}, ["a"]]},
+            },
+        ],
+    }
+    fn = compile_policy(policy)
+    expected = evaluate(policy, ENV)
+
+    def _no_interpreter(*a, **k):
+        raise AssertionError("interpreted")
+
+    monkeypatch.setattr(policy_mod, "eval_condition", _no_interpreter)
+    assert fn(ENV) == expected
+    assert expected["rule_id"] == "r1"
+
+
+def test_literals_are_preprocessed_once(monkeypatch):
+    import rbacx.core.conditions as conditions_mod
+
+    cond = {
+        "and": [
+            {"between": [{"attr": "context.now"}, ["2025-01-01T00:00:00Z", "2027-01-01"]]},
+            {"after": [{"attr": "context.ts"}, "2025-06-01T00:00:00Z"]},
+        ]
+    }
+    fn = compile_condition(cond)
+    calls = []
+    real = conditions_mod._parse_dt
+
+    def counting(x, strict=None):
+        calls.append(x)
+        return real(x, strict=strict)
+
+    monkeypatch.setattr(conditions_mod, "_parse_dt", counting)
+    assert fn(ENV) is True
+    # only the two attribute operands are parsed per evaluation
+    assert calls == [ENV["context"]["now"], ENV["context"]["ts"]]
+
+
+def test_constant_subexpressions_are_folded():
+    cond = {
+        "and": [{"==": [1, 1]}, {"in": ["a", ["a", "b"]]}, {"==": [{"attr": "subject.id"}, "u1"]}]
+    }
+    assert compile_condition(cond)(ENV) is True
+    # literal-only subtrees compile to constants
+    cc = CompiledConditions()
+    assert type(cc.add(1, {"and": cond["and"][:2]})).__name__ == "_Const"
+    assert type(cc.add(2, {"not": {"in": ["a", ["a", "b"]]}})).__name__ == "_Const"
+
+    assert compile_condition({"or": [{"==": [1, 2]}, {"not": {"<": [1, 2]}}]})(ENV) is False
+    assert compile_condition({"and": [False, {"attr-less": 1}]})(ENV) is False
+    # a literal type error is still raised lazily, on every evaluation
+    bad = compile_condition({"or": [{"==": [{"attr": "subject.id"}, "u1"]}, {">": ["1", 2]}]})
+    assert bad(ENV) is True
+    with pytest.raises(ConditionTypeError):
+        bad(dict(ENV, subject={"id": "u2"}))
+    with pytest.raises(ConditionTypeError):
+        bad(dict(ENV, subject={"id": "u2"}))
+
+
+def test_strict_mode_dependent_literals():
+    cond = {"before": ["2020-01-01T00:00:00Z", {"attr": "context.ts"}]}
+    fn = compile_condition(cond)
+    assert fn(ENV) is True
+    with pytest.raises(ConditionTypeError):
+        fn(dict(ENV, __strict_types__=True))
+    folded = compile_condition({"before": ["2020-01-01T00:00:00Z", "2021-01-01T00:00:00Z"]})
+    assert folded(ENV) is True
+    with pytest.raises(ConditionTypeError):
+        folded(dict(ENV, __strict_types__=True))
+
+
+def test_between_parses_both_bounds_before_comparing():
+    # the value is before the lower bound, and the upper bound is not a datetime
+    cond = {"between": ["2020-01-01T00:00:00Z", ["2021-01-01", {"attr": "subject.id"}]]}
+    with pytest.raises(ConditionTypeError):
+        eval_condition(cond, ENV)
+    with pytest.raises(ConditionTypeError):
+        compile_condition(cond)(ENV)
+
+
+def test_literal_membership_handles_unhashable_values():
+    env = dict(ENV, subject={"id": "u1", "roles": [["x"], "dev"], "attrs": {"l": ["x"]}})
+    for cond in (
+        {"in": [{"attr": "subject.attrs.l"}, [["x"], "y"]]},
+        {"in": [{"attr": "subject.roles"}, ["dev"]]},
+        {"hasAny": [{"attr": "subject.roles"}, ["dev", "ops"]]},
+        {"hasAll": [{"attr": "subject.roles"}, ["dev"]]},
+        {"hasAll": [["dev", "ops"], {"attr": "subject.roles"}]},
+        {"in": [["dev", "ops"], {"attr": "subject.roles"}]},
+    ):
+        assert compile_condition(cond)(env) == eval_condition(cond, env), cond
+
+
+def test_attribute_paths_are_resolved_once_per_decision():
+    class Attrs(dict):
+        reads = 0
+
+        def get(self, key, default=None):
+            Attrs.reads += 1
+            return super().get(key, default)
+
+    policy = {
+        "algorithm": "permit-overrides",
+        "rules": [
+            {
+                "id": f"r{i}",
+                "effect": "permit",
+                "actions": ["read"],
+                "condition": {"==": [{"attr": "subject.attrs.level"}, i]},
+            }
+            for i in range(20)
+        ],
+    }
+    fn = compile_policy(policy)
+    env = dict(ENV, subject={"id": "u1", "roles": [], "attrs": Attrs(level=19)})
+    assert fn(env)["rule_id"] == "r19"
+    assert Attrs.reads == 1
+    assert fn(env)["rule_id"] == "r19"  # a new decision resolves it again
+    assert Attrs.reads == 2
+
+    cc = CompiledConditions()
+    cc.add(1, {"==": [{"attr": "subject.attrs.level"}, 1]})
+    cc.add(2, {">": [{"attr": "subject.attrs.level"}, {"attr": "context.min"}]})
+    assert cc.slots == {("subject", "attrs", "level"): 0, ("context", "min"): 1}
+    assert len(cc.new_memo()) == 2
+
+
+class Relations:
+    def __init__(self):
+        self.calls = []
+
+    def check(self, subject, relation, resource, *, context=None):
+        self.calls.append(relation)
+        return relation == "owner"
+
+
+def _rule_outcome(fn, *args):
+    """What a rule condition's outcome means for the rule: match, no match, or an error."""
+    try:
+        return bool(fn(*args))
+    except (ConditionTypeError, ConditionDepthError):
+        return False
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_reordered_conditions_match_the_same_rules(strict):
+    from rbacx.core.relctx import REL_CHECKER
+
+    env = dict(ENV, __strict_types__=True) if strict else ENV
+    rnd = random.Random(44)
+    token = REL_CHECKER.set(Relations())
+    try:
+        for _ in range(3000):
+            cond = _random_cond(rnd)
+            if rnd.random() < 0.5:
+                rel = {"rel": rnd.choice(["owner", "viewer"])}
+                cond = {rnd.choice(["and", "or"]): [rel, cond, _random_cond(rnd)]}
+            cc = CompiledConditions(reorder=True)
+            fn = cc.add(0, cond)
+            expected = _rule_outcome(eval_condition, cond, env)
+            assert _rule_outcome(fn, env, cc.new_memo()) == expected, cond
+    finally:
+        REL_CHECKER.reset(token)
+
+
+ON = {"reorder_conditions": True}
+
+
+def _guard_calls(cond, **kw):
+    from rbacx.core.engine import Guard
+    from rbacx.core.model import Action, Resource, Subject
+
+    policy = {
+        "rules": [
+            {"id": "r", "effect": "permit", "actions": ["read"], "condition": cond},
+        ]
+    }
+    checker = Relations()
+    guard = Guard(policy, relationship_checker=checker, **kw)
+    subject = Subject(id="u1", attrs={"level": 3, "name": "ann"})
+    decision = guard.evaluate_sync(subject, Action("read"), Resource(type="doc", id="1"))
+    return decision.allowed, checker.calls
+
+
+def test_cheap_operands_short_circuit_relationship_checks():
+    level = {"attr": "subject.attrs.level"}
+    # the comparison is evaluated first and decides without the rel check
+    assert _guard_calls({"and": [{"rel": "owner"}, {"==": [level, 4]}]}, **ON) == (False, [])
+    assert _guard_calls({"or": [{"rel": "owner"}, {"==": [level, 3]}]}, **ON) == (True, [])
+    nested = {"and": [{"or": [{"rel": "viewer"}, {"rel": "owner"}]}, {"in": [level, [1, 2]]}]}
+    assert _guard_calls(nested, **ON) == (False, [])
+    assert _guard_calls({"and": [{"rel": "owner"}, {"==": [level, 3]}]}, **ON) == (
+        True,
+        ["owner"],
+    )
+
+    # declaration order is kept by default
+    assert _guard_calls({"and": [{"rel": "owner"}, {"==": [level, 4]}]}) == (False, ["owner"])
+
+
+def test_reordering_keeps_operands_that_decide_by_raising_in_place():
+    name = {"attr": "subject.attrs.name"}
+    # in an "or", a type error before a true operand denies: it may not be skipped
+    cond = {
+        "or": [
+            {"rel": "viewer"},
+            {"startsWith": [{"attr": "subject.id"}, 1]},
+            {"==": [name, "ann"]},
+        ]
+    }
+    assert _guard_calls(cond, **ON) == (False, ["viewer"])
+    # comparisons can raise OverflowError, so nothing moves across them
+    huge = {"and": [{"rel": "viewer"}, {">": [10**400, 1.0]}, {"==": [name, "bob"]}]}
+    assert _guard_calls(huge)[1] == ["viewer"]
+    assert _guard_calls(huge, **ON)[1] == ["viewer"]
+
+
+def _business_hours_policy(n):
+    hours = {"between": [{"attr": "context.now"}, ["2026-01-01T08:00:00Z", "2026-12-31T18:00:00Z"]]}
+    tenant = {"==": [{"attr": "subject.attrs.tenant"}, "t1"]}
+    return {
+        "algorithm": "deny-overrides",
+        "rules": [
+            {
+                "id": f"r{i}",
+                "effect": "permit",
+                "actions": ["read"],
+                "condition": {"and": [tenant, hours, {"==": [{"attr": "resource.id"}, str(i)]}]},
+            }
+            for i in range(n)
+        ],
+    }
+
+
+@pytest.mark.parametrize("now", ["2026-01-02T10:00:00Z", "not a date"])
+def test_repeated_subtrees_are_evaluated_once_per_decision(monkeypatch, now):
+    import rbacx.core.conditions as conditions_mod
+
+    policy = _business_hours_policy(30)
+    fn = compile_policy(policy)
+    calls = []
+    real = conditions_mod._parse_dt
+
+    def counting(x, strict=None):
+        calls.append(x)
+        return real(x, strict=strict)
+
+    monkeypatch.setattr(conditions_mod, "_parse_dt", counting)
+    env = dict(
+        ENV,
+        subject={"id": "u1", "roles": [], "attrs": {"tenant": "t1"}},
+        resource={"type": "doc", "id": "29", "attrs": {}},
+        context={"now": now},
+    )
+    # the result (or the type error) of the shared "between" is reused by every rule
+    assert fn(env) == evaluate(policy, env)
+    assert calls == [now]
+    fn(env)
+    assert len(calls) == 2
+
+
+def test_shared_subtrees_are_keyed_by_value_type_and_position():
+    cc = CompiledConditions()
+    eq_list = {"==": [{"attr": "subject.roles"}, ["dev"]]}
+    eq_tuple = {"==": [{"attr": "subject.roles"}, ("dev",)]}
+    cc.add_many([(1, eq_list, 0), (2, eq_tuple, 0), (3, {"not": eq_list}, 0)])
+    assert cc.shared == 1
+    memo = cc.new_memo()
+    env = dict(ENV, subject={"id": "u1", "roles": ["dev"]})
+    assert [cc.get(k)(env, memo) for k in (1, 2, 3)] == [True, False, False]
+
+    # with reordering, a subtree under "not" is a different node
+    cc = CompiledConditions(reorder=True)
+    cc.add_many(
+        [(1, {"and": [eq_list, eq_tuple]}, 0), (2, {"not": {"and": [eq_list, eq_tuple]}}, 0)]
+    )
+    assert cc.shared == 2  # eq_list and eq_tuple are shared; the "and"s are not
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("reorder", [False, True])
+def test_policies_with_shared_subtrees_match_the_interpreter(strict, reorder):
+    from rbacx.core.relctx import REL_CHECKER
+
+    env = dict(ENV, __strict_types__=True) if strict else ENV
+    rnd = random.Random(45)
+    token = REL_CHECKER.set(Relations())
+    try:
+        for _ in range(200):
+            pool = [_random_cond(rnd) for _ in range(4)] + [{"rel": "owner"}]
+            rules = []
+            for i in range(rnd.randint(1, 8)):
+                parts = [rnd.choice(pool) for _ in range(rnd.randint(1, 3))]
+                if rnd.random() < 0.3:
+                    parts = [{"not": {rnd.choice(["and", "or"]): parts}}, rnd.choice(pool)]
+                rules.append(
+                    {
+                        "id": f"r{i}",
+                        "effect": rnd.choice(["permit", "deny"]),
+                        "actions": ["read"],
+                        "condition": {rnd.choice(["and", "or"]): parts},
+                    }
+                )
+            policy = {
+                "algorithm": rnd.choice(["deny-overrides", "permit-overrides"]),
+                "rules": rules,
+            }
+            fn = compile_policy(policy, reorder_conditions=reorder)
+            got, expected = _outcome(fn, env), _outcome(evaluate, policy, env)
+            if reorder and isinstance(expected, dict):
+                # reordering may report a type mismatch as a plain mismatch, or the reverse
+                got.pop("reason"), expected.pop("reason")
+            assert got == expected, policy
+    finally:
+        REL_CHECKER.reset(token)
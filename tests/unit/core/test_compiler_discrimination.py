@@ -0,0 +1,143 @@
+import random
+
+import pytest
+
+from rbacx.core.compiler import compile as compile_policy
+from rbacx.core.discrimination import MIN_GATED_RULES, RuleIndex
+from rbacx.core.policy import evaluate
+
+VALUES = [0, 1, 2, 1.0, True, False, "1", "a", "b", None, float("nan"), [1, "a"]]
+
+
+def _gated_rule(rnd, i):
+    rule = {"id": f"r{i}", "effect": rnd.choice(["permit", "deny"]), "actions": ["read"]}
+    kind = rnd.random()
+    if kind < 0.4:
+        rule["resource"] = {"type": "doc", "attrs": {"k": rnd.choice(VALUES)}}
+    elif kind < 0.8:
+        eq = {
+            "==": [
+                {"attr": rnd.choice(["resource.attrs.k", "subject.attrs.t"])},
+                rnd.choice(VALUES),
+            ]
+        }
+        before = rnd.choice(
+            [
+                {"hasAny": [{"attr": "subject.roles"}, ["dev"]]},
+                {">": [{"attr": "subject.attrs.n"}, 1]},  # may raise OverflowError
+                {"rel": "viewer"},
+            ]
+        )
+        rule["condition"] = rnd.choice(
+            [eq, {"and": [before, eq]}, {"and": [{"and": [eq]}, before]}]
+        )
+    else:
+        rule["condition"] = {"!=": [{"attr": "resource.attrs.k"}, rnd.choice(VALUES)]}
+    if rnd.random() < 0.2:
+        rule["roles"] = ["dev"]
+    return rule
+
+
+def _env(rnd, strict):
+    env = {
+        "subject": {
+            "id": "u1",
+            "roles": rnd.choice([["dev"], [], "dev"]),
+            "attrs": {"t": rnd.choice(VALUES), "n": rnd.choice([2, 10**400])},
+        },
+        "action": "read",
+        "resource": {"type": "doc", "id": "1", "attrs": {"k": rnd.choice(VALUES)}},
+        "context": {},
+    }
+    if rnd.random() < 0.2:
+        del env["resource"]["attrs"]["k"]
+    if strict:
+        env["__strict_types__"] = True
+    return env
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("algorithm", ["deny-overrides", "permit-overrides", "first-applicable"])
+def test_indexed_policies_decide_as_without_the_index(monkeypatch, strict, algorithm):
+    import rbacx.core.discrimination as discrimination_mod
+
+    rnd = random.Random(46)
+    for _ in range(40):
+        rules = [_gated_rule(rnd, i) for i in range(rnd.randint(MIN_GATED_RULES + 1, 60))]
+        policy = {"algorithm": algorithm, "rules": rules}
+        fn = compile_policy(policy)
+        monkeypatch.setattr(discrimination_mod, "MIN_GATED_RULES", 10**9)
+        unindexed = compile_policy(policy)
+        monkeypatch.undo()
+        for _ in range(20):
+            env = _env(rnd, strict)
+            assert _outcome(fn, env) == _outcome(unindexed, env)
+
+
+def _bench_rules(n):
+    rules = [
+        {
+            "id": f"permit_{i}",
+            "effect": "permit",
+            "actions": ["read"],
+            "condition": {"==": [{"attr": "resource.attrs.k"}, i]},
+        }
+        for i in range(n - 1)
+    ]
+    rules.append({"id": "deny_other", "effect": "deny", "actions": ["read"]})
+    return rules
+
+
+def test_index_selects_the_rules_a_request_can_match():
+    rules = _bench_rules(1000)
+    index = RuleIndex.build(rules)
+    assert index is not None
+    env = {"action": "read", "resource": {"attrs": {"k": 500}}}
+    assert [r["id"] for r in index.select(env)] == ["permit_500", "deny_other"]
+    assert [r["id"] for r in index.select({"resource": {"attrs": {"k": "500"}}})] == ["deny_other"]
+    # values the index cannot look up select every gated rule
+    assert len(index.select({"resource": {"attrs": {"k": [500]}}})) == 1000
+
+    assert RuleIndex.build(_bench_rules(MIN_GATED_RULES)) is None  # the last rule is never gated
+
+    policy = {"algorithm": "permit-overrides", "rules": rules}
+    assert compile_policy(policy)(env)["rule_id"] == "permit_500"
+    other = {"action": "read", "resource": {"attrs": {"k": 5000}}}
+    assert compile_policy(policy)(other) == evaluate(policy, other)
+
+
+def test_rules_that_may_raise_before_the_gate_are_not_indexed():
+    eq = {"==": [{"attr": "resource.attrs.k"}, 1]}
+    gated = [
+        {"condition": eq},
+        {"condition": {"and": [{"startsWith": [{"attr": "subject.id"}, "u"]}, eq]}},
+        {"roles": ["dev"], "condition": {"and": [{"and": [eq]}]}},
+        {"resource": {"attrs": {"k": [1, "a"]}}},
+    ]
+    ungated = [
+        {"condition": {"and": [{">": [{"attr": "subject.attrs.n"}, 1]}, eq]}},
+        {"condition": {"or": [eq]}},
+        {"condition": {"==": [{"attr": "resource.attrs.k"}, [1]]}},
+        {"resource": {"attrs": {"k": {"nested": 1}}}},
+    ]
+    rules = gated * 5 + ungated + [{"id": "last"}]
+    index = RuleIndex.build(rules)
+    assert index is not None
+    selected = index.select({"resource": {"attrs": {"k": 2}}, "subject": {"id": "u1"}})
+    assert [id(r) for r in selected] == [id(r) for r in ungated] + [id(rules[-1])]
+
+
+def test_the_last_rule_is_kept_for_the_reason():
+    rules = _bench_rules(40)[:-1]
+    rules.append({"id": "last", "actions": ["read"], "resource": {"attrs": {"k": "zzz"}}})
+    policy = {"algorithm": "first-applicable", "rules": rules}
+    env = {"action": "read", "resource": {"attrs": {"k": 999}}}
+    assert compile_policy(policy)(env)["reason"] == evaluate(policy, env)["reason"]
+    assert evaluate(policy, env)["reason"] == "resource_mismatch"
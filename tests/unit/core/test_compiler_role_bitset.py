@@ -0,0 +1,88 @@
+import random
+
+from rbacx.core.compiler import compile as compile_policy
+from rbacx.core.policy import MAX_CONDITION_DEPTH, RoleBitset, evaluate
+
+
+def _env(roles, **attrs):
+    return {
+        "subject": {"id": "u1", "roles": roles, "attrs": attrs},
+        "action": "read",
+        "resource": {"type": "doc", "id": "1", "attrs": {}},
+        "context": {},
+    }
+
+
+def test_bitset_encodes_rule_roles_and_subject_roles():
+    rules = [
+        {"id": "a", "roles": ["admin", "editor"]},
+        {"id": "b", "roles": ["editor", "viewer"]},
+        {"id": "c", "roles": [["unhashable"]]},
+        {"id": "d", "roles": []},
+        {"id": "e"},
+    ]
+    rb = RoleBitset(rules)
+    assert set(rb.bits) == {"admin", "editor", "viewer"}
+    assert set(rb.masks) == {id(rules[0]), id(rules[1])}
+    assert rb.encode(("viewer", "unknown")) == rb.bits["viewer"]
+    assert rb.encode([]) == 0
+    assert rb.encode("admin") is None
+    assert rb.encode([{"x": 1}]) is None
+
+
+def test_compiled_roles_shorthand_matches_interpreter():
+    rnd = random.Random(7)
+    names = [f"r{i}" for i in range(70)]  # more bits than a machine word
+    rules = []
+    for i in range(120):
+        rule = {
+            "id": f"rule{i}",
+            "effect": rnd.choice(["permit", "deny"]),
+            "actions": ["read"],
+            "resource": {"type": "doc"},
+            "roles": rnd.sample(names, rnd.randint(1, 4)),
+        }
+        if i % 3 == 0:
+            rule["condition"] = {"==": [{"attr": "subject.attrs.dept"}, "eng"]}
+        rules.append(rule)
+    for algo in ("deny-overrides", "permit-overrides", "first-applicable"):
+        policy = {"algorithm": algo, "rules": rules}
+        fn = compile_policy(policy)
+        for _ in range(200):
+            roles = rnd.sample(names, rnd.randint(0, 5))
+            env = _env(roles, dept=rnd.choice(["eng", "ops"]))
+            assert fn(env) == evaluate(policy, env)
+
+
+def test_compiled_roles_shorthand_falls_back_for_odd_subject_roles():
+    policy = {
+        "rules": [
+            {"id": "r", "effect": "permit", "actions": ["read"], "roles": ["admin"]},
+        ]
+    }
+    fn = compile_policy(policy)
+    for roles in ("admin", None, [{"a": 1}, "admin"], {"admin"}):
+        env = _env(roles)
+        assert fn(env) == evaluate(policy, env)
+    assert fn(_env("admin"))["reason"] == "condition_type_mismatch"
+
+
+def test_compiled_roles_shorthand_keeps_condition_depth():
+    # within the limit on its own, one level too deep under the shorthand's "and"
+    cond: object = {"==": [1, 1]}
+    for _ in range(MAX_CONDITION_DEPTH):
+        cond = {"and": [cond]}
+    policy = {
+        "rules": [
+            {
+                "id": "r",
+                "effect": "permit",
+                "actions": ["read"],
+                "roles": ["admin"],
+                "condition": cond,
+            }
+        ]
+    }
+    env = _env(["admin"])
+    assert compile_policy(policy)(env) == evaluate(policy, env)
+    assert evaluate(policy, env)["reason"] == "condition_depth_exceeded"
@@ -0,0 +1,196 @@
+import random
+
+import pytest
+
+from rbacx.core import policy as policy_mod
+from rbacx.core.engine import Guard
+from rbacx.core.model import Action, Context, Resource, ResourceBatch, Subject
+
+VALUES = [0, 1, 2, 1.5, True, "1", "a", "ab", None, [1, "a"], "2024-01-01T00:00:00Z"]
+
+
+def _operand(rnd):
+    return rnd.choice(
+        [
+            {"attr": "resource.attrs.k"},
+            {"attr": "resource.attrs.tags"},
+            {"attr": "resource.id"},
+            {"attr": "resource.type"},
+            {"attr": "resource.attrs.missing"},
+            {"attr": "subject.attrs.t"},
+            {"attr": "context.n"},
+            rnd.choice(VALUES),
+        ]
+    )
+
+
+def _condition(rnd, depth=0):
+    kind = rnd.random()
+    if depth < 3 and kind < 0.3:
+        op = rnd.choice(["and", "or"])
+        return {op: [_condition(rnd, depth + 1) for _ in range(rnd.randint(0, 3))]}
+    if depth < 3 and kind < 0.4:
+        return {"not": _condition(rnd, depth + 1)}
+    if kind < 0.47:
+        return {"rel": rnd.choice(["viewer", "editor"])}
+    if kind < 0.52:
+        return {"between": [_operand(rnd), ["2023-01-01T00:00:00Z", _operand(rnd)]]}
+    op = rnd.choice(
+        ["==", "!=", ">", "<", "in", "contains", "hasAny", "startsWith", "before", "after"]
+    )
+    return {op: [_operand(rnd), _operand(rnd)]}
+
+
+def _rule(rnd, i):
+    rule = {"id": f"r{i}", "effect": rnd.choice(["permit", "deny"]), "actions": ["read"]}
+    if rnd.random() < 0.4:
+        rule["resource"] = rnd.choice(
+            [
+                {"type": "doc"},
+                {"type": "img"},
+                {"type": "doc", "attrs": {"k": rnd.choice([1, "a", [1, 2]])}},
+                {"id": rnd.choice(["d1", "d2"])},
+            ]
+        )
+    if rnd.random() < 0.8:
+        rule["condition"] = _condition(rnd)
+    if rnd.random() < 0.2:
+        rule["roles"] = ["dev"]
+    if rnd.random() < 0.1:
+        rule["obligations"] = [{"type": "require_mfa"}]
+    return rule
+
+
+def _batch(rnd):
+    n = rnd.randint(1, 12)
+    return ResourceBatch(
+        type="doc",
+        ids=[rnd.choice(["d1", "d2", "d3", None]) for _ in range(n)],
+        attrs={
+            "k": [rnd.choice(VALUES) for _ in range(n)],
+            "tags": [rnd.choice([["a"], ["a", 1], "a", None]) for _ in range(n)],
+        },
+    )
+
+
+class Relations:
+    def check(self, subject, relation, resource, *, context=None):
+        return hash((relation, resource)) % 3 == 0
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4, 5, 47])
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("algorithm", ["deny-overrides", "permit-overrides", "first-applicable"])
+def test_bulk_bitmap_matches_per_resource_decisions(strict, algorithm, seed):
+    rnd = random.Random(seed)
+    for _ in range(30):
+        policy = {
+            "algorithm": algorithm,
+            "rules": [_rule(rnd, i) for i in range(rnd.randint(1, 8))],
+        }
+        guard = Guard(policy, strict_types=strict, relationship_checker=Relations())
+        for _ in range(3):
+            batch = _batch(rnd)
+            subject = Subject(
+                "u1", roles=rnd.choice([["dev"], []]), attrs={"t": rnd.choice(VALUES)}
+            )
+            ctx = Context({"n": rnd.choice(VALUES), "mfa": rnd.choice([True, False])})
+            bitmap = guard.evaluate_bulk_sync(subject, Action("read"), batch, ctx)
+            expected = [
+                guard.evaluate_sync(
+                    subject,
+                    Action("read"),
+                    Resource(batch.type, rid, {k: col[i] for k, col in batch.attrs.items()}),
+                    ctx,
+                ).allowed
+                for i, rid in enumerate(batch.ids)
+            ]
+            assert [bool(bitmap >> i & 1) for i in range(len(batch))] == expected
+
+
+def test_predicates_not_reading_the_resource_run_once_per_batch(monkeypatch):
+    calls = []
+
+    def starts_with(a, b):
+        calls.append((a, b))
+        return str(a).startswith(str(b))
+
+    monkeypatch.setitem(policy_mod.BINARY_OPS, "startsWith", starts_with)
+    policy = {
+        "rules": [
+            {
+                "actions": ["read"],
+                "condition": {
+                    "and": [
+                        {"startsWith": [{"attr": "subject.id"}, "u"]},
+                        {"startsWith": [{"attr": "resource.attrs.path"}, "/pub"]},
+                    ]
+                },
+            }
+        ]
+    }
+    paths = ["/pub/a", "/priv/b", "/pub/c", "/x"]
+    batch = ResourceBatch("file", ids=["1", "2", "3", "4"], attrs={"path": paths})
+    bitmap = Guard(policy).evaluate_bulk_sync(Subject("u1"), Action("read"), batch)
+    assert batch.permitted(bitmap) == ["1", "3"]
+    assert len(calls) == 1 + len(paths)
+
+
+def test_rows_with_obligations_are_decided_per_resource():
+    policy = {
+        "algorithm": "first-applicable",
+        "rules": [
+            {
+                "actions": ["read"],
+                "resource": {"attrs": {"secret": True}},
+                "obligations": [{"type": "require_mfa"}],
+            },
+            {"actions": ["read"]},
+        ],
+    }
+    batch = ResourceBatch("doc", ids=["a", "b"], attrs={"secret": [True, False]})
+    guard = Guard(policy)
+    assert guard.evaluate_bulk_sync(Subject("u1"), Action("read"), batch) == 0b10
+    ctx = Context({"mfa": True})
+    assert guard.evaluate_bulk_sync(Subject("u1"), Action("read"), batch, ctx) == 0b11
+
+
+def test_bulk_follows_the_compiled_rule_order():
+    # the compiled selection tries type-specific rules before wildcard ones, so
+    # under permit-overrides r2's failed obligation is reached before r1 permits
+    policy = {
+        "algorithm": "permit-overrides",
+        "rules": [
+            {"id": "r1", "effect": "permit", "actions": ["read"]},
+            {
+                "id": "r2",
+                "effect": "permit",
+                "actions": ["read"],
+                "resource": {"type": "doc"},
+                "condition": {"!=": [{"attr": "resource.id"}, "x"]},
+                "obligations": [{"type": "require_mfa"}],
+            },
+        ],
+    }
+    guard = Guard(policy)
+    decision = guard.evaluate_sync(Subject("u1"), Action("read"), Resource("doc", "a"))
+    batch = ResourceBatch("doc", ids=["a"])
+    assert guard.evaluate_bulk_sync(Subject("u1"), Action("read"), batch) == int(decision.allowed)
+
+
+def test_resource_batch_columns():
+    with pytest.raises(ValueError):
+        ResourceBatch("doc", ids=["a", "b"], attrs={"k": [1]})
+    resources = [Resource("doc", "a", {"k": 1}), Resource("doc", "b", {"k": 2})]
+    batch = ResourceBatch.from_resources(resources)
+    assert batch == ResourceBatch("doc", ids=["a", "b"], attrs={"k": [1, 2]})
+    assert batch.permitted(0b10) == ["b"]
+    with pytest.raises(ValueError):
+        ResourceBatch.from_resources([Resource("doc", "a"), Resource("img", "b")])
+    empty = ResourceBatch("doc", ids=[])
+    assert (
+        Guard({"rules": [{"actions": ["read"]}]}).evaluate_bulk_sync(
+            Subject("u1"), Action("read"), empty
+        )
+        == 0
+    )
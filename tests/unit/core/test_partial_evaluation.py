@@ -0,0 +1,215 @@
+import random
+import sqlite3
+
+import pytest
+
+from rbacx.core.partial import partial_evaluate, to_sql
+from rbacx.core.policy import ConditionDepthError, ConditionTypeError, eval_condition, evaluate
+
+OWNERS = ["u1", "u2", "u3", None]
+LEVELS = [0, 1, 5, 9, None]
+
+
+def _leaf(rnd, sql_only):
+    kind = rnd.random()
+    if kind < 0.25:
+        return {
+            rnd.choice(["==", "!="]): [
+                {"attr": "resource.attrs.owner"},
+                rnd.choice([{"attr": "subject.id"}, *OWNERS]),
+            ]
+        }
+    if kind < 0.45:
+        return {
+            rnd.choice([">", "<", ">=", "<="]): rnd.sample(
+                [{"attr": "resource.attrs.level"}, rnd.choice([{"attr": "context.level"}, 3])],
+                2,
+            )
+        }
+    if kind < 0.55:
+        return {"in": [{"attr": "resource.attrs.owner"}, rnd.sample(OWNERS, rnd.randint(0, 3))]}
+    if kind < 0.7:
+        # known: folded away
+        return rnd.choice(
+            [
+                {"hasAny": [{"attr": "subject.roles"}, ["admin"]]},
+                {">": [{"attr": "context.level"}, 2]},
+                {">": [{"attr": "subject.id"}, 2]},  # a type error
+                {"==": [{"attr": "resource.type"}, "doc"]},
+            ]
+        )
+    if sql_only:
+        return {"==": [{"attr": "resource.id"}, rnd.choice(["d1", "d2"])]}
+    return rnd.choice(
+        [
+            {"startsWith": [{"attr": "resource.attrs.owner"}, "u"]},
+            {"hasAny": [{"attr": "resource.attrs.owner"}, ["u1"]]},  # always a type error
+            {"between": [{"attr": "context.now"}, [0, {"attr": "resource.attrs.level"}]]},
+        ]
+    )
+
+
+def _condition(rnd, sql_only, depth=0):
+    kind = rnd.random()
+    if depth < 3 and kind < 0.35:
+        op = rnd.choice(["and", "or"])
+        return {op: [_condition(rnd, sql_only, depth + 1) for _ in range(rnd.randint(0, 3))]}
+    if depth < 3 and kind < 0.45:
+        return {"not": _condition(rnd, sql_only, depth + 1)}
+    return _leaf(rnd, sql_only)
+
+
+def _policy(rnd, algorithm, sql_only=False):
+    rules = []
+    for i in range(rnd.randint(1, 6)):
+        rule = {"id": f"r{i}", "effect": rnd.choice(["permit", "deny"]), "actions": ["read"]}
+        if rnd.random() < 0.3:
+            rule["resource"] = rnd.choice(
+                [
+                    {"type": rnd.choice(["doc", ["doc", "img"], "img"])},
+                    {"attrs": {"owner": rnd.choice([["u1", "u2"], "u3"])}},
+                    {"id": "d2"} if sql_only else {"type": "*", "attrs": {"level": 5}},
+                ]
+            )
+        if rnd.random() < 0.85:
+            rule["condition"] = _condition(rnd, sql_only)
+        if rnd.random() < 0.2:
+            rule["roles"] = ["admin"]
+        rules.append(rule)
+    return {"algorithm": algorithm, "rules": rules}
+
+
+def _env(rnd, strict):
+    env = {
+        "subject": {"id": rnd.choice(["u1", "u2"]), "roles": rnd.choice([["admin"], []])},
+        "action": rnd.choice(["read", "write"]),
+        "context": {"level": rnd.choice([1, 4]), "now": 3},
+    }
+    if strict:
+        env["__strict_types__"] = True
+    return env
+
+
+def _resources():
+    return [
+        {"type": "doc", "id": f"d{i}", "attrs": {"owner": owner, "level": level}}
+        for i, (owner, level) in enumerate((o, lv) for o in OWNERS for lv in LEVELS)
+    ]
+
+
+def _residual_outcome(residual, env, resource):
+    try:
+        return eval_condition(residual, {**env, "resource": resource})
+    except (ConditionTypeError, ConditionDepthError):
+        return None  # undetermined: treated as deny
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("algorithm", ["deny-overrides", "permit-overrides", "first-applicable"])
+def test_residual_permits_what_evaluate_permits(strict, algorithm):
+    rnd = random.Random(48)
+    resources = _resources()
+    for _ in range(200):
+        policy = _policy(rnd, algorithm)
+        env = _env(rnd, strict)
+        residual = partial_evaluate(policy, env, resource_type=rnd.choice([None, "doc"]))
+        for resource in resources:
+            outcome = _residual_outcome(residual, env, resource)
+            if outcome is not None:
+                permitted = evaluate(policy, {**env, "resource": resource})["decision"] == "permit"
+                assert outcome == permitted, (policy, env, resource, residual)
+
+
+@pytest.mark.parametrize("algorithm", ["deny-overrides", "permit-overrides", "first-applicable"])
+def test_sql_selects_the_permitted_rows(algorithm):
+    db = sqlite3.connect(":memory:")
+    db.execute("CREATE TABLE docs (id TEXT, type TEXT, owner TEXT, level INTEGER)")
+    resources = _resources()
+    db.executemany(
+        "INSERT INTO docs VALUES (?, ?, ?, ?)",
+        [(r["id"], r["type"], r["attrs"]["owner"], r["attrs"]["level"]) for r in resources],
+    )
+    rnd = random.Random(4800)
+    for _ in range(200):
+        policy = _policy(rnd, algorithm, sql_only=True)
+        env = _env(rnd, strict=False)
+        residual = partial_evaluate(policy, env)
+        where, params = to_sql(residual)
+        selected = {row[0] for row in db.execute(f"SELECT id FROM docs WHERE {where}", params)}
+        for r in resources:
+            permitted = evaluate(policy, {**env, "resource": r})["decision"] == "permit"
+            if r["attrs"]["level"] is not None:
+                assert (r["id"] in selected) == permitted, (policy, env, where, params)
+            else:
+                assert r["id"] not in selected or permitted
+            # exactly the rows the residual permits, NULLs included
+            outcome = _residual_outcome(residual, env, r)
+            assert (r["id"] in selected) == (outcome is True), (residual, r, where)
+
+
+def test_ownership_policy_residual_and_sql():
+    policy = {
+        "algorithm": "deny-overrides",
+        "rules": [
+            {
+                "id": "own",
+                "actions": ["read"],
+                "resource": {"type": "doc"},
+                "condition": {"==": [{"attr": "resource.attrs.owner"}, {"attr": "subject.id"}]},
+            },
+            {"id": "admin", "actions": ["read"], "roles": ["admin"]},
+            {
+                "id": "archived",
+                "effect": "deny",
+                "actions": ["read"],
+                "condition": {">": [{"attr": "resource.attrs.age"}, 365]},
+            },
+        ],
+    }
+    env = {"subject": {"id": "u1", "roles": []}, "action": "read", "context": {}}
+    residual = partial_evaluate(policy, env, resource_type="doc")
+    assert residual == {
+        "and": [
+            {"==": [{"attr": "resource.attrs.owner"}, "u1"]},
+            {"not": {">": [{"attr": "resource.attrs.age"}, 365]}},
+        ]
+    }
+    assert to_sql(residual, placeholder="%s") == (
+        "((owner IS NOT NULL AND owner = %s) AND (age IS NOT NULL AND NOT (age > %s)))",
+        ["u1", 365],
+    )
+    # the NULL guard stays with the comparison: other branches still match NULL rows
+    either = {"or": [{"==": [{"attr": "resource.attrs.owner"}, "u1"]}, residual["and"][1]]}
+    assert to_sql(either) == (
+        "((owner IS NOT NULL AND owner = ?) OR (age IS NOT NULL AND NOT (age > ?)))",
+        ["u1", 365],
+    )
+    # ...unless an earlier comparison failed on NULL: evaluation stopped there
+    first = {"or": [residual["and"][1], {"==": [{"attr": "resource.attrs.owner"}, "u1"]}]}
+    assert to_sql(first) == (
+        "((age IS NOT NULL AND NOT (age > ?)) OR ((age IS NOT NULL AND age > ?)"
+        " AND (owner IS NOT NULL AND owner = ?)))",
+        [365, 365, "u1"],
+    )
+    admin = {**env, "subject": {"id": "u9", "roles": ["admin"]}}
+    assert partial_evaluate(policy, admin, resource_type="doc") == {
+        "not": {">": [{"attr": "resource.attrs.age"}, 365]}
+    }
+    assert partial_evaluate(policy, {**env, "action": "write"}) is False
+    assert to_sql(True) == ("1 = 1", [])
+
+
+def test_to_sql_rejects_what_it_cannot_render():
+    with pytest.raises(ValueError):
+        to_sql({"rel": "viewer"})
+    with pytest.raises(ValueError):
+        to_sql({"startsWith": [{"attr": "resource.attrs.path"}, "/pub"]})
+    with pytest.raises(ValueError):
+        to_sql({"==": [{"attr": "resource.attrs.a"}, {"attr": "resource.attrs.b"}]})
+    with pytest.raises(ValueError):
+        to_sql({"==": [{"attr": "resource.attrs.x; DROP TABLE t"}, 1]})
+    assert to_sql(
+        {"in": [{"attr": "resource.attrs.k"}, [1, None]]}, {"resource.attrs.k": "t.k"}
+    ) == ("(t.k IS NULL OR t.k IN (?))", [1])
+    with pytest.raises(ValueError):
+        partial_evaluate({"policies": []}, {})
@@ -0,0 +1,109 @@
+import ipaddress
+import random
+
+import pytest
+
+from rbacx.core.conditions import compile_condition
+from rbacx.core.engine import Guard
+from rbacx.core.iprange import IPRangeSet, range_error
+from rbacx.core.model import Action, Context, Resource, Subject
+from rbacx.core.policy import ConditionTypeError, eval_condition
+
+
+def _networks(rnd, n):
+    nets = []
+    for _ in range(n):
+        if rnd.random() < 0.7:
+            nets.append(f"10.{rnd.randrange(4)}.{rnd.randrange(256)}.0/{rnd.randint(20, 32)}")
+        else:
+            nets.append(f"2001:db8:{rnd.randrange(4):x}::/{rnd.randint(44, 128)}")
+    return nets
+
+
+def _address(rnd):
+    if rnd.random() < 0.7:
+        return f"10.{rnd.randrange(4)}.{rnd.randrange(256)}.{rnd.randrange(256)}"
+    return f"2001:db8:{rnd.randrange(4):x}::{rnd.randrange(1 << 16):x}"
+
+
+def test_range_set_agrees_with_ipaddress():
+    rnd = random.Random(50)
+    for _ in range(50):
+        nets = _networks(rnd, rnd.randint(0, 300))
+        ranges = IPRangeSet(nets)
+        parsed = [ipaddress.ip_network(n, strict=False) for n in nets]
+        for _ in range(100):
+            addr = _address(rnd)
+            ip = ipaddress.ip_address(addr)
+            assert (addr in ranges) == any(ip in net for net in parsed), (nets, addr)
+
+
+def test_compiled_and_interpreted_agree():
+    values = ["10.1.2.3", "10.9.0.1", "::ffff:10.1.2.3", "2001:db8::1", "nope", "", 167838211, None]
+    operands = ["10.1.0.0/16", ["10.1.2.0/24", "2001:db8::/32"], [], ["bad"], [1], 3]
+    for ranges in operands:
+        for value in values:
+            env = {"ip": value, "r": ranges}
+            for cond in (
+                {"ipInRange": [{"attr": "ip"}, ranges]},
+                {"ipInRange": [{"attr": "ip"}, {"attr": "r"}]},
+            ):
+                for strict in (False, True):
+                    e = {**env, "__strict_types__": strict}
+                    try:
+                        expected = eval_condition(cond, e)
+                    except ConditionTypeError:
+                        expected = "error"
+                    try:
+                        got = compile_condition(cond)(e)
+                    except ConditionTypeError:
+                        got = "error"
+                    assert got == expected, (cond, value, strict)
+
+
+def test_ip_in_range_semantics():
+    cond = {"ipInRange": [{"attr": "context.ip"}, ["10.0.0.0/8", "192.168.1.7", "fd00::/8"]]}
+    for ip, expected in [
+        ("10.20.30.40", True),
+        ("192.168.1.7", True),
+        ("192.168.1.8", False),
+        ("::ffff:10.0.0.1", True),  # IPv4-mapped
+        ("fd12::1", True),
+        ("11.0.0.0", False),
+    ]:
+        assert eval_condition(cond, {"context": {"ip": ip}}) is expected
+    # addresses must be strings, in lax and strict mode alike
+    for env in ({}, {"__strict_types__": True}):
+        for ip in (ipaddress.ip_address("10.0.0.1"), 167772161, "10.0.0.256"):
+            with pytest.raises(ConditionTypeError):
+                eval_condition(cond, {**env, "context": {"ip": ip}})
+    assert len(IPRangeSet(["10.0.0.0/9", "10.128.0.0/9", "10.1.2.3/8", "::/0"])) == 2
+    assert range_error("10.0.0.0/8") is None
+    assert range_error(["10.0.0.0/33"]) is not None
+    assert range_error([8]) == "ranges must be a string or a list of strings"
+
+
+def test_guard_with_thousands_of_ranges():
+    rnd = random.Random(5)
+    nets = [f"{rnd.randrange(1, 224)}.{rnd.randrange(256)}.{rnd.randrange(256)}.0/24"]
+    nets += [f"172.16.{i // 256}.{i % 256}/32" for i in range(5000)]
+    policy = {
+        "rules": [
+            {
+                "id": "office",
+                "actions": ["admin"],
+                "condition": {"ipInRange": [{"attr": "context.ip"}, nets]},
+            }
+        ]
+    }
+    guard = Guard(policy)
+
+    def allowed(ip):
+        ctx = Context({"ip": ip})
+        return guard.evaluate_sync(Subject("u1"), Action("admin"), Resource("x"), ctx).allowed
+
+    assert allowed("172.16.19.135") and not allowed("172.16.19.136")
+    decision = guard.evaluate_sync(
+        Subject("u1"), Action("admin"), Resource("x"), Context({"ip": None})
+    )
+    assert decision.reason == "condition_type_mismatch"
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+
+from rbacx.core.conditions import compile_condition
+from rbacx.core.engine import Guard
+from rbacx.core.model import Action, Resource, Subject
+from rbacx.core.patterns import MAX_MATCH_LENGTH, PatternError, compile_pattern, pattern_error
+from rbacx.core.policy import ConditionTypeError, eval_condition
+
+VALUES = ["/docs/a.pdf", "/docs/sub/b.pdf", "/docs/a.txt", "DOCS/a.pdf", "", "x" * 5000, 7, None]
+PATTERNS = [r"/docs/[^/]+\.pdf", r"/docs/.*", r"(?i)docs/.*", "/docs/*.pdf", "*", "[!/]*", "(a+)+"]
+
+
+def _outcome(fn, env):
+    try:
+        return fn(env)
+    except ConditionTypeError:
+        return "error"
+
+
+@pytest.mark.parametrize("op", ["matches", "glob"])
+def test_compiled_and_interpreted_agree(op):
+    for pattern in [*PATTERNS, 3]:
+        for value in VALUES:
+            env = {"v": value, "p": pattern}
+            for cond in (
+                {op: [{"attr": "v"}, pattern]},
+                {op: [{"attr": "v"}, {"attr": "p"}]},
+            ):
+                expected = _outcome(lambda e, c=cond: eval_condition(c, e), env)
+                assert _outcome(compile_condition(cond), env) == expected, (cond, value)
+
+
+def test_matches_and_glob_semantics():
+    env = {"path": "/docs/sub/b.pdf", "n": 1}
+    assert eval_condition({"matches": [{"attr": "path"}, r"/docs/.+\.pdf"]}, env) is True
+    # the whole value must match
+    assert eval_condition({"matches": [{"attr": "path"}, "docs"]}, env) is False
+    # "*" crosses "/", and globs are case-sensitive
+    assert eval_condition({"glob": [{"attr": "path"}, "/docs/*.pdf"]}, env) is True
+    assert eval_condition({"glob": [{"attr": "path"}, "/DOCS/*"]}, env) is False
+    for cond in (
+        {"matches": [{"attr": "n"}, "1"]},
+        {"glob": [{"attr": "path"}, None]},
+        {"matches": [{"attr": "path"}, "(a+)+"]},
+        {"glob": [{"attr": "long"}, "*"]},
+    ):
+        with pytest.raises(ConditionTypeError):
+            eval_condition(cond, {**env, "long": "a" * (MAX_MATCH_LENGTH + 1)})
+
+
+UNSAFE = [
+    "(a+)+",
+    r"(\w|\d\w)*",
+    "(x{1,3})*",
+    "(.?){100}",
+    r"(a)\1",
+    "(?P<n>a)(?P=n)",
+    "(",
+    "a" * 2000,
+    # repetitions over overlapping characters backtrack polynomially
+    ".*.*.*x",
+    ".*" * 8 + "x",
+    r"\d+\d+\d+\d+x",
+    "a{1,100}a{1,100}a{1,100}b",
+    ".*a.*",
+    "(?i)[a-z]+[A-Z]+",
+    r"-?\d*\.?\d+",
+    # identical alternatives leave empty branches once their prefix is factored out
+    "(a|a)*b",
+    "(ab|ab)*c",
+]
+SAFE = [
+    r"(?:ab)+",
+    r"(\d{2}){3}",
+    "(a+)?",
+    r"[(+]+",
+    r"\(a+\)+",
+    "a{2,5}?",
+    r"[a-z]+(\.[a-z]+)*",
+    r"\d+(\.\d+)?",
+    r"[a-z]+[A-Z]+",
+    r"[\w.+-]+@[\w-]+\.[\w.-]+",
+    r"https?://[^/]+/.*",
+    "(a|b)*c",
+]
+
+
+def test_unsafe_patterns_are_rejected():
+    for pattern in UNSAFE:
+        with pytest.raises(PatternError):
+            compile_pattern("matches", pattern)
+    for pattern in SAFE:
+        assert pattern_error("matches", pattern) is None, pattern
+    assert pattern_error("glob", "(a+)+") is None
+    assert pattern_error("glob", 1) == "pattern must be a string"
+    start = time.perf_counter()
+    compile_pattern("glob", "*a*a*a*a*a*a*a*a*b").fullmatch("a" * MAX_MATCH_LENGTH)
+    assert time.perf_counter() - start < 1
+
+
+def test_accepted_patterns_match_in_bounded_time():
+    # a repetition followed by a long required run of characters it also matches
+    # is scanned once per split: the slowest accepted shape, quadratic in the value
+    value = "a" * MAX_MATCH_LENGTH
+    worst = 0.0
+    for pattern in [".*" + "a" * (MAX_MATCH_LENGTH // 2) + "b", *SAFE]:
+        compiled = compile_pattern("matches", pattern)
+        start = time.perf_counter()
+        compiled.fullmatch(value)
+        worst = max(worst, time.perf_counter() - start)
+    assert worst < 0.01
+
+
+def test_guard_with_pattern_rules():
+    policy = {
+        "rules": [
+            {
+                "id": "bad",
+                "actions": ["read"],
+                "condition": {"matches": [{"attr": "resource.id"}, "(a|aa)*"]},
+            },
+            {
+                "id": "pdf",
+                "actions": ["read"],
+                "condition": {"glob": [{"attr": "resource.id"}, "/public/*.pdf"]},
+            },
+        ]
+    }
+    guard = Guard(policy)
+    decision = guard.evaluate_sync(Subject("u1"), Action("read"), Resource("file", "/public/a.pdf"))
+    assert decision.allowed and decision.rule_id == "pdf"
+    decision = guard.evaluate_sync(Subject("u1"), Action("read"), Resource("file", "/x.pdf"))
+    assert not decision.allowed
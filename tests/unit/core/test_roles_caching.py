@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rbacx.core.engine import Guard
+from rbacx.core.model import Action, Resource, Subject
+from rbacx.core.roles import CachingRoleResolver, StaticRoleResolver
+from rbacx.core.roles_sqlite import SQLiteRoleResolver
+
+
+class SlowResolver:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.inner = StaticRoleResolver({"admin": ["user"]})
+
+    def expand(self, roles):
+        self.calls.append(list(roles or []))
+        time.sleep(self.delay)
+        return self.inner.expand(roles)
+
+
+def test_caches_by_role_set_with_ttl():
+    inner = SlowResolver()
+    c = CachingRoleResolver(inner, ttl=1)
+    assert c.expand(["admin"]) == ("admin", "user")
+    assert c.expand(["admin", "admin"]) == ("admin", "user")
+    # not per subject: the inner resolver only sees roles
+    assert c.expand_subject("u1", ["admin"]) == ("admin", "user")
+    assert len(inner.calls) == 1
+    c.invalidate(["admin"], subject_id="ignored")
+    c.expand(["admin"])
+    assert len(inner.calls) == 2
+
+
+def test_concurrent_misses_call_the_inner_resolver_once():
+    inner = SlowResolver(delay=0.1)
+    c = CachingRoleResolver(inner)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(c.expand(["admin"]))) for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [("admin", "user")] * 8
+    assert len(inner.calls) == 1
+
+
+def test_async_inner_single_flight_and_errors_are_not_cached():
+    calls = []
+
+    class AsyncResolver:
+        fail = True
+
+        async def expand(self, roles):
+            calls.append(roles)
+            await asyncio.sleep(0.05)
+            if self.fail:
+                raise RuntimeError("directory down")
+            return ["b", "a"]
+
+    inner = AsyncResolver()
+    c = CachingRoleResolver(inner)
+
+    async def burst():
+        return await asyncio.gather(*(c.expand(["x"]) for _ in range(5)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(burst()))
+    inner.fail = False
+    assert asyncio.run(burst()) == [("b", "a")] * 5
+    assert len(calls) == 2
+    assert c.expand(["x"]) == ("b", "a")  # cached hit is returned directly
+
+
+def test_sqlite_resolver_expands_graph_and_assignments():
+    r = SQLiteRoleResolver()
+    r.load_graph({"admin": ["manager"], "manager": ["employee"], "employee": ["manager"]})
+    r.assign_many([("u1", "admin"), ("u2", "employee")])
+    assert r.expand(["manager"]) == ("employee", "manager")
+    assert r.expand([]) == ()
+    assert r.expand_subject("u1", None) == ("admin", "employee", "manager")
+    assert r.expand_subject("u3", ["guest"]) == ("guest",)
+    r.revoke("u1", "admin")
+    r.remove_parent("employee", "manager")
+    assert r.expand_subject("u1", []) == ()
+    assert r.expand_subject("u2", []) == ("employee",)
+    r.close()
+
+
+def test_guard_resolves_subject_roles_through_the_cache(tmp_path):
+    db = SQLiteRoleResolver(str(tmp_path / "roles.db"))
+    db.add_parent("admin", "editor")
+    db.assign("u1", "admin")
+    policy = {
+        "rules": [{"id": "e", "effect": "permit", "actions": ["edit"], "roles": ["editor"]}],
+    }
+    resolver = CachingRoleResolver(db, ttl=60)
+    g = Guard(policy, role_resolver=resolver)
+    res = Resource(type="doc", id="1")
+    assert g.evaluate_sync(Subject(id="u1"), Action("edit"), res).allowed
+    assert not g.evaluate_sync(Subject(id="u2"), Action("edit"), res).allowed
+
+    db.revoke("u1", "admin")
+    assert g.evaluate_sync(Subject(id="u1"), Action("edit"), res).allowed  # cached
+    resolver.invalidate(subject_id="u1")
+    assert not g.evaluate_sync(Subject(id="u1"), Action("edit"), res).allowed
+    db.close()
+
+
+def test_inner_errors_propagate_to_every_waiter():
+    class Boom:
+        def expand(self, roles):
+            time.sleep(0.05)
+            raise ValueError("nope")
+
+    c = CachingRoleResolver(Boom())
+    errors = []
+
+    def run():
+        try:
+            c.expand(["a"])
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(errors) == 4
+    with pytest.raises(ValueError):
+        c.expand(["a"])
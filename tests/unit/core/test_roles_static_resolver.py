@@ -4,10 +4,66 @@ from rbacx.core.roles import StaticRoleResolver
 def test_expand_roles_with_inheritance_and_duplicates():
     r = StaticRoleResolver({"manager": ["employee"], "employee": ["user"]})
     out = r.expand(["manager", "manager"])
-    assert out == ["employee", "manager", "user"]
+    assert out == ("employee", "manager", "user")
 
 
 def test_expand_with_none_or_empty():
     r = StaticRoleResolver()
-    assert r.expand([]) == []
-    assert r.expand(None) == []
+    assert r.expand([]) == ()
+    assert r.expand(None) == ()
+
+
+def _naive(graph, roles):
+    out, stack = set(), list(roles)
+    while stack:
+        r = stack.pop()
+        if r not in out:
+            out.add(r)
+            stack.extend(graph.get(r, []))
+    return tuple(sorted(out))
+
+
+def test_precomputed_closure_matches_graph_walk_on_random_graphs():
+    import random
+
+    rnd = random.Random(7)
+    for _ in range(30):
+        names = [f"r{i}" for i in range(25)]
+        graph = {n: rnd.sample(names, rnd.randint(0, 3)) for n in names}
+        r = StaticRoleResolver(graph)
+        for _ in range(20):
+            roles = rnd.sample(names + ["unknown"], rnd.randint(1, 4))
+            assert r.expand(roles) == _naive(graph, roles)
+
+
+def test_cycles_are_detected_and_expand_to_the_whole_cycle(caplog):
+    graph = {"a": ["b"], "b": ["c"], "c": ["a", "d"], "self": ["self"]}
+    with caplog.at_level("WARNING", logger="rbacx.core.roles"):
+        r = StaticRoleResolver(graph)
+    assert r.cycles == (("a", "b", "c"), ("self",))
+    assert "cycles" in caplog.text
+    assert r.expand(["b"]) == ("a", "b", "c", "d")
+    assert r.expand(["d"]) == ("d",)
+
+
+def test_deep_chain_and_memoized_combinations():
+    graph = {f"l{i}": [f"l{i + 1}"] for i in range(500)}
+    r = StaticRoleResolver(graph, cache_size=2)
+    assert len(r.expand(["l0"])) == 501
+    assert r.expand(["l0"]) is r.expand(["l0"])
+    out = r.expand(["l490", "x"])
+    assert isinstance(out, tuple) and out[-1] == "x" and len(out) == 12
+    # same combination in another order hits the memo
+    assert r.expand(["x", "l490"]) is out
+    assert r._expand_set.cache_info().hits == 1
+    r.expand(["a", "b"])
+    r.expand(["c", "d"])
+    assert r._expand_set.cache_info().currsize == 2
+
+
+def test_unknown_single_roles_are_not_memoized():
+    r = StaticRoleResolver({"manager": ["employee"]})
+    for i in range(1000):
+        assert r.expand([f"attacker-{i}"]) == (f"attacker-{i}",)
+    assert r.expand(["manager"]) is r.expand(["manager"])
+    assert set(r._sorted) == {"manager"}
@@ -0,0 +1,65 @@
+import sys
+import types
+
+import pytest
+
+from rbacx.dsl.lint import analyze_policy
+from rbacx.dsl.validate import validate_policy
+
+
+class _ValidationError(Exception):
+    pass
+
+
+@pytest.fixture
+def fake_jsonschema(monkeypatch):
+    fake = types.SimpleNamespace(validate=lambda instance, schema: None)
+    fake.ValidationError = _ValidationError
+    monkeypatch.setitem(sys.modules, "jsonschema", fake)
+
+
+def _rule(cond, **extra):
+    return {
+        "id": "r1",
+        "actions": ["read"],
+        "resource": {"type": "doc"},
+        "condition": cond,
+        **extra,
+    }
+
+
+def test_validate_rejects_unsafe_literal_patterns(fake_jsonschema):
+    validate_policy({"rules": [_rule({"matches": [{"attr": "resource.id"}, "^d[0-9]+$"]})]})
+    validate_policy({"rules": [_rule({"glob": [{"attr": "resource.id"}, {"attr": "context.p"}]})]})
+    bad = {"not": {"or": [{"matches": [{"attr": "resource.id"}, "(a+)+"]}]}}
+    with pytest.raises(_ValidationError, match=r"policies\[0\]\.rules\[0\]\.condition"):
+        validate_policy({"policies": [{"rules": [_rule(bad)]}]})
+    ob = {"type": "log", "condition": {"matches": [{"attr": "subject.id"}, "("]}}
+    with pytest.raises(_ValidationError, match="obligations"):
+        validate_policy({"rules": [_rule(True, obligations=[ob])]})
+
+
+def test_lint_reports_invalid_and_dynamic_patterns():
+    cond = {
+        "and": [
+            {"matches": [{"attr": "resource.id"}, "(x+)*"]},
+            {"glob": [{"attr": "resource.attrs.path"}, {"attr": "subject.attrs.prefix"}]},
+            {"matches": [{"attr": "resource.id"}, "d[0-9]+"]},
+        ]
+    }
+    issues = [i for i in analyze_policy({"rules": [_rule(cond)]}) if "op" in i]
+    assert [(i["code"], i["op"]) for i in issues] == [
+        ("INVALID_PATTERN", "matches"),
+        ("DYNAMIC_PATTERN", "glob"),
+    ]
+    assert issues[0]["pattern"] == "(x+)*" and issues[0]["index"] == 0
+
+
+def test_ip_ranges_are_validated_and_linted(fake_jsonschema):
+    good = {"ipInRange": [{"attr": "context.ip"}, ["10.0.0.0/8", "fd00::/8"]]}
+    validate_policy({"rules": [_rule(good)]})
+    bad = {"ipInRange": [{"attr": "context.ip"}, ["10.0.0.0/8", "10.0.0.0/40"]]}
+    with pytest.raises(_ValidationError, match="ipInRange"):
+        validate_policy({"rules": [_rule({"not": bad})]})
+    issues = analyze_policy({"rules": [_rule({"or": [good, bad]})]})
+    assert [i["code"] for i in issues if "op" in i] == ["INVALID_IP_RANGE"]
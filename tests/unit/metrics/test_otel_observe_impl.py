@@ -70,3 +70,79 @@ def test_otel_observe_record_called(monkeypatch):
 
     assert calls["add"] == [(1, {"decision": "permit"})]
     assert calls["record"] == [(0.42, {"decision": "permit"})]
+
+
+def test_otel_observe_routes_pool_utilization(monkeypatch):
+    """Pool utilization is recorded on its own histogram with the provider attribute."""
+    _purge("rbacx.metrics.otel")
+
+    records = {}
+
+    class _Hist:
+        def __init__(self, name):
+            self.name = name
+
+        def record(self, value, attributes=None):
+            records.setdefault(self.name, []).append((float(value), dict(attributes or {})))
+
+    class _Meter:
+        def create_counter(self, *a, **k):
+            return None
+
+        def create_histogram(self, name, **k):
+            return _Hist(name)
+
+    fake = types.ModuleType("opentelemetry.metrics")
+    fake.get_meter = lambda *a, **k: _Meter()
+    monkeypatch.setitem(sys.modules, "opentelemetry.metrics", fake)
+
+    import rbacx.metrics.otel as otel
+
+    importlib.reload(otel)
+
+    m = otel.OpenTelemetryMetrics()
+    m.observe("rbacx_rebac_pool_utilization", 0.5, {"provider": "spicedb"})
+    assert records == {"rbacx_rebac_pool_utilization": [(0.5, {"provider": "spicedb"})]}
+
+
+def test_otel_rebac_events_and_breaker_gauge(monkeypatch):
+    """ReBAC events go to their own counter; breaker state uses a sync gauge if available."""
+    _purge("rbacx.metrics.otel")
+
+    calls = []
+
+    class _Inst:
+        def __init__(self, name):
+            self.name = name
+
+        def add(self, value, attributes=None):
+            calls.append((self.name, value, dict(attributes or {})))
+
+        def set(self, value, attributes=None):
+            calls.append((self.name, value, dict(attributes or {})))
+
+    class _Meter:
+        def create_counter(self, name, **k):
+            return _Inst(name)
+
+        def create_histogram(self, name, **k):
+            return _Inst(name)
+
+        def create_gauge(self, name, **k):
+            return _Inst(name)
+
+    fake = types.ModuleType("opentelemetry.metrics")
+    fake.get_meter = lambda *a, **k: _Meter()
+    monkeypatch.setitem(sys.modules, "opentelemetry.metrics", fake)
+
+    import rbacx.metrics.otel as otel
+
+    importlib.reload(otel)
+
+    m = otel.OpenTelemetryMetrics()
+    m.inc("rbacx_rebac_events_total", {"provider": "openfga", "event": "timeout"})
+    m.observe("rbacx_rebac_breaker_state", 1, {"provider": "openfga"})
+    assert calls == [
+        ("rbacx_rebac_events_total", 1, {"provider": "openfga", "event": "timeout"}),
+        ("rbacx_rebac_breaker_state", 1.0, {"provider": "openfga"}),
+    ]
@@ -78,3 +78,80 @@ def test_prometheus_observe_record_called(monkeypatch):
     # observe path
     m.observe("rbacx_decision_seconds", 0.5, {"decision": "permit"})
     assert getattr(m._hist, "values", []) == [0.5]
+
+
+def test_prometheus_observe_routes_pool_utilization(monkeypatch):
+    """Pool utilization goes to its own labelled histogram, not the latency one."""
+    _purge("rbacx.metrics.prometheus")
+
+    class _Histogram:
+        def __init__(self, name, *a, **k):
+            self.name = name
+            self.values = []
+
+        def labels(self, **labels):
+            hist = self
+
+            class _Child:
+                def observe(self, v):
+                    hist.values.append((labels, float(v)))
+
+            return _Child()
+
+        def observe(self, v):
+            self.values.append(float(v))
+
+    fake = types.ModuleType("prometheus_client")
+    fake.Counter = lambda *a, **k: None
+    fake.Histogram = _Histogram
+    monkeypatch.setitem(sys.modules, "prometheus_client", fake)
+
+    import rbacx.metrics.prometheus as prom
+
+    importlib.reload(prom)
+
+    m = prom.PrometheusMetrics()
+    m.observe("rbacx_rebac_pool_utilization", 0.75, {"provider": "openfga"})
+    assert m._pool_hist.name == "rbacx_rebac_pool_utilization"
+    assert m._pool_hist.values == [({"provider": "openfga"}, 0.75)]
+    assert m._hist.values == []
+
+
+def test_prometheus_rebac_events_and_breaker_gauge(monkeypatch):
+    """ReBAC events use their own counter (not decisions); breaker state sets a gauge."""
+    _purge("rbacx.metrics.prometheus")
+
+    class _Metric:
+        def __init__(self, name, *a, **k):
+            self.name = name
+            self.calls = []
+
+        def labels(self, **labels):
+            metric = self
+
+            class _Child:
+                def inc(self):
+                    metric.calls.append(("inc", labels))
+
+                def set(self, v):
+                    metric.calls.append(("set", labels, v))
+
+                def observe(self, v):  # pragma: no cover - unused
+                    metric.calls.append(("observe", labels, v))
+
+            return _Child()
+
+    fake = types.ModuleType("prometheus_client")
+    fake.Counter = fake.Histogram = fake.Gauge = _Metric
+    monkeypatch.setitem(sys.modules, "prometheus_client", fake)
+
+    import rbacx.metrics.prometheus as prom
+
+    importlib.reload(prom)
+
+    m = prom.PrometheusMetrics()
+    m.inc("rbacx_rebac_events_total", {"provider": "spicedb", "event": "hedge"})
+    m.observe("rbacx_rebac_breaker_state", 2, {"provider": "spicedb"})
+    assert m._events.calls == [("inc", {"provider": "spicedb", "event": "hedge"})]
+    assert m._breaker.calls == [("set", {"provider": "spicedb"}, 2.0)]
+    assert m._counter.calls == []
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from rbacx.core.relctx import track_failures
+from rbacx.rebac.batching import BatchingRelationshipChecker
+
+
+class Recorder:
+    def __init__(self, allowed=(), delay=0.0):
+        self.allowed = set(allowed)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def check(self, subject, relation, resource, *, context=None):  # pragma: no cover - unused
+        raise AssertionError("single checks must be batched")
+
+    def batch_check(self, triples, *, context=None):
+        with self.lock:
+            self.calls.append((list(triples), context))
+        if self.delay:
+            time.sleep(self.delay)
+        return [t in self.allowed for t in triples]
+
+
+class AsyncRecorder(Recorder):
+    def batch_check(self, triples, *, context=None):
+        self.calls.append((list(triples), context))
+
+        async def _run():
+            await asyncio.sleep(0)
+            return [t in self.allowed for t in triples]
+
+        return _run()
+
+
+def _run_threads(fn, n):
+    out = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        out[i] = fn(i)
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    return out
+
+
+def test_concurrent_sync_checks_are_coalesced():
+    inner = Recorder(allowed={(f"user:{i}", "viewer", "doc:1") for i in range(0, 40, 2)})
+    b = BatchingRelationshipChecker(inner, max_batch=1000, max_delay_ms=50)
+    out = _run_threads(lambda i: b.check(f"user:{i}", "viewer", "doc:1"), 40)
+    b.close()
+    assert out == [i % 2 == 0 for i in range(40)]
+    assert len(inner.calls) < 10
+    assert sum(len(c[0]) for c in inner.calls) == 40
+
+
+def test_max_batch_splits_and_duplicates_share_a_slot():
+    inner = Recorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner, max_batch=3, max_delay_ms=30)
+    out = _run_threads(lambda i: b.check(f"u:{i % 5}", "r", "o:1"), 20)
+    b.close()
+    assert out == [i % 5 == 1 for i in range(20)]
+    assert all(len(c[0]) <= 3 for c in inner.calls)
+
+    inner = Recorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner, max_delay_ms=100)
+    assert _run_threads(lambda i: b.check("u:1", "r", "o:1"), 10) == [True] * 10
+    b.close()
+    assert inner.calls == [([("u:1", "r", "o:1")], None)]
+
+
+def test_contexts_are_not_mixed():
+    inner = Recorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner, max_delay_ms=30)
+    _run_threads(lambda i: b.check("u:1", "r", "o:1", context={"ip": i % 2}), 6)
+    b.close()
+    assert sorted(c[1]["ip"] for c in inner.calls) == [0, 1]
+
+
+def test_contexts_that_are_not_plain_json_are_not_coalesced():
+    when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    contexts = [{"t": when}, {"t": str(when)}, {"k": (1,)}, {"k": [1]}]
+    inner = Recorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner, max_delay_ms=30)
+    _run_threads(lambda i: b.check("u:1", "r", "o:1", context=contexts[i]), len(contexts))
+    b.close()
+    assert sorted(map(repr, (c[1] for c in inner.calls))) == sorted(map(repr, contexts))
+
+
+def test_async_callers_and_async_inner():
+    inner = AsyncRecorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner, max_delay_ms=5)
+
+    async def main():
+        return await asyncio.gather(*(b.check(f"u:{i}", "r", "o:1") for i in range(10)))
+
+    assert asyncio.run(main()) == [i == 1 for i in range(10)]
+    assert len(inner.calls) == 1
+    # sync callers with an async inner and no loop fall back to a private loop
+    assert b.check("u:1", "r", "o:1") is True
+    b.close()
+
+
+def test_cancelled_caller_does_not_strand_the_rest_of_its_batch():
+    inner = Recorder(allowed={("u:2", "r", "o:1"), ("u:3", "r", "o:1")}, delay=0.05)
+    b = BatchingRelationshipChecker(inner, max_delay_ms=20)
+
+    async def main():
+        first = asyncio.ensure_future(b.check("u:1", "r", "o:1"))
+        same = b.check("u:1", "r", "o:1")  # shares the cancelled caller's slot
+        other = b.check("u:2", "r", "o:1")
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.wait_for(asyncio.gather(same, other), 2)
+        # the next batch still resolves
+        return results, await asyncio.wait_for(b.check("u:3", "r", "o:1"), 2)
+
+    assert asyncio.run(main()) == ([False, True], True)
+    b.close()
+    assert len(inner.calls) == 2
+
+
+def test_failures_and_timeouts_fail_closed():
+    class Boom(Recorder):
+        def batch_check(self, triples, *, context=None):
+            raise RuntimeError("down")
+
+    # each caller hears that its False is a fail-closed default, not a denial
+    b = BatchingRelationshipChecker(Boom(), max_delay_ms=1)
+    with track_failures() as failures:
+        assert b.check("u:1", "r", "o:1") is False
+    assert len(failures) == 1
+
+    async def main():
+        with track_failures() as failures:
+            assert await b.check("u:2", "r", "o:1") is False
+        return failures
+
+    assert len(asyncio.run(main())) == 1
+    b.close()
+
+    class Short(Recorder):
+        def batch_check(self, triples, *, context=None):
+            return []
+
+    b = BatchingRelationshipChecker(Short(), max_delay_ms=1)
+    with track_failures() as failures:
+        assert b.check("u:1", "r", "o:1") is False
+    assert len(failures) == 1
+    b.close()
+
+    b = BatchingRelationshipChecker(Recorder(delay=0.5), max_delay_ms=1, timeout=0.05)
+    with track_failures() as failures:
+        assert b.check("u:1", "r", "o:1") is False
+    assert len(failures) == 1
+    b.close()
+
+    b = BatchingRelationshipChecker(Recorder(), max_delay_ms=1)
+    with track_failures() as failures:
+        assert b.check("u:1", "r", "o:1") is False  # a real denial
+    assert failures == []
+    b.close()
+    with pytest.raises(RuntimeError):
+        b.check("u:1", "r", "o:1")
+
+
+def test_batch_check_passes_through_and_validation():
+    inner = Recorder(allowed={("u:1", "r", "o:1")})
+    b = BatchingRelationshipChecker(inner)
+    assert b.batch_check([("u:1", "r", "o:1"), ("u:2", "r", "o:1")]) == [True, False]
+    b.close()  # never started
+    with pytest.raises(ValueError):
+        BatchingRelationshipChecker(inner, max_batch=0)
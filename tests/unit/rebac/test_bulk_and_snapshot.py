@@ -0,0 +1,112 @@
+import io
+
+import pytest
+
+from rbacx.rebac import bulk
+from rbacx.rebac.compact import CompactRelationshipStore
+from rbacx.rebac.local import InMemoryRelationshipStore, LocalRelationshipChecker, RelTuple, This
+from rbacx.rebac.sqlite import SQLiteRelationshipStore
+
+
+def _key(tuples):
+    return sorted((t.subject, t.relation, t.resource, t.caveat) for t in tuples)
+
+
+def test_in_memory_add_many_and_iter_tuples():
+    st = InMemoryRelationshipStore()
+    n = st.add_many([("user:1", "viewer", "doc:1"), RelTuple("user:2", "owner", "doc:1", "c")])
+    assert n == 2
+    assert [t.subject for t in st.direct_for_resource("owner", "doc:1")] == ["user:2"]
+    assert _key(st.iter_tuples()) == [
+        ("user:1", "viewer", "doc:1", None),
+        ("user:2", "owner", "doc:1", "c"),
+    ]
+
+
+def test_ndjson_loader_accepts_objects_and_arrays_in_chunks():
+    text = (
+        '{"subject": "user:1", "relation": "viewer", "resource": "doc:1"}\n'
+        "\n"
+        '["user:2", "viewer", "doc:1", "weekend"]\n'
+        '{"subject": "user:3", "relation": "viewer", "resource": "doc:2", "caveat": null}\n'
+    )
+    st = SQLiteRelationshipStore()
+    assert bulk.load_ndjson(st, io.StringIO(text), chunk_size=2) == 3
+    assert _key(st.direct_for_resource("viewer", "doc:1")) == [
+        ("user:1", "viewer", "doc:1", None),
+        ("user:2", "viewer", "doc:1", "weekend"),
+    ]
+
+
+def test_ndjson_loader_reports_bad_line():
+    with pytest.raises(ValueError, match="line 2"):
+        list(bulk.iter_ndjson(['["a","b","c"]', '{"subject": "x"}']))
+
+
+def test_csv_loader_skips_header_and_validates_rows():
+    text = "subject,relation,resource,caveat\nuser:1,viewer,doc:1,\nfolder:1, parent ,doc:1,\n"
+    st = InMemoryRelationshipStore()
+    assert bulk.load_csv(st, io.StringIO(text)) == 2
+    assert [t.subject for t in st.direct_for_resource("parent", "doc:1")] == ["folder:1"]
+    assert list(st.direct_for_resource("viewer", "doc:1"))[0].caveat is None
+
+    with pytest.raises(ValueError, match="line 1"):
+        list(bulk.iter_csv(["only,two"]))
+
+
+def test_load_tuples_falls_back_to_add():
+    class AddOnly:
+        def __init__(self):
+            self.rows = []
+
+        def add(self, subject, relation, resource, *, caveat=None):
+            self.rows.append((subject, relation, resource, caveat))
+
+    st = AddOnly()
+    assert bulk.load_tuples(st, [("a", "b", "c")] * 5, chunk_size=2) == 5
+    assert len(st.rows) == 5
+
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_snapshot_roundtrip_from_in_memory_store(tmp_path, use_mmap):
+    src = InMemoryRelationshipStore()
+    for i in range(200):
+        src.add(f"user:{i % 17}", "viewer", f"doc:{i % 23}", caveat="c" if i % 5 == 0 else None)
+    src.add("folder:1", "parent", "doc:ü")
+    path = str(tmp_path / "tuples.snap")
+    bulk.save_snapshot(src, path)
+
+    snap = bulk.load_snapshot(path, use_mmap=use_mmap)
+    assert isinstance(snap, CompactRelationshipStore)
+    assert _key(snap.iter_tuples()) == _key(src.iter_tuples())
+    for i in range(23):
+        assert _key(snap.direct_for_resource("viewer", f"doc:{i}")) == _key(
+            src.direct_for_resource("viewer", f"doc:{i}")
+        )
+    assert _key(snap.by_subject("folder:1", "parent")) == [("folder:1", "parent", "doc:ü", None)]
+
+    # the checker works directly on the mapped snapshot
+    ck = LocalRelationshipChecker(snap, rules={"doc": {"viewer": [This()]}})
+    assert ck.check("user:1", "viewer", "doc:1") is True
+
+    # writes after loading copy the columns and keep the old rows
+    snap.add("user:new", "viewer", "doc:1")
+    assert "user:new" in {t.subject for t in snap.direct_for_resource("viewer", "doc:1")}
+    assert len(snap) == len(list(src.iter_tuples())) + 1
+
+
+def test_snapshot_into_existing_store_and_bad_file(tmp_path):
+    st = CompactRelationshipStore()
+    st.add("user:1", "member", "group:a")
+    path = str(tmp_path / "g.snap")
+    bulk.save_snapshot(st, path)
+
+    target = SQLiteRelationshipStore()
+    assert bulk.load_snapshot(path, into=target) is target
+    assert [t.subject for t in target.direct_for_resource("member", "group:a")] == ["user:1"]
+    assert _key(target.iter_tuples(page_size=1)) == [("user:1", "member", "group:a", None)]
+
+    bad = tmp_path / "bad.snap"
+    bad.write_bytes(b"not a snapshot at all, sorry")
+    with pytest.raises(ValueError):
+        bulk.load_snapshot(str(bad))
@@ -0,0 +1,253 @@
+import asyncio
+import importlib.util
+from types import SimpleNamespace
+
+import pytest
+
+from rbacx.adapters._common import consistency_token_from
+from rbacx.adapters.asgi import RbacxMiddleware
+from rbacx.core.cache import DefaultInMemoryCache
+from rbacx.core.engine import Guard
+from rbacx.core.model import Action, Resource, Subject
+from rbacx.core.relctx import CONSISTENCY_TOKEN, consistency_token, report_failure
+from rbacx.rebac.caching import CachingRelationshipChecker
+
+
+class Counting:
+    def __init__(self, allowed=True):
+        self.allowed = allowed
+        self.calls = []
+
+    def check(self, subject, relation, resource, *, context=None):
+        self.calls.append((subject, CONSISTENCY_TOKEN.get()))
+        return self.allowed
+
+    def batch_check(self, triples, *, context=None):
+        self.calls.extend((s, CONSISTENCY_TOKEN.get()) for s, _, _ in triples)
+        return [self.allowed] * len(triples)
+
+
+def test_consistency_token_context_manager():
+    assert CONSISTENCY_TOKEN.get() is None
+    with consistency_token("zt1"):
+        assert CONSISTENCY_TOKEN.get() == "zt1"
+        with consistency_token(""):
+            assert CONSISTENCY_TOKEN.get() is None
+    assert CONSISTENCY_TOKEN.get() is None
+
+
+def test_cache_serves_tokenless_reads_and_refreshes_for_new_tokens():
+    inner = Counting()
+    c = CachingRelationshipChecker(inner)
+    assert c.check("user:1", "viewer", "doc:1") is True
+    assert c.check("user:1", "viewer", "doc:1") is True
+    assert inner.calls == [("user:1", None)]
+
+    # the writer's token forces one fresh check, which then serves everyone
+    inner.allowed = False
+    with consistency_token("zt-after-write"):
+        assert c.check("user:1", "viewer", "doc:1") is False
+        assert c.check("user:1", "viewer", "doc:1") is False
+    assert c.check("user:1", "viewer", "doc:1") is False
+    assert inner.calls == [("user:1", None), ("user:1", "zt-after-write")]
+
+    # a different token is not trusted to be as fresh
+    with consistency_token("zt-other"):
+        c.check("user:1", "viewer", "doc:1")
+    assert len(inner.calls) == 3
+
+    # contexts are separate entries; invalidate drops one
+    c.check("user:1", "viewer", "doc:1", context={"ip": "10.0.0.1"})
+    assert len(inner.calls) == 4
+    c.invalidate("user:1", "viewer", "doc:1")
+    c.check("user:1", "viewer", "doc:1")
+    assert len(inner.calls) == 5
+
+
+def test_cache_batch_check_fetches_only_misses_and_async_inner():
+    inner = Counting()
+    c = CachingRelationshipChecker(inner, cache=DefaultInMemoryCache(16), ttl=None)
+    c.check("user:1", "r", "o:1")
+    assert c.batch_check([("user:1", "r", "o:1"), ("user:2", "r", "o:1")]) == [True, True]
+    assert [s for s, _ in inner.calls] == ["user:1", "user:2"]
+    assert c.batch_check([("user:2", "r", "o:1")]) == [True]
+    assert len(inner.calls) == 2
+
+    class AsyncInner(Counting):
+        def check(self, subject, relation, resource, *, context=None):
+            self.calls.append(subject)
+
+            async def _run():
+                return True
+
+            return _run()
+
+        def batch_check(self, triples, *, context=None):
+            async def _run():
+                return [True] * len(triples)
+
+            return _run()
+
+    ai = AsyncInner()
+    c = CachingRelationshipChecker(ai, async_mode=True)
+
+    async def main():
+        assert await c.check("u:1", "r", "o:1") is True
+        assert await c.batch_check([("u:2", "r", "o:1")]) == [True]
+        # hits stay awaitable, like the answers of the checker they stand in for
+        assert await c.check("u:1", "r", "o:1") is True
+        both = [("u:1", "r", "o:1"), ("u:2", "r", "o:1")]
+        assert await c.batch_check(both) == [True, True]
+
+    asyncio.run(main())
+    assert ai.calls == ["u:1"]
+
+
+def test_cache_async_mode_is_inferred_from_the_inner_checker():
+    class CoroInner(Counting):
+        async def check(self, subject, relation, resource, *, context=None):
+            self.calls.append(subject)
+            return True
+
+    class Wrapper:
+        def __init__(self, inner):
+            self.inner = inner
+
+    assert CachingRelationshipChecker(CoroInner()).async_mode is True
+    assert CachingRelationshipChecker(Wrapper(CoroInner())).async_mode is True
+    assert CachingRelationshipChecker(Counting()).async_mode is False
+    assert CachingRelationshipChecker(CoroInner(), async_mode=False).async_mode is False
+
+
+def test_cache_does_not_keep_fail_closed_answers():
+    class Flaky(Counting):
+        def __init__(self):
+            super().__init__(allowed=False)
+            self.failing = True
+
+        def check(self, subject, relation, resource, *, context=None):
+            self.calls.append(subject)
+            if self.failing:
+                report_failure(RuntimeError("unavailable"))
+            return self.allowed
+
+        def batch_check(self, triples, *, context=None):
+            self.calls.extend(s for s, _, _ in triples)
+            if self.failing:
+                report_failure()
+            return [self.allowed] * len(triples)
+
+    inner = Flaky()
+    c = CachingRelationshipChecker(inner)
+    assert c.check("u:1", "r", "o:1") is False
+    assert c.batch_check([("u:2", "r", "o:1")]) == [False]
+    # the outage ends: the real answer is fetched rather than the remembered denial
+    inner.failing, inner.allowed = False, True
+    assert c.check("u:1", "r", "o:1") is True
+    assert c.batch_check([("u:2", "r", "o:1")]) == [True]
+    assert c.check("u:1", "r", "o:1") is True
+    assert inner.calls == ["u:1", "u:2", "u:1", "u:2"]
+
+    # failures reported while an async answer is awaited count as well
+    class AsyncFlaky(Flaky):
+        async def check(self, subject, relation, resource, *, context=None):
+            return Flaky.check(self, subject, relation, resource, context=context)
+
+    ai = AsyncFlaky()
+    ac = CachingRelationshipChecker(ai)
+
+    async def main():
+        assert await ac.check("u:1", "r", "o:1") is False
+        ai.failing = False
+        assert await ac.check("u:1", "r", "o:1") is False
+        assert await ac.check("u:1", "r", "o:1") is False
+
+    asyncio.run(main())
+    assert ai.calls == ["u:1", "u:1"]
+
+
+POLICY = {
+    "algorithm": "deny-overrides",
+    "rules": [
+        {
+            "id": "r",
+            "effect": "permit",
+            "actions": ["read"],
+            "resource": {"type": "doc"},
+            "condition": {"rel": "viewer"},
+        }
+    ],
+}
+
+
+def test_guard_decision_cache_is_keyed_by_token():
+    inner = Counting()
+    g = Guard(POLICY, relationship_checker=inner, cache=DefaultInMemoryCache())
+    args = (Subject(id="1"), Action("read"), Resource(type="doc", id="1"))
+    assert g.evaluate_sync(*args).allowed
+    assert g.evaluate_sync(*args).allowed
+    with consistency_token("zt9"):
+        assert g.evaluate_sync(*args).allowed
+        assert g.evaluate_sync(*args).allowed
+    assert inner.calls == [("user:1", None), ("user:1", "zt9")]
+
+
+def test_asgi_middleware_sets_token_for_the_request():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(CONSISTENCY_TOKEN.get())
+
+    class AllowGuard:
+        async def evaluate_async(self, *a, **k):
+            seen.append(CONSISTENCY_TOKEN.get())
+            return SimpleNamespace(allowed=True)
+
+    mw = RbacxMiddleware(
+        app,
+        guard=AllowGuard(),
+        build_env=lambda scope: (None, None, None, None),
+        consistency="X-Zed-Token",
+    )
+    scope = {"type": "http", "headers": [(b"x-zed-token", b"GgYKBDEyMzQ=")]}
+    asyncio.run(mw(scope, None, None))
+    asyncio.run(mw({"type": "http", "headers": []}, None, None))
+    assert seen == ["GgYKBDEyMzQ=", "GgYKBDEyMzQ=", None, None]
+    assert CONSISTENCY_TOKEN.get() is None
+
+
+def test_consistency_token_from_sources():
+    req = SimpleNamespace(headers={"X-Zed-Token": "a"}, session={"zt": "b"})
+    assert consistency_token_from("X-Zed-Token", req) == "a"
+    assert consistency_token_from(lambda r: r.session.get("zt"), req) == "b"
+    assert consistency_token_from("missing", req) is None
+    assert consistency_token_from(None, req) is None
+    assert consistency_token_from("x", object()) is None
+
+
+@pytest.mark.skipif(
+    any(importlib.util.find_spec(m) is None for m in ("authzed", "grpc", "google.protobuf")),
+    reason="optional SpiceDB dependencies not installed",
+)
+def test_spicedb_uses_request_token_for_at_least_as_fresh(monkeypatch):
+    import rbacx.rebac.spicedb as sp
+
+    requests = []
+
+    class Stub:
+        def __init__(self, endpoint, token, **kw):
+            pass
+
+        def CheckPermission(self, request, timeout=None):
+            requests.append(request)
+            return SimpleNamespace(permissionship=0)
+
+    monkeypatch.setattr(sp, "ZedInsecureClient", Stub)
+    checker = sp.SpiceDBChecker(sp.SpiceDBConfig(endpoint="localhost:50051", insecure=True))
+    checker.check("user:1", "view", "doc:1")
+    with consistency_token("zt-1"):
+        checker.check("user:1", "view", "doc:1")
+        checker.check("user:1", "view", "doc:1", zed_token="explicit")
+    assert not requests[0].HasField("consistency")
+    assert requests[1].consistency.at_least_as_fresh.token == "zt-1"
+    assert requests[2].consistency.at_least_as_fresh.token == "explicit"
@@ -89,3 +89,80 @@ def test_limits_max_depth_max_nodes_and_deadline():
     slow = SlowStore()
     ck2 = LocalRelationshipChecker(slow, rules=rules, deadline_ms=1)
     assert ck2.check("u:1", "rel", "x:1") is False
+
+
+def _random_graph(seed):
+    import random
+
+    rnd = random.Random(seed)
+    st = InMemoryRelationshipStore()
+    rules = {
+        "doc": {
+            "viewer": [This(), ComputedUserset("editor"), TupleToUserset("parent", "viewer")],
+            "editor": [This(), TupleToUserset("parent", "editor")],
+        },
+        "folder": {
+            "viewer": [This(), TupleToUserset("parent", "viewer")],
+            "editor": [This(), TupleToUserset("parent", "editor")],
+        },
+    }
+    folders = [f"folder:{i}" for i in range(12)]
+    docs = [f"doc:{i}" for i in range(40)]
+    for d in docs:
+        st.add(rnd.choice(folders), "parent", d)
+    for f in folders:  # folder hierarchy, cycles included
+        st.add(rnd.choice(folders), "parent", f)
+    for _ in range(25):
+        st.add(
+            f"user:{rnd.randrange(5)}", rnd.choice(["viewer", "editor"]), rnd.choice(folders + docs)
+        )
+    return st, rules, docs + folders
+
+
+def test_batch_check_shared_frontier_matches_check():
+    for seed in range(15):
+        st, rules, objs = _random_graph(seed)
+        for max_depth in (1, 3, 8):
+            ck = LocalRelationshipChecker(st, rules=rules, max_depth=max_depth)
+            triples = [
+                (f"user:{u}", r, o) for u in range(5) for r in ("viewer", "editor") for o in objs
+            ]
+            expected = [ck.check(*t) for t in triples]
+            assert ck.batch_check(triples) == expected
+
+
+def test_batch_check_expands_shared_nodes_once():
+    st = InMemoryRelationshipStore()
+    st.add("user:1", "member", "folder:root")
+    for i in range(200):
+        st.add("folder:root", "parent", f"document:{i}")
+    ck = LocalRelationshipChecker(st, rules=build_rules())
+
+    calls = []
+    orig = st.direct_for_resource
+
+    def counting(relation, resource):
+        calls.append((relation, resource))
+        return orig(relation, resource)
+
+    st.direct_for_resource = counting
+    triples = [("user:1", "viewer", f"document:{i}") for i in range(200)]
+    triples.append(("user:2", "viewer", "document:0"))
+    out = ck.batch_check(triples)
+    assert out == [True] * 200 + [False]
+    # the shared folder node is checked once for user:1, not once per document
+    assert calls.count(("member", "folder:root")) == 2
+
+
+def test_batch_check_limits_fail_closed():
+    st = InMemoryRelationshipStore()
+    rules = {"x": {"rel": [ComputedUserset("other")], "other": [ComputedUserset("rel")]}}
+    st.add("user:1", "other", "x:2")
+    triples = [("user:1", "rel", "x:1"), ("user:1", "rel", "x:2")]
+    ck = LocalRelationshipChecker(st, rules=rules, max_nodes=2)
+    assert ck.batch_check(triples) == [ck.check(*t) for t in triples] == [False, True]
+    # budget exhausted before the granting node is reached
+    ck = LocalRelationshipChecker(st, rules=rules, max_nodes=1)
+    assert ck.batch_check(triples) == [False, False]
+    ck = LocalRelationshipChecker(st, rules=rules, deadline_ms=-1)
+    assert ck.batch_check(triples) == [False, False]
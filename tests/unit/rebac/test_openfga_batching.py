@@ -0,0 +1,197 @@
+import asyncio
+import importlib
+import importlib.util
+import json
+import sys
+import time
+
+import pytest
+
+if importlib.util.find_spec("httpx") is None:
+    pytest.skip(
+        "optional dependency 'httpx' is not installed; skipping OpenFGA tests",
+        allow_module_level=True,
+    )
+
+
+@pytest.fixture
+def ofga():
+    """rbacx.rebac.openfga bound to the real httpx (other tests install stubs)."""
+    saved = sys.modules.pop("httpx", None)
+    if saved is not None and not hasattr(saved, "MockTransport"):
+        for name in [m for m in sys.modules if m.startswith("httpx.")]:
+            sys.modules.pop(name)
+    try:
+        importlib.import_module("httpx")
+        yield importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+    finally:
+        if saved is not None:
+            sys.modules["httpx"] = saved
+        importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+
+
+def _allowed(obj):
+    return int(obj.split(":")[1]) % 3 == 0
+
+
+def _server(calls, *, fail_chunk=None, shape="map"):
+    def respond(body):
+        checks = body["checks"]
+        calls.append([c["correlation_id"] for c in checks])
+        if fail_chunk is not None and len(calls) - 1 == fail_chunk:
+            return 500, {"code": "internal_error"}
+        if len(checks) > 50:
+            return 400, {"code": "validation_error"}
+        if shape == "map":
+            result = {
+                c["correlation_id"]: {"allowed": _allowed(c["tuple_key"]["object"])}
+                for c in reversed(checks)
+            }
+            return 200, {"result": result}
+        items = [
+            {"correlationId": c["correlation_id"], "allowed": _allowed(c["tuple_key"]["object"])}
+            for c in checks
+        ]
+        return 200, {"result": items}
+
+    return respond
+
+
+def test_sync_large_batch_is_chunked_to_server_limit(ofga):
+    import httpx
+
+    calls = []
+    respond = _server(calls)
+
+    def handler(request):
+        status, payload = respond(json.loads(request.content))
+        return httpx.Response(status, json=payload)
+
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s")
+    cli = ofga.OpenFGAChecker(cfg, client=httpx.Client(transport=httpx.MockTransport(handler)))
+    triples = [("user:1", "viewer", f"doc:{i}") for i in range(1000)]
+    out = cli.batch_check(triples)
+    assert out == [_allowed(o) for _, _, o in triples]
+    assert len(calls) == 20 and all(len(c) == 50 for c in calls)
+    assert calls[1][0] == "50"  # sequential correlation ids
+
+
+def test_sync_failed_chunk_only_denies_its_items(ofga):
+    import httpx
+
+    calls = []
+    respond = _server(calls, fail_chunk=1, shape="list")
+
+    def handler(request):
+        status, payload = respond(json.loads(request.content))
+        return httpx.Response(status, json=payload)
+
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s", max_checks_per_batch=10)
+    cli = ofga.OpenFGAChecker(cfg, client=httpx.Client(transport=httpx.MockTransport(handler)))
+    triples = [("user:1", "viewer", f"doc:{i}") for i in range(25)]
+    out = cli.batch_check(triples)
+    expected = [_allowed(o) for _, _, o in triples]
+    assert out[:10] == expected[:10]
+    assert out[10:20] == [False] * 10
+    assert out[20:] == expected[20:]
+
+
+@pytest.mark.asyncio
+async def test_async_chunks_run_concurrently_with_a_bound(ofga):
+    import httpx
+
+    calls = []
+    respond = _server(calls, fail_chunk=3)
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        status, payload = respond(json.loads(request.content))
+        return httpx.Response(status, json=payload)
+
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s", max_parallel_batches=3)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        cli = ofga.OpenFGAChecker(cfg, async_client=client)
+        triples = [("user:1", "viewer", f"doc:{i}") for i in range(480)]
+        out = await cli.batch_check(triples)
+
+    assert len(calls) == 10
+    assert peak == 3
+    expected = [_allowed(o) for _, _, o in triples]
+    # the chunk that failed is denied; the others keep their answers
+    failed = {int(cid) for cid in calls[3]}
+    assert [ok for i, ok in enumerate(out) if i in failed] == [False] * len(failed)
+    assert [ok for i, ok in enumerate(out) if i not in failed] == [
+        e for i, e in enumerate(expected) if i not in failed
+    ]
+
+
+def _slow_handler(httpx, calls, timeouts):
+    respond = _server(calls)
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        time.sleep(0.1)
+        status, payload = respond(json.loads(request.content))
+        return httpx.Response(status, json=payload)
+
+    return handler
+
+
+def test_sync_chunks_share_the_decision_deadline(ofga):
+    import httpx
+
+    from rbacx.core.relctx import REL_DEADLINE
+
+    calls, timeouts = [], []
+    handler = _slow_handler(httpx, calls, timeouts)
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s", max_checks_per_batch=10)
+    cli = ofga.OpenFGAChecker(cfg, client=httpx.Client(transport=httpx.MockTransport(handler)))
+    triples = [("user:1", "viewer", f"doc:{i}") for i in range(50)]
+    token = REL_DEADLINE.set(time.monotonic() + 0.25)
+    try:
+        start = time.monotonic()
+        out = cli.batch_check(triples)
+        elapsed = time.monotonic() - start
+    finally:
+        REL_DEADLINE.reset(token)
+    assert len(calls) == 3 and elapsed < 0.4
+    assert timeouts == sorted(timeouts, reverse=True) and timeouts[0] <= 0.25
+    expected = [_allowed(o) for _, _, o in triples]
+    assert out[:30] == expected[:30] and out[30:] == [False] * 20
+
+
+@pytest.mark.asyncio
+async def test_async_chunks_queued_past_the_deadline_are_denied(ofga):
+    import httpx
+
+    from rbacx.core.relctx import REL_DEADLINE
+
+    calls, timeouts = [], []
+    respond = _server(calls)
+
+    async def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        await asyncio.sleep(0.1)
+        status, payload = respond(json.loads(request.content))
+        return httpx.Response(status, json=payload)
+
+    cfg = ofga.OpenFGAConfig(
+        api_url="http://fga", store_id="s", max_checks_per_batch=10, max_parallel_batches=1
+    )
+    triples = [("user:1", "viewer", f"doc:{i}") for i in range(50)]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        cli = ofga.OpenFGAChecker(cfg, async_client=client)
+        token = REL_DEADLINE.set(time.monotonic() + 0.25)
+        try:
+            out = await cli.batch_check(triples)
+        finally:
+            REL_DEADLINE.reset(token)
+    assert len(calls) == 3
+    assert timeouts == sorted(timeouts, reverse=True) and timeouts[0] <= 0.25
+    assert out[30:] == [False] * 20
@@ -6,6 +6,8 @@ from contextlib import contextmanager
 
 import pytest
 
+from rbacx.core.relctx import track_failures
+
 if importlib.util.find_spec("httpx") is None:
     pytest.skip(
         "optional dependency 'httpx' is not installed; skipping OpenFGA tests",
@@ -47,7 +49,7 @@ def make_httpx(
         )
 
     class Client:
-        def __init__(self, timeout=None):
+        def __init__(self, timeout=None, **kwargs):
             self.timeout = timeout
             self._last = None
 
@@ -56,7 +58,7 @@ def make_httpx(
             return _post(url, json=json, headers=headers, timeout=timeout)
 
     class AsyncClient:
-        def __init__(self, timeout=None):
+        def __init__(self, timeout=None, **kwargs):
             self.timeout = timeout
             self._last = None
 
@@ -68,6 +70,7 @@ def make_httpx(
     mod.Client = Client
     mod.AsyncClient = AsyncClient
     mod.HTTPError = HTTPError
+    mod.Limits = lambda **kw: kw
     return mod
 
 
@@ -138,8 +141,10 @@ async def test_async_check_http_error_logs_and_returns_false(caplog):
         cfg = ofga.OpenFGAConfig(api_url="http://api", store_id="s")
         cli = ofga.OpenFGAChecker(cfg, async_client=ofga.httpx.AsyncClient())  # type: ignore[attr-defined]
         caplog.set_level("WARNING")
-        out = await cli.check("u", "r", "o")
+        with track_failures() as failures:
+            out = await cli.check("u", "r", "o")
         assert out is False
+        assert len(failures) == 1  # a fail-closed default, not a denial
         assert any("OpenFGA async check HTTP error" in r.message for r in caplog.records)
 
 
@@ -157,8 +162,10 @@ def test_sync_check_http_error_logs_and_returns_false(caplog):
         cfg = ofga.OpenFGAConfig(api_url="http://api", store_id="s")
         cli = ofga.OpenFGAChecker(cfg, client=ofga.httpx.Client())  # type: ignore[attr-defined]
         caplog.set_level("WARNING")
-        out = cli.check("u", "r", "o")
+        with track_failures() as failures:
+            out = cli.check("u", "r", "o")
         assert out is False
+        assert len(failures) == 1
         assert any("OpenFGA check HTTP error" in r.message for r in caplog.records)
 
 
@@ -186,14 +193,10 @@ async def test_async_batch_guard_raises_if_client_missing():
 
 
 @pytest.mark.asyncio
-async def test_async_batch_results_map_shape_is_respected(monkeypatch):
-    import uuid as _uuid
-
-    seq = ["c1", "c2"]
-    it = iter(seq)
-    monkeypatch.setattr(_uuid, "uuid4", lambda: next(it))
+async def test_async_batch_results_map_shape_is_respected():
+    # correlation ids are the input positions
     with stub_httpx(
-        make_httpx(async_payload={"results": {"c1": {"allowed": True}, "c2": {"allowed": False}}})
+        make_httpx(async_payload={"results": {"0": {"allowed": True}, "1": {"allowed": False}}})
     ) as ofga:
         cfg = ofga.OpenFGAConfig(api_url="http://api", store_id="s")
         cli = ofga.OpenFGAChecker(cfg, async_client=ofga.httpx.AsyncClient())  # type: ignore[attr-defined]
@@ -219,16 +222,11 @@ def test_sync_batch_guard_raises_if_client_missing():
             cli.batch_check([("u", "r", "o")])
 
 
-def test_sync_batch_result_list_shape(monkeypatch):
-    import uuid as _uuid
-
-    seq = ["c1", "c2", "c3"]
-    it = iter(seq)
-    monkeypatch.setattr(_uuid, "uuid4", lambda: next(it))
+def test_sync_batch_result_list_shape():
     items = [
-        {"correlationId": "c1", "allowed": True},
-        {"correlationId": "c2", "allowed": False},
-        {"correlationId": "c3", "allowed": True},
+        {"correlationId": "0", "allowed": True},
+        {"correlationId": "1", "allowed": False},
+        {"correlationId": "2", "allowed": True},
     ]
     with stub_httpx(make_httpx(payload={"result": items})) as ofga:
         cfg = ofga.OpenFGAConfig(api_url="http://api", store_id="s")
@@ -0,0 +1,182 @@
+import importlib
+import importlib.util
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+if importlib.util.find_spec("httpx") is None:
+    pytest.skip(
+        "optional dependency 'httpx' is not installed; skipping OpenFGA tests",
+        allow_module_level=True,
+    )
+
+# user:alice can view even-numbered documents
+VISIBLE = {"user:alice": [f"document:{i}" for i in range(0, 200, 2)]}
+
+
+class _FGA(BaseHTTPRequestHandler):
+    """Tiny stand-in for the OpenFGA list-objects endpoints."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # keep test output quiet
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        self.server.requests.append((self.path, body))
+        if body.get("user") == "user:broken":
+            self.send_response(500)
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+        objects = [o for o in VISIBLE.get(body["user"], []) if o.startswith(body["type"] + ":")]
+        if self.path.endswith("/list-objects"):
+            data = json.dumps({"objects": objects}).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        # streamed-list-objects: NDJSON, chunked
+        self.send_response(200)
+        self.send_header("content-type", "application/x-ndjson")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+        lines = [{"result": {"object": o}} for o in objects]
+        if body.get("user") == "user:erroring":
+            lines = [{"result": {"object": "document:0"}}, {"error": {"code": 2}}]
+        stalled = body.get("user") == "user:stalled"
+        if stalled:
+            lines = [{"result": {"object": "document:0"}}, {"result": {"object": "document:2"}}]
+        try:
+            for line in lines:
+                raw = (json.dumps(line) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(raw), raw))
+                self.wfile.flush()
+                if stalled:
+                    time.sleep(1.0)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading early
+
+
+@pytest.fixture(scope="module")
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _FGA)
+    srv.requests = []
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def ofga():
+    """rbacx.rebac.openfga bound to the real httpx (other tests install stubs)."""
+    saved = sys.modules.pop("httpx", None)
+    if saved is not None and not hasattr(saved, "MockTransport"):
+        for name in [m for m in sys.modules if m.startswith("httpx.")]:
+            sys.modules.pop(name)
+    try:
+        importlib.import_module("httpx")
+        yield importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+    finally:
+        if saved is not None:
+            sys.modules["httpx"] = saved
+        importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+
+
+def _cfg(ofga, server):
+    host, port = server.server_address
+    return ofga.OpenFGAConfig(
+        api_url=f"http://{host}:{port}", store_id="s1", authorization_model_id="m1"
+    )
+
+
+def test_sync_list_and_stream(ofga, server):
+    import httpx
+
+    cli = ofga.OpenFGAChecker(_cfg(ofga, server), client=httpx.Client())
+    objs = cli.list_objects("user:alice", "viewer", "document", context={"ip": "10.0.0.1"})
+    assert objs == VISIBLE["user:alice"]
+    path, body = server.requests[-1]
+    assert path == "/stores/s1/list-objects"
+    assert body == {
+        "type": "document",
+        "relation": "viewer",
+        "user": "user:alice",
+        "authorization_model_id": "m1",
+        "context": {"ip": "10.0.0.1"},
+    }
+    assert list(cli.streamed_list_objects("user:alice", "viewer", "document")) == objs
+    assert server.requests[-1][0] == "/stores/s1/streamed-list-objects"
+
+    assert cli.list_objects("user:broken", "viewer", "document") == []
+    assert list(cli.streamed_list_objects("user:broken", "viewer", "document")) == []
+    # an error line ends the stream
+    assert list(cli.streamed_list_objects("user:erroring", "viewer", "document")) == ["document:0"]
+
+
+def test_stalled_stream_times_out(ofga, server):
+    import dataclasses
+
+    import httpx
+
+    cfg = dataclasses.replace(_cfg(ofga, server), timeout_seconds=0.2)
+    cli = ofga.OpenFGAChecker(cfg, client=httpx.Client())
+    start = time.monotonic()
+    assert list(cli.streamed_list_objects("user:stalled", "viewer", "document")) == ["document:0"]
+    assert time.monotonic() - start < 0.9
+
+
+def test_sync_filter_objects_keeps_order_and_accepts_bare_ids(ofga, server):
+    import httpx
+
+    cli = ofga.OpenFGAChecker(_cfg(ofga, server), client=httpx.Client())
+    page = ["document:7", "document:4", "document:2", "document:999"]
+    assert cli.filter_objects("user:alice", "viewer", page) == ["document:4", "document:2"]
+    assert cli.filter_objects("user:alice", "viewer", ["3", "8"], object_type="document") == ["8"]
+    assert cli.filter_objects("user:alice", "viewer", []) == []
+    # all candidates found -> stream closed early
+    assert cli.filter_objects("user:alice", "viewer", ["document:0"]) == ["document:0"]
+    with pytest.raises(ValueError):
+        cli.filter_objects("user:alice", "viewer", ["document:1", "folder:1"])
+
+
+@pytest.mark.asyncio
+async def test_async_list_stream_and_filter(ofga, server):
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        cli = ofga.OpenFGAChecker(_cfg(ofga, server), async_client=client)
+        objs = await cli.list_objects("user:alice", "viewer", "document")
+        assert objs == VISIBLE["user:alice"]
+        streamed = [o async for o in cli.streamed_list_objects("user:alice", "viewer", "document")]
+        assert streamed == objs
+        got = await cli.filter_objects("user:alice", "viewer", ["document:10", "document:11"])
+        assert got == ["document:10"]
+        assert await cli.filter_objects("user:alice", "viewer", ["document:0"]) == ["document:0"]
+        assert await cli.filter_objects("user:alice", "viewer", []) == []
+        assert await cli.list_objects("user:broken", "viewer", "document") == []
+        broken = cli.streamed_list_objects("user:broken", "viewer", "document")
+        assert [o async for o in broken] == []
+        erroring = cli.streamed_list_objects("user:erroring", "viewer", "document")
+        assert [o async for o in erroring] == ["document:0"]
+
+
+def test_missing_clients_raise(ofga, server):
+    import httpx
+
+    cli = ofga.OpenFGAChecker(_cfg(ofga, server), client=httpx.Client())
+    cli._client = None
+    with pytest.raises(RuntimeError):
+        cli.list_objects("user:alice", "viewer", "document")
+    with pytest.raises(RuntimeError):
+        cli.streamed_list_objects("user:alice", "viewer", "document")
@@ -0,0 +1,226 @@
+import asyncio
+import importlib
+import importlib.util
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from rbacx.rebac.pool import POOL_UTILIZATION_METRIC, PoolTracker
+
+needs_httpx = pytest.mark.skipif(
+    importlib.util.find_spec("httpx") is None, reason="optional dependency 'httpx' not installed"
+)
+needs_authzed = pytest.mark.skipif(
+    any(importlib.util.find_spec(m) is None for m in ("authzed", "grpc", "google.protobuf")),
+    reason="optional SpiceDB dependencies not installed",
+)
+
+
+class Sink:
+    def __init__(self):
+        self.observed = []
+
+    def inc(self, name, labels=None):  # pragma: no cover - unused
+        pass
+
+    def observe(self, name, value, labels=None):
+        self.observed.append((name, value, labels))
+
+
+# ------------------------------ PoolTracker ------------------------------
+
+
+def test_tracker_counts_in_flight_and_peak():
+    sink = Sink()
+    t = PoolTracker("x", 4, sink)
+    with t:
+        with t:
+            assert t.stats()["in_flight"] == 2
+    s = t.stats()
+    assert (s["in_flight"], s["peak"], s["total"], s["capacity"]) == (0, 2, 2, 4)
+    assert s["utilization"] == 0.0
+    assert sink.observed == [
+        (POOL_UTILIZATION_METRIC, 0.25, {"provider": "x"}),
+        (POOL_UTILIZATION_METRIC, 0.5, {"provider": "x"}),
+    ]
+
+
+def test_tracker_is_thread_safe_and_clamps_utilization():
+    sink = Sink()
+    t = PoolTracker("x", 2, sink)
+    gate = threading.Barrier(8)
+
+    def work():
+        with t:
+            gate.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert t.stats()["peak"] == 8 and t.stats()["total"] == 8
+    assert max(v for _, v, _ in sink.observed) == 1.0
+
+
+def test_tracker_without_capacity_or_metrics_and_async_sink():
+    t = PoolTracker("x", None, Sink())
+    with t:
+        pass
+    assert t.stats()["utilization"] is None
+
+    seen = []
+
+    class AsyncSink:
+        async def observe(self, name, value, labels=None):
+            seen.append(value)
+
+    t = PoolTracker("x", 1, AsyncSink())
+    with t:  # no running loop: the coroutine is closed, not leaked
+        pass
+
+    async def main():
+        with t:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert seen == [1.0]
+
+
+# ------------------------------ OpenFGA ------------------------------
+
+
+@pytest.fixture
+def ofga():
+    """rbacx.rebac.openfga bound to the real httpx (other tests install stubs)."""
+    saved = sys.modules.pop("httpx", None)
+    if saved is not None and not hasattr(saved, "MockTransport"):
+        for name in [m for m in sys.modules if m.startswith("httpx.")]:
+            sys.modules.pop(name)
+    try:
+        importlib.import_module("httpx")
+        yield importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+    finally:
+        if saved is not None:
+            sys.modules["httpx"] = saved
+        importlib.reload(importlib.import_module("rbacx.rebac.openfga"))
+
+
+@needs_httpx
+def test_openfga_default_client_uses_pool_settings(ofga, monkeypatch):
+    created = []
+
+    class Recording(ofga.httpx.Client):
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(ofga.httpx, "Client", Recording)
+    cfg = ofga.OpenFGAConfig(
+        api_url="http://fga",
+        store_id="s",
+        max_connections=7,
+        max_keepalive_connections=3,
+        keepalive_expiry=30.0,
+    )
+    ofga.OpenFGAChecker(cfg)
+    limits = created[0]["limits"]
+    assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+    assert limits.keepalive_expiry == 30.0
+    assert created[0]["http2"] is False
+
+
+@needs_httpx
+def test_openfga_async_mode_and_request_tracking(ofga):
+    httpx = ofga.httpx
+    sink = Sink()
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s", max_connections=10)
+    checker = ofga.OpenFGAChecker(cfg, async_mode=True, metrics=sink)
+    assert checker._client is None and isinstance(checker._aclient, httpx.AsyncClient)
+
+    transport = httpx.MockTransport(lambda req: httpx.Response(200, json={"allowed": True}))
+    checker._aclient = httpx.AsyncClient(transport=transport)
+    assert asyncio.run(checker.check("user:1", "viewer", "doc:1")) is True
+    stats = checker.pool_stats()
+    assert (stats["total"], stats["in_flight"], stats["capacity"]) == (1, 0, 10)
+    assert sink.observed == [(POOL_UTILIZATION_METRIC, 0.1, {"provider": "openfga"})]
+
+
+@needs_httpx
+@pytest.mark.skipif(importlib.util.find_spec("h2") is not None, reason="h2 is installed")
+def test_openfga_http2_without_h2_is_a_clear_error(ofga):
+    cfg = ofga.OpenFGAConfig(api_url="http://fga", store_id="s", http2=True)
+    with pytest.raises(RuntimeError, match="httpx\\[http2\\]"):
+        ofga.OpenFGAChecker(cfg)
+
+
+# ------------------------------ SpiceDB ------------------------------
+
+
+@needs_authzed
+def test_spicedb_channels_options_and_round_robin(monkeypatch):
+    import rbacx.rebac.spicedb as sp
+
+    made = []
+
+    class Stub:
+        def __init__(self, endpoint, token, options=None):
+            self.options, self.calls = options, 0
+            made.append(self)
+
+        def CheckPermission(self, request, timeout=None):
+            self.calls += 1
+            return SimpleNamespace(permissionship=0)
+
+    monkeypatch.setattr(sp, "ZedInsecureClient", Stub)
+    sink = Sink()
+    cfg = sp.SpiceDBConfig(
+        endpoint="localhost:50051",
+        insecure=True,
+        grpc_channels=3,
+        max_concurrent_streams=10,
+        keepalive_time_ms=20_000,
+        keepalive_timeout_ms=5_000,
+        keepalive_permit_without_calls=True,
+        grpc_options=(("grpc.max_receive_message_length", 1 << 22),),
+    )
+    checker = sp.SpiceDBChecker(cfg, metrics=sink)
+    assert len(made) == 3
+    assert dict(made[0].options) == {
+        "grpc.keepalive_time_ms": 20_000,
+        "grpc.keepalive_timeout_ms": 5_000,
+        "grpc.keepalive_permit_without_calls": 1,
+        "grpc.use_local_subchannel_pool": 1,
+        "grpc.max_receive_message_length": 1 << 22,
+    }
+    for i in range(6):
+        checker.check(f"user:{i}", "view", "doc:1")
+    assert [c.calls for c in made] == [2, 2, 2]
+    stats = checker.pool_stats()
+    assert (stats["channels"], stats["capacity"], stats["total"]) == (3, 30, 6)
+    assert sink.observed[0] == (POOL_UTILIZATION_METRIC, 1 / 30, {"provider": "spicedb"})
+
+
+@needs_authzed
+def test_spicedb_default_config_passes_no_options_and_real_client_accepts_them(monkeypatch):
+    import rbacx.rebac.spicedb as sp
+
+    seen = []
+
+    def stub(*args, **kwargs):
+        seen.append(kwargs)
+        return SimpleNamespace()
+
+    monkeypatch.setattr(sp, "ZedInsecureClient", stub)
+    sp.SpiceDBChecker(sp.SpiceDBConfig(endpoint="localhost:50051", insecure=True))
+    assert seen == [{}]
+    monkeypatch.undo()
+
+    cfg = sp.SpiceDBConfig(
+        endpoint="localhost:50051", insecure=True, grpc_channels=2, keepalive_time_ms=30_000
+    )
+    checker = sp.SpiceDBChecker(cfg)  # channels connect lazily
+    assert len(checker._clients) == 2 and checker._client is checker._clients[0]
@@ -0,0 +1,247 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rbacx.core.engine import Guard
+from rbacx.core.model import Action, Resource, Subject
+from rbacx.core.relctx import REL_DEADLINE, bounded_timeout, track_failures
+from rbacx.rebac.resilience import (
+    BREAKER_STATE_METRIC,
+    EVENTS_METRIC,
+    CircuitBreaker,
+    ResilientRelationshipChecker,
+)
+
+
+class Slow:
+    """check() sleeps ``delays[i]`` seconds on the i-th call (last value repeats)."""
+
+    def __init__(self, delays=(0.0,), result=True):
+        self.delays = list(delays)
+        self.result = result
+        self.calls = 0
+        self.timeouts = []
+        self.lock = threading.Lock()
+
+    def check(self, subject, relation, resource, *, context=None):
+        with self.lock:
+            i = self.calls
+            self.calls += 1
+        self.timeouts.append(bounded_timeout(10.0))
+        time.sleep(self.delays[min(i, len(self.delays) - 1)])
+        return self.result
+
+    def batch_check(self, triples, *, context=None):
+        return [self.result] * len(triples)
+
+
+class Sink:
+    def __init__(self):
+        self.events = []
+        self.observed = []
+
+    def inc(self, name, labels=None):
+        self.events.append((name, labels["event"]))
+
+    def observe(self, name, value, labels=None):
+        self.observed.append((name, value))
+
+
+def test_breaker_opens_probes_and_closes():
+    states = []
+    b = CircuitBreaker(2, recovery_timeout=0.05, on_change=states.append)
+    b.record_failure()
+    assert b.allow()
+    b.record_failure()
+    assert b.state == "open" and not b.allow()
+    time.sleep(0.06)
+    assert b.allow()  # trial call
+    assert not b.allow()  # only one at a time
+    b.record_failure()
+    assert b.state == "open"
+    time.sleep(0.06)
+    assert b.allow()
+    b.record_success()
+    assert b.state == "closed"
+    assert states == ["open", "half_open", "open", "half_open", "closed"]
+    with pytest.raises(ValueError):
+        CircuitBreaker(0)
+
+
+def test_hedge_after_quantile_delay_wins():
+    # 20 fast calls to learn the latency, then a primary that hangs
+    inner = Slow(delays=[0.0] * 20 + [1.0, 0.0])
+    sink = Sink()
+    r = ResilientRelationshipChecker(inner, hedge_min_samples=20, metrics=sink)
+    for _ in range(20):
+        assert r.check("user:1", "viewer", "doc:1") is True
+    assert r.stats()["hedge_delay"] == pytest.approx(0.001, abs=0.01)
+    t0 = time.monotonic()
+    assert r.check("user:1", "viewer", "doc:1") is True
+    assert time.monotonic() - t0 < 0.5
+    assert inner.calls == 22
+    assert [e for _, e in sink.events] == ["hedge", "hedge_won"]
+    assert r.stats()["hedge_won"] == 1
+    r.close()
+
+
+def test_no_hedging_before_enough_samples_or_when_disabled():
+    inner = Slow(delays=[0.05])
+    r = ResilientRelationshipChecker(inner, hedge_min_samples=5)
+    assert r.check("u:1", "r", "o:1") is True and inner.calls == 1
+    r = ResilientRelationshipChecker(inner, hedge_quantile=None)
+    assert r.stats()["hedge_delay"] is None
+    r.close()
+
+
+def test_timeouts_trip_the_breaker_and_fail_closed_fast():
+    inner = Slow(delays=[0.3])
+    sink = Sink()
+    r = ResilientRelationshipChecker(
+        inner, timeout=0.02, failure_threshold=2, recovery_timeout=60, metrics=sink
+    )
+    assert r.check("u:1", "r", "o:1") is False
+    assert r.check("u:1", "r", "o:1") is False
+    assert r.breaker.state == "open"
+    calls = inner.calls
+    t0 = time.monotonic()
+    assert r.check("u:1", "r", "o:1") is False
+    assert r.batch_check([("u:1", "r", "o:1")]) == [False]
+    assert time.monotonic() - t0 < 0.01 and inner.calls == calls
+    assert [e for _, e in sink.events] == ["timeout", "timeout", "rejected", "rejected"]
+    assert (BREAKER_STATE_METRIC, 2.0) in sink.observed
+    assert all(name == EVENTS_METRIC for name, _ in sink.events)
+    r.close()
+
+
+def test_errors_count_as_failures():
+    class Boom(Slow):
+        def check(self, *a, **k):
+            raise RuntimeError("down")
+
+    r = ResilientRelationshipChecker(Boom(), failure_threshold=1)
+    with track_failures() as failures:
+        assert r.check("u:1", "r", "o:1") is False
+    assert r.stats()["error"] == 1 and r.breaker.state == "open"
+    with track_failures() as rejected:
+        assert r.check("u:1", "r", "o:1") is False  # short-circuited by the breaker
+    assert len(failures) == 1 and isinstance(failures[0], RuntimeError)
+    assert len(rejected) == 1
+    r.close()
+
+
+def test_decision_deadline_is_propagated():
+    inner = Slow()
+    r = ResilientRelationshipChecker(inner, timeout=5.0)
+    token = REL_DEADLINE.set(time.monotonic() + 0.5)
+    try:
+        assert r.check("u:1", "r", "o:1") is True
+    finally:
+        REL_DEADLINE.reset(token)
+    # the inner call ran in a worker thread but saw the caller's deadline
+    assert 0 < inner.timeouts[0] <= 0.5
+
+    token = REL_DEADLINE.set(time.monotonic() - 1)
+    try:
+        assert r.check("u:1", "r", "o:1") is False
+    finally:
+        REL_DEADLINE.reset(token)
+    assert inner.calls == 1 and r.stats()["timeout"] == 1
+    r.close()
+
+
+def test_async_inner_on_running_loop_hedges():
+    calls = []
+
+    class AsyncSlow:
+        def check(self, subject, relation, resource, *, context=None):
+            calls.append(subject)
+
+            async def _run():
+                await asyncio.sleep(1.0 if len(calls) == 3 else 0.0)
+                return True
+
+            return _run()
+
+    r = ResilientRelationshipChecker(AsyncSlow(), hedge_min_samples=2)
+
+    async def main():
+        for _ in range(2):
+            assert await r.check("u:1", "r", "o:1") is True
+        t0 = time.monotonic()
+        assert await r.check("u:1", "r", "o:1") is True
+        return time.monotonic() - t0
+
+    assert asyncio.run(main()) < 0.5
+    assert len(calls) == 4 and r.stats()["hedge_won"] == 1
+
+
+def test_guard_decision_timeout_bounds_rebac_calls():
+    policy = {
+        "algorithm": "deny-overrides",
+        "rules": [
+            {
+                "id": "r",
+                "effect": "permit",
+                "actions": ["read"],
+                "resource": {"type": "doc"},
+                "condition": {"rel": "viewer"},
+            }
+        ],
+    }
+
+    class AsyncHang:
+        def check(self, subject, relation, resource, *, context=None):
+            return asyncio.sleep(2.0, result=True)
+
+    g = Guard(policy, relationship_checker=AsyncHang(), decision_timeout=0.1)
+    t0 = time.monotonic()
+    d = g.evaluate_sync(Subject(id="1"), Action("read"), Resource(type="doc", id="1"))
+    assert d.allowed is False
+    assert time.monotonic() - t0 < 1.0
+
+    inner = Slow(delays=[2.0])
+    g = Guard(
+        policy,
+        relationship_checker=ResilientRelationshipChecker(inner),
+        decision_timeout=0.1,
+    )
+    t0 = time.monotonic()
+    d = g.evaluate_sync(Subject(id="1"), Action("read"), Resource(type="doc", id="1"))
+    assert d.allowed is False
+    assert time.monotonic() - t0 < 1.0
+    assert 0 < inner.timeouts[0] <= 0.1
+
+
+def test_explicit_zero_hedge_quantile_is_kept():
+    r = ResilientRelationshipChecker(Slow(), hedge_quantile=0.0)
+    assert r._latency._q == 0.0
+    r.close()
+
+
+def test_async_trial_slot_is_claimed_only_by_a_running_call():
+    class Hanging:
+        async def check(self, subject, relation, resource, *, context=None):
+            await asyncio.sleep(10)
+
+        def batch_check(self, triples, *, context=None):  # pragma: no cover - unused
+            return [False] * len(triples)
+
+    r = ResilientRelationshipChecker(Hanging(), failure_threshold=1, recovery_timeout=0.0)
+    r.breaker.record_failure()
+    assert r.breaker.state == "open"
+
+    async def main():
+        dropped = r.check("user:1", "viewer", "doc:1")  # created, never awaited
+        dropped.close()
+        task = asyncio.ensure_future(r.check("user:1", "viewer", "doc:1"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert r.breaker.state == "half_open"
+    assert r.breaker.allow()  # neither call left the trial slot claimed
@@ -111,12 +111,12 @@ async def test_batch_check_async_rpc_error_returns_falses(monkeypatch):
 
 
 # ---------------------------------------------------------------------------
-# Sync mode — sequential fallback (no bulk endpoint on sync client)
+# Sync mode — concurrent single checks when the client has no bulk endpoint
 # ---------------------------------------------------------------------------
 
 
-def test_batch_check_sync_sequential_fallback(monkeypatch):
-    """sync batch_check falls back to sequential CheckPermission calls."""
+def test_batch_check_sync_concurrent_fallback(monkeypatch):
+    """sync batch_check without a bulk RPC issues one CheckPermission per triple."""
     sp = importlib.import_module("rbacx.rebac.spicedb")
     from authzed.api.v1 import CheckPermissionResponse
 
@@ -132,12 +132,79 @@ def test_batch_check_sync_sequential_fallback(monkeypatch):
         return r
 
     monkeypatch.setattr(checker._client, "CheckPermission", fake_check, raising=True)
+    monkeypatch.delattr(checker._client, "CheckBulkPermissions")
 
     triples = [("u:1", "r", "o:1"), ("u:2", "r", "o:2")]
     result = checker.batch_check(triples)
 
     assert call_count[0] == 2  # two separate calls
     assert result == [True, True]
+    checker.close()
+    checker.close()  # idempotent
+
+    seq = sp.SpiceDBChecker(
+        sp.SpiceDBConfig(endpoint="localhost:50051", insecure=True, sync_batch_concurrency=1)
+    )
+    monkeypatch.setattr(seq._client, "CheckPermission", fake_check, raising=True)
+    monkeypatch.delattr(seq._client, "CheckBulkPermissions")
+    assert seq.batch_check(triples) == [True, True]
+    assert seq._pool is None  # sequential, no pool started
+
+
+def test_batch_check_sync_uses_check_bulk_permissions(monkeypatch):
+    """sync batch_check sends one CheckBulkPermissions request with shared consistency."""
+    sp = importlib.import_module("rbacx.rebac.spicedb")
+    cfg = sp.SpiceDBConfig(endpoint="localhost:50051", token=None, insecure=True)
+    checker = sp.SpiceDBChecker(cfg)
+
+    calls: list = []
+
+    def fake_bulk(req, timeout=None):
+        calls.append(req)
+        resp = MagicMock()
+        resp.pairs = [_make_pair(_has_permission()), _make_pair(_no_permission())]
+        return resp
+
+    def no_single(req, timeout=None):  # pragma: no cover - must not be called
+        raise AssertionError("CheckPermission must not be used")
+
+    monkeypatch.setattr(checker._client, "CheckBulkPermissions", fake_bulk)
+    monkeypatch.setattr(checker._client, "CheckPermission", no_single)
+
+    out = checker.batch_check([("user:1", "r", "doc:1"), ("user:2", "r", "doc:2")], zed_token="Z")
+    assert out == [True, False]
+    assert len(calls) == 1
+    req = calls[0]
+    assert [i.resource.object_id for i in req.items] == ["1", "2"]
+    assert req.consistency.at_least_as_fresh.token == "Z"
+
+
+def test_batch_check_sync_bulk_errors_fail_closed(monkeypatch):
+    import grpc
+
+    sp = importlib.import_module("rbacx.rebac.spicedb")
+    checker = sp.SpiceDBChecker(sp.SpiceDBConfig(endpoint="localhost:50051", insecure=True))
+    triples = [("u:1", "r", "o:1"), ("u:2", "r", "o:2")]
+
+    def rpc_error(req, timeout=None):
+        raise grpc.RpcError("down")
+
+    monkeypatch.setattr(checker._client, "CheckBulkPermissions", rpc_error)
+    assert checker.batch_check(triples) == [False, False]
+
+    def unexpected(req, timeout=None):
+        raise ValueError("bad")
+
+    monkeypatch.setattr(checker._client, "CheckBulkPermissions", unexpected)
+    assert checker.batch_check(triples) == [False, False]
+
+    def short(req, timeout=None):
+        resp = MagicMock()
+        resp.pairs = [_make_pair(_has_permission())]
+        return resp
+
+    monkeypatch.setattr(checker._client, "CheckBulkPermissions", short)
+    assert checker.batch_check(triples) == [False, False]
 
 
 # ---------------------------------------------------------------------------
@@ -204,3 +271,33 @@ async def test_batch_check_async_unexpected_exception_returns_falses(monkeypatch
     triples = [("u:1", "r", "o:1"), ("u:2", "r", "o:2")]
     result = await checker.batch_check(triples)
     assert result == [False, False]
+
+
+def test_batch_check_sync_concurrent_fallback_keeps_the_decision_deadline(monkeypatch):
+    """the pooled single checks see the caller's context variables"""
+    import time
+
+    from authzed.api.v1 import CheckPermissionResponse
+
+    from rbacx.core.relctx import REL_DEADLINE
+
+    sp = importlib.import_module("rbacx.rebac.spicedb")
+    checker = sp.SpiceDBChecker(sp.SpiceDBConfig(endpoint="localhost:50051", insecure=True))
+    timeouts: list = []
+
+    def fake_check(req, timeout=None):
+        timeouts.append(timeout)
+        r = CheckPermissionResponse()
+        r.permissionship = CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
+        return r
+
+    monkeypatch.setattr(checker._client, "CheckPermission", fake_check, raising=True)
+    monkeypatch.delattr(checker._client, "CheckBulkPermissions")
+
+    token = REL_DEADLINE.set(time.monotonic() + 0.25)
+    try:
+        assert checker.batch_check([("u:1", "r", "o:1"), ("u:2", "r", "o:2")]) == [True, True]
+    finally:
+        REL_DEADLINE.reset(token)
+    checker.close()
+    assert len(timeouts) == 2 and all(t <= 0.25 for t in timeouts)
@@ -13,6 +13,8 @@ import importlib
 
 import pytest
 
+from rbacx.core.relctx import track_failures
+
 
 def test_secure_and_insecure_clients_and_bearer():
     sp = importlib.import_module("rbacx.rebac.spicedb")
@@ -50,7 +52,9 @@ def test_rpc_error_path_returns_false(monkeypatch):
         raise grpc.RpcError("boom")
 
     monkeypatch.setattr(checker._client, "CheckPermission", boom, raising=True)
-    assert checker.check("u:1", "r", "o:1") is False
+    with track_failures() as failures:
+        assert checker.check("u:1", "r", "o:1") is False
+    assert len(failures) == 1
 
 
 @pytest.mark.asyncio
@@ -93,7 +93,7 @@ def test_sync_guard_raises_when_no_client():
 
 def test_batch_sync_fallback_list_comprehension(monkeypatch):
     """
-    Covers line 185: sync fallback builds a list via list-comprehension of check().
+    Covers the sync fallback without a bulk RPC: single checks from the thread pool.
     We alternate True/False responses to verify order and length.
     """
     sp = _load_mod()
@@ -106,11 +106,11 @@ def test_batch_sync_fallback_list_comprehension(monkeypatch):
             self.i = 0
 
         def CheckPermission(self, request, timeout=None):
-            # Alternate True / False
+            # Alternate True / False by input position (calls may run concurrently)
             self.i += 1
             val = (
                 sp.CheckPermissionResponse.PERMISSIONSHIP_HAS_PERMISSION
-                if self.i % 2 == 1
+                if request.resource.object_type in ("o1", "o3")
                 else sp.CheckPermissionResponse.PERMISSIONSHIP_NO_PERMISSION
             )
             return _Resp(val)
@@ -0,0 +1,78 @@
+import threading
+
+from rbacx.rebac.local import LocalRelationshipChecker, RelTuple, This, TupleToUserset
+from rbacx.rebac.sqlite import SQLiteRelationshipStore
+
+
+def test_add_and_indexed_lookups():
+    st = SQLiteRelationshipStore()
+    st.add("user:1", "owner", "document:42")
+    st.add("folder:10", "parent", "document:42")
+    st.add("user:2", "viewer", "document:42", caveat="is_weekend")
+
+    owners = list(st.direct_for_resource("owner", "document:42"))
+    assert owners == [RelTuple("user:1", "owner", "document:42")]
+    assert list(st.by_subject("folder:10", "parent"))[0].resource == "document:42"
+    assert list(st.direct_for_resource("viewer", "document:42"))[0].caveat == "is_weekend"
+    assert list(st.direct_for_resource("viewer", "document:missing")) == []
+
+
+def test_duplicates_are_stored_once_and_cache_is_invalidated():
+    st = SQLiteRelationshipStore()
+    st.add("user:1", "viewer", "doc:1")
+    assert len(list(st.direct_for_resource("viewer", "doc:1"))) == 1  # populates the LRU
+    st.add("user:1", "viewer", "doc:1")
+    st.add("user:2", "viewer", "doc:1")
+    assert len(st) == 2
+    assert {t.subject for t in st.direct_for_resource("viewer", "doc:1")} == {"user:1", "user:2"}
+
+
+def test_add_many_chunks_and_counts_new_rows():
+    st = SQLiteRelationshipStore(cache_size=2)
+    st.direct_for_resource("viewer", "doc:0")  # cached empty result must not go stale
+    rows = [(f"user:{i}", "viewer", f"doc:{i % 3}") for i in range(25)]
+    rows.append(RelTuple("user:0", "viewer", "doc:0"))  # duplicate
+    rows.append(("group:g", "member", "doc:0", "cav"))
+    assert st.add_many(rows, chunk_size=4) == 26
+    assert len(list(st.direct_for_resource("viewer", "doc:0"))) == 9
+    assert [t.caveat for t in st.by_subject("group:g", "member")] == ["cav"]
+
+
+def test_file_database_uses_wal_and_persists(tmp_path):
+    path = str(tmp_path / "tuples.db")
+    st = SQLiteRelationshipStore(path)
+    st.add("user:1", "member", "group:a")
+    mode = st._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+    st.close()
+
+    reopened = SQLiteRelationshipStore(path)
+    assert [t.subject for t in reopened.direct_for_resource("member", "group:a")] == ["user:1"]
+    reopened.close()
+
+
+def test_local_checker_runs_on_sqlite_store_from_threads():
+    st = SQLiteRelationshipStore()
+    st.add_many(
+        [
+            ("folder:10", "parent", "document:1"),
+            ("user:3", "member", "folder:10"),
+        ]
+    )
+    rules = {
+        "document": {"viewer": [This(), TupleToUserset("parent", "member")]},
+        "folder": {"member": [This()]},
+    }
+    ck = LocalRelationshipChecker(st, rules=rules)
+    results: list[bool] = []
+
+    def worker():
+        results.append(ck.check("user:3", "viewer", "document:1"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [True] * 8
+    assert ck.check("user:4", "viewer", "document:1") is False
@@ -0,0 +1,254 @@
+import json
+import threading
+import time
+
+import pytest
+
+from rbacx.rebac.local import (
+    InMemoryRelationshipStore,
+    LocalRelationshipChecker,
+    RelationshipUpdate,
+    RelTuple,
+    This,
+)
+from rbacx.rebac.watch import (
+    NDJSONChangeSource,
+    QueueChangeSource,
+    RelationshipWatcher,
+    parse_response,
+)
+
+
+def _subjects(store, relation, resource):
+    return sorted((t.subject, t.caveat) for t in store.direct_for_resource(relation, resource))
+
+
+def test_delete_touch_and_revision():
+    st = InMemoryRelationshipStore()
+    assert st.revision == 0
+    st.add("user:1", "viewer", "doc:1")
+    st.add("user:1", "viewer", "doc:1", caveat="c")
+    st.add("user:2", "viewer", "doc:1")
+    assert st.revision == 3
+
+    assert st.delete("user:1", "viewer", "doc:1") == 2
+    assert _subjects(st, "viewer", "doc:1") == [("user:2", None)]
+    assert list(st.by_subject("user:1", "viewer")) == []
+    assert st.delete("user:9", "viewer", "doc:1") == 0
+    assert st.delete("user:1", "viewer", "doc:404") == 0
+
+    st.touch("user:2", "viewer", "doc:1", caveat="weekday")
+    st.touch("user:3", "viewer", "doc:1")
+    assert _subjects(st, "viewer", "doc:1") == [("user:2", "weekday"), ("user:3", None)]
+    assert st.revision == 8  # every write call counts, including no-op deletes
+
+    st.delete("user:2", "viewer", "doc:1")
+    st.delete("user:3", "viewer", "doc:1")
+    assert list(st.iter_tuples()) == []
+
+
+def test_apply_bumps_revision_once_and_rejects_unknown_ops():
+    st = InMemoryRelationshipStore()
+    rev = st.apply(
+        [
+            RelationshipUpdate("create", RelTuple("user:1", "viewer", "doc:1")),
+            RelationshipUpdate("touch", RelTuple("user:2", "viewer", "doc:1", "c")),
+            RelationshipUpdate("delete", RelTuple("user:1", "viewer", "doc:1")),
+        ]
+    )
+    assert rev == st.revision == 1
+    assert _subjects(st, "viewer", "doc:1") == [("user:2", "c")]
+    with pytest.raises(ValueError):
+        st.apply([RelationshipUpdate("upsert", RelTuple("a", "b", "c"))])  # type: ignore[arg-type]
+
+
+def test_apply_validates_the_whole_batch_first_and_create_is_idempotent():
+    st = InMemoryRelationshipStore()
+    st.add("user:1", "viewer", "doc:1", caveat="c")
+    bad = [
+        RelationshipUpdate("delete", RelTuple("user:1", "viewer", "doc:1")),
+        RelationshipUpdate("upsert", RelTuple("user:2", "viewer", "doc:1")),  # type: ignore[arg-type]
+    ]
+    with pytest.raises(ValueError):
+        st.apply(bad)
+    assert _subjects(st, "viewer", "doc:1") == [("user:1", "c")]
+    assert st.revision == 1
+
+    # replaying a create (e.g. a redelivered change) does not duplicate the tuple
+    create = RelationshipUpdate("create", RelTuple("user:1", "viewer", "doc:1"))
+    st.apply([create, create])
+    assert _subjects(st, "viewer", "doc:1") == [("user:1", "c")]
+    assert [t.resource for t in st.by_subject("user:1", "viewer")] == ["doc:1"]
+
+
+def test_touch_publishes_a_complete_bucket():
+    st = InMemoryRelationshipStore()
+    st.add("user:1", "viewer", "doc:1")
+    st.add("user:2", "viewer", "doc:1")
+    before = st.direct_for_resource("viewer", "doc:1")
+    st.touch("user:2", "viewer", "doc:1", caveat="weekday")
+    # the bucket a reader already holds is never mutated
+    assert [(t.subject, t.caveat) for t in before] == [("user:1", None), ("user:2", None)]
+
+    class Recording(dict):
+        def __init__(self, *a):
+            super().__init__(*a)
+            self.published = []
+
+        def __setitem__(self, key, bucket):
+            self.published.append((key, list(bucket)))
+            super().__setitem__(key, bucket)
+
+        def __delitem__(self, key):
+            self.published.append((key, []))
+            super().__delitem__(key)
+
+    st._by_res_rel = Recording(st._by_res_rel)
+    st._by_subj_rel = Recording(st._by_subj_rel)
+    st.touch("user:2", "viewer", "doc:1")
+    st.apply([RelationshipUpdate("touch", RelTuple("user:2", "viewer", "doc:1", "c"))])
+    # every bucket a reader could observe already holds the touched tuple
+    assert len(st._by_res_rel.published) == len(st._by_subj_rel.published) == 2
+    for _, bucket in st._by_res_rel.published + st._by_subj_rel.published:
+        assert [(t.subject, t.resource) for t in bucket if t.subject == "user:2"] == [
+            ("user:2", "doc:1")
+        ]
+
+
+def test_queue_feed_applies_incrementally():
+    st = InMemoryRelationshipStore()
+    ck = LocalRelationshipChecker(st, rules={"doc": {"viewer": [This()]}})
+    src = QueueChangeSource()
+    w = RelationshipWatcher(st, src)
+    assert w.poll_once() == 0
+
+    src.put(
+        [RelationshipUpdate("touch", RelTuple("user:1", "viewer", "doc:1"))], changes_through="t1"
+    )
+    src.put(
+        [RelationshipUpdate("touch", RelTuple("user:2", "viewer", "doc:1"))], changes_through="t2"
+    )
+    assert w.poll_once() == 2
+    assert w.last_token == "t2"
+    assert st.revision == 2
+    assert ck.check("user:1", "viewer", "doc:1") is True
+
+    src.put([RelationshipUpdate("delete", RelTuple("user:1", "viewer", "doc:1"))])
+    w.poll_once()
+    assert ck.check("user:1", "viewer", "doc:1") is False
+    assert w.last_token == "t2"  # batches without a token keep the previous one
+
+
+def test_ndjson_source_tails_complete_lines(tmp_path):
+    path = tmp_path / "changes.ndjson"
+    src = NDJSONChangeSource(str(path))
+    assert src.read(0) is None  # missing file
+
+    rec = {
+        "updates": [{"operation": "create", "subject": "u:1", "relation": "r", "resource": "o:1"}]
+    }
+    with open(path, "w") as f:
+        f.write(json.dumps({**rec, "changes_through": 5}) + "\n")
+        f.write("not json\n")
+        f.write('{"operation": "delete", "subject": "u:1", "relation": "r", "resource": "o:1"}')
+    st = InMemoryRelationshipStore()
+    w = RelationshipWatcher(st, src)
+    assert w.poll_once() == 1  # the last line is not terminated yet
+    assert w.last_token == "5"
+    assert _subjects(st, "r", "o:1") == [("u:1", None)]
+
+    with open(path, "a") as f:
+        f.write("\n")
+    assert w.poll_once() == 1
+    assert _subjects(st, "r", "o:1") == []
+
+    tail = NDJSONChangeSource(str(path), start_at_end=True)
+    assert tail.read(0) is None
+
+
+def test_parse_response_validates_operation():
+    with pytest.raises(ValueError):
+        parse_response({"operation": "upsert", "subject": "a", "relation": "b", "resource": "c"})
+    assert (
+        parse_response({"subject": "a", "relation": "b", "resource": "c"}).updates[0].operation
+        == "touch"
+    )
+
+
+def test_background_watcher_does_not_block_concurrent_checks():
+    st = InMemoryRelationshipStore()
+    for i in range(50):
+        st.add(f"user:{i}", "viewer", "doc:1")
+    ck = LocalRelationshipChecker(st, rules={"doc": {"viewer": [This()]}})
+    src = QueueChangeSource()
+    w = RelationshipWatcher(st, src, poll_interval=0.01)
+    w.start()
+    w.start()  # idempotent
+
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                # user:0 is never touched by the feed
+                assert ck.check("user:0", "viewer", "doc:1") is True
+        except Exception as e:  # pragma: no cover - failure path
+            errors.append(e)
+
+    t = threading.Thread(target=reader)
+    t.start()
+    for i in range(1, 50):
+        src.put([RelationshipUpdate("delete", RelTuple(f"user:{i}", "viewer", "doc:1"))])
+        src.put([RelationshipUpdate("create", RelTuple(f"user:{i}", "viewer", "doc:1"))])
+    deadline = time.time() + 5
+    while st.revision < 50 + 98 and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    t.join()
+    w.stop()
+    assert not errors
+    assert st.revision == 50 + 98
+    assert len(list(st.iter_tuples())) == 50
+
+
+def test_watcher_survives_store_errors():
+    class Broken:
+        def apply(self, updates):
+            raise RuntimeError("boom")
+
+    src = QueueChangeSource()
+    w = RelationshipWatcher(Broken(), src, poll_interval=0.01)
+    w.start()
+    src.put([])
+    deadline = time.time() + 2
+    while w.last_error is None and time.time() < deadline:
+        time.sleep(0.01)
+    w.stop()
+    assert isinstance(w.last_error, RuntimeError)
+    w.stop()  # already stopped
+
+
+def test_failed_batch_is_retried_before_later_batches():
+    class Flaky(InMemoryRelationshipStore):
+        fail = True
+
+        def apply(self, updates):
+            if self.fail:
+                raise RuntimeError("unavailable")
+            return super().apply(updates)
+
+    st = Flaky()
+    src = QueueChangeSource()
+    src.put([RelationshipUpdate("create", RelTuple("u:1", "r", "o:1"))], changes_through="1")
+    src.put([RelationshipUpdate("delete", RelTuple("u:1", "r", "o:1"))], changes_through="2")
+    w = RelationshipWatcher(st, src)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            w.poll_once()
+        assert w.last_token is None
+        assert src.queue.qsize() == 1  # the second batch was not consumed
+    st.fail = False
+    assert w.poll_once() == 2
+    assert w.last_token == "2"
+    assert _subjects(st, "r", "o:1") == []